@@ -1,38 +1,145 @@
-from typing import Dict
-
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agent.answer_cache import CacheKey, SemanticAnswerCache, normalize_question
+from agent.history_manager import HistoryManager
+from agent.intent_router import AGENT, IntentRouter
+from agent.session_store import create_session_store
+from agent.tool_planner import PLAN_LLM_TAG, ParallelToolPlanner
 from database.vector_database import DualVectorDatabase
-from langchain import hub
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain.agents import (
+    AgentExecutor,
+    create_react_agent,
+    create_tool_calling_agent,
+)
 from langchain_core.chat_history import BaseChatMessageHistory
-from langchain_core.prompts import PromptTemplate
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    MessagesPlaceholder,
+    PromptTemplate,
+)
+from langchain_core.runnables import RunnablePassthrough
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_openai import ChatOpenAI
 from tools.movie_database_search import MovieDatabaseSearchTool
+from tools.query_rewriter import QueryRewriter
 from tools.user_history_tool import UserHistoryTool
-from tools.web_movie_research import WebMovieResearchTool
+from tools.web_movie_research import (
+    WebMovieResearchTool,
+    WebSearchClients,
+    WebSearchConfig,
+)
+from utils.llm_cache import TieredLLMCache, without_llm_cache
+from utils.metrics import ANSWER_LLM_TAG, LLMCallCounter, TurnStats
+from utils.single_flight import SingleFlight
+
+# Tag applicato all'LLM dell'agent: distingue i suoi token da quelli dei tools
+AGENT_LLM_TAG = "movie_agent_llm"
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+# Percorso dei turni serviti dalla cache semantica delle risposte
+ANSWER_CACHE_PATH = "answer_cache"
+# Percorso dei turni che hanno atteso un turno identico già in corso
+COALESCED_PATH = "coalesced"
+# Tool che legge lo storico dell'utente: le risposte che lo usano sono personali
+USER_HISTORY_TOOL = "user_conversation_history"
+# Bucket degli utenti senza profilo nella collection users
+ANONYMOUS_BUCKET = "anonymous"
+
+# Messaggi di stato inviati al client quando l'agent invoca un tool
+TOOL_STATUS_MESSAGES = {
+    "movie_database_search": "Cerco nel catalogo Netflix...",
+    "web_movie_research": "Cerco recensioni e opinioni sul web...",
+    "user_conversation_history": "Recupero le tue preferenze...",
+}
+
+# Istruzioni di sistema per le modalità basate su tool calling nativo
+TOOL_CALLING_SYSTEM_PROMPT = """You are the official Netflix movie assistant that helps users find films.
+You have all the information about Netflix films availability from the database.
+Never search for Netflix film outside the database. If a film is not in the database, it is not available on Netflix.
+If movie_database_search gives some info about a film, it means the film is in the database.
+Never use emojis.
+
+INSTRUCTIONS:
+- Extract user_id from [USER_ID: xxx] if present
+- Check user_conversation_history when needed
+- Independent lookups can be requested together in the same step
+- Always respond in Italian
+- Include Netflix links when available
+- Avoid spoilers
+- Available films are presented using movie_database_search. Use ONLY this tool to get the availability information."""
+
+
+def create_web_search_config(config) -> WebSearchConfig:
+    """Config del tool di web research a partire dalla Config del backend"""
+    return WebSearchConfig(
+        tavily_api_key=config.tavily_api_key,
+        tavily_max_results=config.tavily_max_results,
+        reddit_client_id=config.reddit_client_id,
+        reddit_client_secret=config.reddit_client_secret,
+        reddit_user_agent=config.reddit_user_agent,
+        reddit_max_results=config.reddit_max_results,
+        include_images=config.include_images,
+        reddit_subreddit="movies",  # Default value
+        coalesce_requests=config.coalesce_tool_requests,
+    )
+
+
+def load_vector_database(config) -> DualVectorDatabase:
+    """Crea il DualVectorDatabase e carica le collections (sync in background)"""
+    db_manager = DualVectorDatabase(config)
+    db_manager.load_collections()
+    return db_manager
 
 
 class MovieChatAgent:
     """
     Agent principale per conversazioni sui film Netflix
     Coordina 3 tools: movie_database_search, web_movie_research, user_conversation_history
+
+    db_manager e web_clients possono essere preparati a parte (es. in parallelo
+    durante il warm-up del server); se assenti vengono creati qui.
     """
 
-    def __init__(self, config):
+    def __init__(
+        self,
+        config,
+        db_manager: Optional[DualVectorDatabase] = None,
+        web_clients: Optional[WebSearchClients] = None,
+    ):
         self.config = config
 
+        # Cache exact-match delle chiamate LLM (memoria + SQLite), condivisa dalle chain
+        self.llm_cache = None
+        if config.enable_llm_cache:
+            self.llm_cache = TieredLLMCache(
+                max_entries=config.llm_cache_max_entries,
+                db_path=config.llm_cache_path,
+                max_disk_entries=config.llm_cache_max_disk_entries,
+                ttl_seconds=config.llm_cache_ttl_seconds,
+            )
+
         # Inizializza LLM
         self.llm = ChatOpenAI(
             api_key=config.openai_api_key,
             model=config.llm_model,
             temperature=config.llm_temperature,
             max_tokens=config.max_tokens,
+            cache=self.llm_cache,
+        )
+
+        # Copia taggata per i passi di ragionamento dell'agent: il tag sopravvive
+        # anche a bind()/bind_tools() e distingue i suoi token da quelli dei tools
+        self.agent_llm = self._llm_for("agent").model_copy(
+            update={"tags": [AGENT_LLM_TAG]}
         )
 
         # Carica vector stores
-        self.db_manager = DualVectorDatabase(config)
-        self.films_store, self.users_store = self.db_manager.load_collections()
+        self.db_manager = db_manager or load_vector_database(config)
+        self.films_store = self.db_manager.films_store
+        self.users_store = self.db_manager.users_store
+        self.web_clients = web_clients
 
         # Crea tools
         self.tools = self._create_tools()
@@ -40,53 +147,115 @@ class MovieChatAgent:
         # Crea agent executor
         self.agent_executor = self._create_agent_executor()
 
-        # Session store per memory
-        self._session_store: Dict[str, ChatMessageHistory] = {}
+        # Session store per memory (LRU + TTL, in memoria o su SQLite)
+        self._session_store = create_session_store(config)
+
+        # Finestra di k turni + riassunto progressivo entro un budget di token
+        self.history_manager = HistoryManager(
+            self._llm_for("history_summary"),
+            k=config.conversation_memory_k,
+            max_tokens=config.history_max_tokens,
+        )
 
         # Agent con history
         self.agent_with_history = self._create_agent_with_history()
 
+        # Router locale per il fast-path sul catalogo + metriche per percorso
+        self.intent_router = IntentRouter() if config.enable_intent_router else None
+        self.turn_stats = TurnStats()
+        self.agent_path = f"{AGENT}:{config.agent_mode}"
+
+        # Cache semantica delle risposte, svuotata se il catalogo viene ricostruito
+        self.answer_cache = None
+        if config.enable_answer_cache:
+            self.answer_cache = SemanticAnswerCache(
+                self.db_manager.embeddings,
+                bucket_resolver=self._profile_bucket,
+                threshold=config.answer_cache_threshold,
+                max_entries=config.answer_cache_max_entries,
+                ttl_seconds=config.answer_cache_ttl_seconds,
+            )
+            self.db_manager.add_films_rebuild_listener(self.answer_cache.invalidate)
+
+        # Turni identici concorrenti (primo messaggio, stesso profilo) eseguiti una volta
+        self.turn_flights = SingleFlight() if config.coalesce_agent_turns else None
+
     def _create_tools(self):
         """Crea i 3 tools principali"""
 
+        # Stage di query rewriting condiviso: una sola contextualization per turno
+        self.query_rewriter = QueryRewriter(self._llm_for("query_rewrite"))
+
         # Tool 1: Database search - usa as_structured_tool() per supportare chat_history
         from tools.movie_database_search import MovieDBConfig
 
         db_config = MovieDBConfig(
-            films_search_k=self.config.films_search_k
+            films_search_k=self.config.films_search_k,
+            speculative_min_similarity=self.config.speculative_min_similarity,
+            coalesce_requests=self.config.coalesce_tool_requests,
+            hybrid_rrf_k=self.config.hybrid_rrf_k,
             # default_metadata_filter non serve (è Optional)
         )
 
-        db_search_tool = MovieDatabaseSearchTool(
-            self.films_store, self.llm, db_config
-        ).as_structured_tool()
+        # Istanza conservata: usata anche direttamente dal fast-path
+        self.db_search = MovieDatabaseSearchTool(
+            self.films_store,
+            self._llm_for("movie_qa"),
+            db_config,
+            query_rewriter=self.query_rewriter,
+            lexical_index=(
+                self.db_manager.films_lexical if self.config.enable_hybrid_retrieval else None
+            ),
+            metadata_index=self.db_manager.films_metadata,
+            field_index=self.db_manager.films_fields,
+        )
+        db_search_tool = self.db_search.as_structured_tool()
 
         # Tool 2: Web research - crea config specifico
-        from tools.web_movie_research import WebSearchConfig
-
-        web_config = WebSearchConfig(
-            tavily_api_key=self.config.tavily_api_key,
-            tavily_max_results=self.config.tavily_max_results,
-            reddit_client_id=self.config.reddit_client_id,
-            reddit_client_secret=self.config.reddit_client_secret,
-            reddit_user_agent=self.config.reddit_user_agent,
-            reddit_max_results=self.config.reddit_max_results,
-            include_images=self.config.include_images,
-            reddit_subreddit="movies",  # Default value
+        self.web_research = WebMovieResearchTool(
+            create_web_search_config(self.config),
+            self._llm_for("web_synthesis"),
+            query_rewriter=self.query_rewriter,
+            clients=self.web_clients,
         )
-
-        web_research_tool = WebMovieResearchTool(
-            web_config, self.llm
-        ).as_structured_tool()
+        web_research_tool = self.web_research.as_structured_tool()
 
         # Tool 3: User history - questo va bene così
         user_history_tool = UserHistoryTool(
             self.users_store, self.llm, self.config
         ).create_tool()
 
-        return [db_search_tool, web_research_tool, user_history_tool]
+        tools = [db_search_tool, web_research_tool, user_history_tool]
+
+        # Tools che producono già la risposta finale per l'utente: il loro output
+        # chiude il turno senza un'ulteriore iterazione di sintesi dell'agent
+        for tool in tools:
+            tool.return_direct = tool.name in self.config.direct_return_tools
+
+        return tools
+
+    def _llm_for(self, chain: str):
+        """
+        LLM di una chain: senza cache se la chain è in Config.llm_cache_exclude,
+        con la sola cache in memoria se è in Config.llm_cache_memory_only
+        """
+        if self.llm_cache is not None and chain in self.config.llm_cache_exclude:
+            return without_llm_cache(self.llm)
+        if self.llm_cache is not None and chain in self.config.llm_cache_memory_only:
+            return self.llm.model_copy(update={"cache": self.llm_cache.memory_only()})
+        return self.llm
 
     def _create_agent_executor(self):
+        """Crea l'agent executor nella modalità scelta in Config.agent_mode"""
+        if self.config.agent_mode == "tool_calling":
+            return self._create_tool_calling_executor()
+        if self.config.agent_mode == "plan":
+            return self._create_plan_executor()
+        if self.config.agent_mode == "react":
+            return self._create_react_executor()
+        raise ValueError(f"Agent mode non supportato: {self.config.agent_mode}")
+
+    def _create_react_executor(self):
         """Crea REACT agent executor con prompt migliorato e parser robusto"""
 
         # Prompt più rigoroso con esempi espliciti
@@ -142,8 +311,12 @@ Chat History: {chat_history}
             ],
         )
 
-        # Crea REACT agent
-        agent = create_react_agent(llm=self.llm, tools=self.tools, prompt=prompt)
+        # Crea REACT agent (LLM taggato per filtrare i token in streaming)
+        agent = create_react_agent(
+            llm=self.agent_llm,
+            tools=self.tools,
+            prompt=prompt,
+        )
 
         # Crea agent executor con parsing error handling migliorato
         agent_executor = AgentExecutor(
@@ -158,6 +331,50 @@ Chat History: {chat_history}
 
         return agent_executor
 
+    def _create_tool_calling_executor(self):
+        """
+        Crea agent executor basato su tool calling nativo (function calling):
+        le chiamate ai tools arrivano strutturate, anche più di una in parallelo,
+        senza parsing del testo Thought/Action/Action Input.
+        """
+        prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", TOOL_CALLING_SYSTEM_PROMPT),
+                MessagesPlaceholder("chat_history"),
+                ("human", "{input}"),
+                MessagesPlaceholder("agent_scratchpad"),
+            ]
+        )
+
+        agent = create_tool_calling_agent(
+            llm=self.agent_llm,
+            tools=self.tools,
+            prompt=prompt,
+        )
+
+        # Nessun handler di parsing: le tool call sono già strutturate
+        return AgentExecutor(
+            agent=agent,
+            tools=self.tools,
+            verbose=False,
+            max_iterations=5,
+            return_intermediate_steps=False,
+        )
+
+    def _create_plan_executor(self):
+        """
+        Crea l'executor in modalità "plan": un passo di planning decide tutte le
+        tool call indipendenti, che girano in parallelo, seguito da un'unica sintesi
+        """
+        planner = ParallelToolPlanner(
+            llm=self.agent_llm,
+            tools=self.tools,
+            system_prompt=TOOL_CALLING_SYSTEM_PROMPT,
+            max_concurrency=self.config.plan_max_concurrency,
+            direct_return_tools=self.config.direct_return_tools,
+        )
+        return planner.as_runnable()
+
     def _handle_parsing_error(self, error) -> str:
         """
         Gestisce gli errori di parsing in modo più intelligente
@@ -183,14 +400,18 @@ Final Answer: Mi dispiace, ho riscontrato un problema tecnico. Potresti riformul
 
     def _get_session_history(self, session_id: str) -> BaseChatMessageHistory:
         """Recupera o crea chat history per session_id (user_id)"""
-        if session_id not in self._session_store:
-            self._session_store[session_id] = ChatMessageHistory()
-        return self._session_store[session_id]
+        return self._session_store.get(session_id)
 
     def _create_agent_with_history(self):
         """Crea agent con RunnableWithMessageHistory"""
+        # La history completa passa dal HistoryManager prima di arrivare al prompt
+        agent_with_window = (
+            RunnablePassthrough.assign(chat_history=self.history_manager.as_runnable())
+            | self.agent_executor
+        )
+
         return RunnableWithMessageHistory(
-            self.agent_executor,
+            agent_with_window,
             self._get_session_history,
             input_messages_key="input",
             history_messages_key="chat_history",
@@ -200,6 +421,7 @@ Final Answer: Mi dispiace, ho riscontrato un problema tecnico. Potresti riformul
     def process_message(self, user_message: str, user_id: str) -> str:
         """
         Processa messaggio utente con AgentExecutor + History
+        (o con il fast-path sul catalogo, se l'intent router lo consente)
 
         Args:
             user_message: Messaggio dell'utente
@@ -208,24 +430,57 @@ Final Answer: Mi dispiace, ho riscontrato un problema tecnico. Potresti riformul
         Returns:
             Risposta dell'agent
         """
+        counter = LLMCallCounter()
+        start = time.perf_counter()
+        path = self.agent_path
+
         try:
+            # Domanda già vista (o quasi): nessuna esecuzione dell'agent
+            cache_key = self._answer_cache_key(user_message, user_id)
+            if cache_key is not None:
+                cached = self.answer_cache.get(cache_key)
+                if cached is not None:
+                    path = ANSWER_CACHE_PATH
+                    self._save_turn(user_id, user_message, cached)
+                    return cached
+
+            # Fast-path: richieste semplici sul catalogo saltano il ReAct loop
+            intent = self._route(user_message, user_id)
+            if intent != AGENT:
+                answer = self.db_search.search(
+                    user_message, config={"callbacks": [counter]}
+                )
+                if self._is_valid_tool_answer(answer):
+                    path = f"fast_path:{intent}"
+                    self._save_turn(user_id, user_message, answer)
+                    if cache_key is not None:
+                        self.answer_cache.put(cache_key, answer)
+                    return answer
+
             # Aggiungi user_id al context per i tools
             enhanced_message = f"[USER_ID: {user_id}] {user_message}"
 
-            # Esegui agent con history automatica
-            result = self.agent_with_history.invoke(
-                {"input": enhanced_message},
-                config={"configurable": {"session_id": user_id}},
-            )
+            # Esegui agent con history automatica, con la ricerca sul catalogo
+            # già avviata in parallelo al primo passo di ragionamento
+            speculation = self._start_speculation(user_message)
+            try:
+                result = self.agent_with_history.invoke(
+                    {"input": enhanced_message},
+                    config={"configurable": {"session_id": user_id}, "callbacks": [counter]},
+                )
+            finally:
+                self._finish_speculation(speculation)
 
             # Estrai output e verifica che sia presente
             output = result.get("output", "")
 
             # Se l'output è vuoto o contiene solo messaggi di errore tecnici
-            if not output or "I'm sorry" in output or "mistake" in output:
+            if self._needs_fallback(output):
                 fallback_result = self._fallback_response(user_message, user_id)
                 return fallback_result
 
+            if self._cacheable(cache_key, counter):
+                self.answer_cache.put(cache_key, output)
             return output
 
         except Exception as e:
@@ -233,6 +488,370 @@ Final Answer: Mi dispiace, ho riscontrato un problema tecnico. Potresti riformul
             fallback_result = self._fallback_response(user_message, user_id)
             return fallback_result
 
+        finally:
+            self._record_turn(path, counter, start)
+
+    async def aprocess_message(self, user_message: str, user_id: str) -> str:
+        """
+        Versione async di process_message: usa ainvoke lungo tutta la catena
+        (RunnableWithMessageHistory -> AgentExecutor -> tools) senza bloccare
+        l'event loop del server.
+
+        Args:
+            user_message: Messaggio dell'utente
+            user_id: ID utente per personalizzazione
+
+        Returns:
+            Risposta dell'agent
+        """
+        # Stesso primo messaggio inviato in contemporanea da più utenti senza
+        # profilo: un solo turno eseguito, la risposta va a tutti
+        key = self._turn_flight_key(user_message, user_id)
+        if key is None:
+            return await self._aprocess_turn(user_message, user_id)
+
+        executed = False
+
+        async def run_turn() -> str:
+            nonlocal executed
+            executed = True
+            return await self._aprocess_turn(user_message, user_id)
+
+        start = time.perf_counter()
+        answer = await self.turn_flights.ado(key, run_turn)
+        if not executed:
+            self._save_turn(user_id, user_message, answer)
+            self._record_turn(COALESCED_PATH, LLMCallCounter(), start)
+        return answer
+
+    async def _aprocess_turn(self, user_message: str, user_id: str) -> str:
+        """Esecuzione di un turno async (vedi aprocess_message)"""
+        counter = LLMCallCounter()
+        start = time.perf_counter()
+        path = self.agent_path
+
+        try:
+            cache_key = self._answer_cache_key(user_message, user_id)
+            if cache_key is not None:
+                cached = await self.answer_cache.aget(cache_key)
+                if cached is not None:
+                    path = ANSWER_CACHE_PATH
+                    self._save_turn(user_id, user_message, cached)
+                    return cached
+
+            intent = self._route(user_message, user_id)
+            if intent != AGENT:
+                answer = await self.db_search.asearch(
+                    user_message, config={"callbacks": [counter]}
+                )
+                if self._is_valid_tool_answer(answer):
+                    path = f"fast_path:{intent}"
+                    self._save_turn(user_id, user_message, answer)
+                    if cache_key is not None:
+                        await self.answer_cache.aput(cache_key, answer)
+                    return answer
+
+            enhanced_message = f"[USER_ID: {user_id}] {user_message}"
+
+            speculation = self._start_speculation(user_message, is_async=True)
+            try:
+                result = await self.agent_with_history.ainvoke(
+                    {"input": enhanced_message},
+                    config={"configurable": {"session_id": user_id}, "callbacks": [counter]},
+                )
+            finally:
+                self._finish_speculation(speculation)
+
+            output = result.get("output", "")
+
+            if self._needs_fallback(output):
+                return await self._afallback_response(user_message, user_id)
+
+            if self._cacheable(cache_key, counter):
+                await self.answer_cache.aput(cache_key, output)
+            return output
+
+        except Exception as e:
+            print(f"Error in aprocess_message: {str(e)}")
+            return await self._afallback_response(user_message, user_id)
+
+        finally:
+            self._record_turn(path, counter, start)
+
+    async def astream_message(
+        self, user_message: str, user_id: str
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Processa messaggio in streaming tramite astream_events.
+
+        Yields:
+            Eventi {"type": ..., "content": ...}:
+            - "status": un tool è stato avviato (es. ricerca nel catalogo)
+            - "token": frammento della Final Answer appena generato
+            - "end": risposta completa (fa fede sui token già inviati)
+        """
+        counter = LLMCallCounter()
+        start = time.perf_counter()
+        path = self.agent_path
+
+        try:
+            # Risposta in cache: inviata in un unico frammento
+            cache_key = self._answer_cache_key(user_message, user_id)
+            if cache_key is not None:
+                cached = await self.answer_cache.aget(cache_key)
+                if cached is not None:
+                    path = ANSWER_CACHE_PATH
+                    self._save_turn(user_id, user_message, cached)
+                    yield {"type": "token", "content": cached}
+                    yield {"type": "end", "content": cached}
+                    return
+
+            # Fast-path: stream diretto della risposta di movie_database_search
+            intent = self._route(user_message, user_id)
+            if intent != AGENT:
+                yield {"type": "status", "content": TOOL_STATUS_MESSAGES["movie_database_search"]}
+
+                answer = ""
+                failed = False
+                async for token in self.db_search.astream(
+                    user_message, config={"callbacks": [counter]}
+                ):
+                    # L'errore del tool arriva come frammento a sé: controllato prima
+                    # di inviarlo, all'utente va solo la risposta del fallback
+                    # (un errore a metà risposta è comunque sostituito dall'"end")
+                    if not self._is_valid_tool_answer(token):
+                        failed = True
+                        break
+                    answer += token
+                    yield {"type": "token", "content": token}
+
+                if not failed and self._is_valid_tool_answer(answer):
+                    path = f"fast_path:{intent}"
+                    self._save_turn(user_id, user_message, answer)
+                    if cache_key is not None:
+                        await self.answer_cache.aput(cache_key, answer)
+                    yield {"type": "end", "content": answer}
+                    return
+
+            async for event in self._astream_agent(
+                user_message, user_id, counter, cache_key
+            ):
+                yield event
+
+        finally:
+            self._record_turn(path, counter, start)
+
+    async def _astream_agent(
+        self,
+        user_message: str,
+        user_id: str,
+        counter: LLMCallCounter,
+        cache_key: Optional[CacheKey] = None,
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Streaming del ReAct agent con history (vedi astream_message)"""
+        enhanced_message = f"[USER_ID: {user_id}] {user_message}"
+
+        # Testo generato e caratteri di Final Answer già inviati, per run LLM
+        llm_buffers: Dict[str, str] = {}
+        emitted: Dict[str, int] = {}
+        output = ""
+
+        # Run dei tools return_direct: la loro risposta va in streaming così com'è,
+        # ma solo se è l'unico tool avviato nel passo corrente dell'agent
+        direct_tool_runs = set()
+        step_tool_runs = set()
+
+        speculation = self._start_speculation(user_message, is_async=True)
+        try:
+            async for event in self.agent_with_history.astream_events(
+                {"input": enhanced_message},
+                config={"configurable": {"session_id": user_id}, "callbacks": [counter]},
+                version="v2",
+            ):
+                kind = event["event"]
+
+                if kind == "on_chat_model_start" and AGENT_LLM_TAG in event.get(
+                    "tags", []
+                ):
+                    # Nuovo passo di ragionamento: nuove tool call
+                    step_tool_runs.clear()
+
+                elif kind == "on_tool_start":
+                    status = TOOL_STATUS_MESSAGES.get(event["name"])
+                    if status:
+                        yield {"type": "status", "content": status}
+                    step_tool_runs.add(event["run_id"])
+                    if event["name"] in self.config.direct_return_tools:
+                        direct_tool_runs.add(event["run_id"])
+
+                elif kind == "on_chat_model_stream" and ANSWER_LLM_TAG in event.get(
+                    "tags", []
+                ):
+                    # Risposta di un tool return_direct: è già la risposta finale
+                    parents = set(event.get("parent_ids", []))
+                    if len(step_tool_runs) == 1 and direct_tool_runs & step_tool_runs & parents:
+                        content = event["data"]["chunk"].content
+                        if content:
+                            yield {"type": "token", "content": content}
+
+                elif kind == "on_chat_model_stream" and AGENT_LLM_TAG in event.get(
+                    "tags", []
+                ):
+                    run_id = event["run_id"]
+                    buffer = llm_buffers.get(run_id, "") + event["data"]["chunk"].content
+                    llm_buffers[run_id] = buffer
+
+                    if self.config.agent_mode == "react":
+                        # ReAct: solo il testo dopo "Final Answer:" è destinato all'utente
+                        marker_pos = buffer.find(FINAL_ANSWER_MARKER)
+                        if marker_pos == -1:
+                            continue
+                        answer = buffer[marker_pos + len(FINAL_ANSWER_MARKER) :].lstrip()
+                    elif self._streams_live(event.get("tags", [])):
+                        # Sintesi della modalità plan: nessun tool, è la risposta finale
+                        answer = buffer
+                    else:
+                        # Run che può chiamare tools: inviata alla fine, se non ne chiama
+                        continue
+
+                    delta = answer[emitted.get(run_id, 0) :]
+                    emitted[run_id] = len(answer)
+                    if delta:
+                        yield {"type": "token", "content": delta}
+
+                elif (
+                    kind == "on_chat_model_end"
+                    and self.config.agent_mode != "react"
+                    and AGENT_LLM_TAG in event.get("tags", [])
+                    and not self._streams_live(event.get("tags", []))
+                ):
+                    # Preambolo accanto alle tool call o piano: mai inviato all'utente
+                    message = event["data"].get("output")
+                    if getattr(message, "tool_calls", None):
+                        continue
+                    run_id = event["run_id"]
+                    answer = llm_buffers.get(run_id) or getattr(message, "content", "") or ""
+                    delta = answer[emitted.get(run_id, 0) :]
+                    emitted[run_id] = len(answer)
+                    if delta:
+                        yield {"type": "token", "content": delta}
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # Evento di chiusura del runnable radice: contiene l'output finale
+                    result = event["data"].get("output") or {}
+                    output = result.get("output", "") if isinstance(result, dict) else ""
+
+            if self._needs_fallback(output):
+                output = await self._afallback_response(user_message, user_id)
+            elif self._cacheable(cache_key, counter):
+                await self.answer_cache.aput(cache_key, output)
+
+        except Exception as e:
+            print(f"Error in astream_message: {str(e)}")
+            output = await self._afallback_response(user_message, user_id)
+
+        finally:
+            self._finish_speculation(speculation)
+
+        yield {"type": "end", "content": output}
+
+    def _streams_live(self, tags: List[str]) -> bool:
+        """Token dell'agent inviati man mano: solo la sintesi della modalità plan"""
+        return self.config.agent_mode == "plan" and PLAN_LLM_TAG not in tags
+
+    def _record_turn(self, path: str, counter: LLMCallCounter, start: float) -> None:
+        """Registra chiamate LLM, token, latenza e iterazioni dell'agent del turno"""
+        self.turn_stats.record(
+            path,
+            counter,
+            time.perf_counter() - start,
+            agent_iterations=counter.tagged_calls.get(AGENT_LLM_TAG, 0),
+            synthesis_calls_saved=counter.direct_returns,
+        )
+
+    def _start_speculation(self, user_message: str, is_async: bool = False):
+        """Avvia la ricerca sul catalogo col messaggio grezzo (None se disabilitata)"""
+        if not self.config.enable_speculative_retrieval:
+            return None
+        speculation = self.db_search.speculation
+        return speculation.astart(user_message) if is_async else speculation.start(user_message)
+
+    def _finish_speculation(self, search) -> None:
+        """Chiude la ricerca speculativa del turno, scartandola se non è stata usata"""
+        if search is not None:
+            self.db_search.speculation.finish(search)
+
+    def _turn_flight_key(self, user_message: str, user_id: str) -> Optional[str]:
+        """
+        Chiave di coalescing di un turno, solo per history vuota e utenti senza
+        profilo (None altrimenti): il turno del primo chiamante porta il suo
+        [USER_ID] e può leggerne lo storico, la risposta non deve passare ad altri
+        """
+        if self.turn_flights is None or self._session_store.get(user_id).messages:
+            return None
+        if self._profile_bucket(user_id) != ANONYMOUS_BUCKET:
+            return None
+        return normalize_question(user_message)
+
+    def _answer_cache_key(self, user_message: str, user_id: str) -> Optional[CacheKey]:
+        """
+        Chiave della cache semantica, o None se la cache è disabilitata o se la
+        sessione ha già una history: la risposta può dipendere dalla conversazione
+        """
+        if self.answer_cache is None:
+            return None
+        if self._session_store.get(user_id).messages:
+            return None
+        return self.answer_cache.make_key(user_message, user_id)
+
+    def _cacheable(self, cache_key: Optional[CacheKey], counter: LLMCallCounter) -> bool:
+        """Risposta riusabile da altri utenti: mai se il turno ha letto lo storico dell'utente"""
+        return cache_key is not None and USER_HISTORY_TOOL not in counter.tools_used
+
+    def _profile_bucket(self, user_id: str) -> str:
+        """Bucket del profilo: preferenze note nella collection users, o anonymous"""
+        try:
+            records = self.db_manager.get_metadatas(self.users_store, where={"user_id": user_id})
+        except Exception:
+            return ANONYMOUS_BUCKET
+
+        preferences = {
+            preference.strip()
+            for metadata in records
+            for preference in (metadata.get("preferences") or "").split(",")
+            if preference.strip()
+        }
+        return "|".join(sorted(preferences)) or ANONYMOUS_BUCKET
+
+    def _route(self, user_message: str, user_id: str) -> str:
+        """Intent del messaggio (AGENT se il router è disabilitato)"""
+        if self.intent_router is None:
+            return AGENT
+        history = self._session_store.get(user_id).messages
+        return self.intent_router.route(user_message, history)
+
+    def _needs_fallback(self, output: str) -> bool:
+        """Output vuoto, messaggio di errore dell'agent o errore di un tool return_direct"""
+        return (
+            not output
+            or "I'm sorry" in output
+            or "mistake" in output
+            or not self._is_valid_tool_answer(output)
+        )
+
+    def _is_valid_tool_answer(self, answer: str) -> bool:
+        """Una risposta di tool vuota o di errore fa ripiegare sull'agent"""
+        return bool(answer) and not answer.startswith("❌")
+
+    def _save_turn(self, user_id: str, user_message: str, answer: str) -> None:
+        """Registra nella session history un turno servito senza AgentExecutor"""
+        self._session_store.get(user_id).add_messages(
+            [
+                HumanMessage(content=f"[USER_ID: {user_id}] {user_message}"),
+                AIMessage(content=answer),
+            ]
+        )
+
     def _fallback_response(self, user_message: str, user_id: str) -> str:
         """
         Risposta di fallback quando l'agent ReAct fallisce
@@ -260,7 +879,98 @@ Prova a chiedermi:
         except:
             return "Mi dispiace, sto avendo difficoltà tecniche. Riprova tra qualche istante."
 
+    async def _afallback_response(self, user_message: str, user_id: str) -> str:
+        """
+        Versione async di _fallback_response
+        """
+        try:
+            db_search_tool = None
+            for tool in self.tools:
+                if "movie_database_search" in str(tool.name).lower():
+                    db_search_tool = tool
+                    break
+
+            if db_search_tool and "tensione" in user_message.lower():
+                result = await db_search_tool.ainvoke(
+                    {"query": "tensione thriller suspense"}
+                )
+                return f"Ecco alcuni suggerimenti di film che potrebbero interessarti:\n\n{result}"
+
+            return self._fallback_response(user_message, user_id)
+
+        except Exception:
+            # Non intercetta CancelledError: la cancellazione del turno deve propagarsi
+            return "Mi dispiace, sto avendo difficoltà tecniche. Riprova tra qualche istante."
+
     def reset_user_history(self, user_id: str) -> None:
         """Azzera la history di un utente"""
-        if user_id in self._session_store:
-            del self._session_store[user_id]
+        self._session_store.delete(user_id)
+
+    def get_collections_status(self) -> Dict[str, Dict[str, Any]]:
+        """Stato delle collections films/users (sync, ricostruzione, degradata)"""
+        return self.db_manager.collections_status()
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Statistiche del session store (sessioni, messaggi, memoria, eviction)"""
+        return self._session_store.stats()
+
+    def get_history_stats(self) -> Dict[str, Any]:
+        """Statistiche del windowing della history (token risparmiati per turno)"""
+        return self.history_manager.stats()
+
+    def get_query_rewrite_stats(self) -> Dict[str, Any]:
+        """Statistiche dello stage di query rewriting condiviso"""
+        return self.query_rewriter.stats()
+
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """Hit rate e latenza risparmiata dalla ricerca speculativa sul catalogo"""
+        return self.db_search.speculation.stats()
+
+    def get_hybrid_retrieval_stats(self) -> Optional[Dict[str, Any]]:
+        """Ricerche risolte per entità (senza embedding), fuse con RRF o solo vettoriali"""
+        return self.db_search.hybrid.stats() if self.db_search.hybrid else None
+
+    def get_metadata_filter_stats(self) -> Dict[str, Any]:
+        """Ricerche filtrate, film candidati medi e filtri senza risultati"""
+        return self.db_manager.films_metadata.stats()
+
+    def get_field_index_stats(self) -> Optional[Dict[str, Any]]:
+        """Vettori per campo e tipi di query serviti dalla ricerca multi-campo"""
+        return self.db_search.field_index.stats() if self.db_search.field_index else None
+
+    def get_answer_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit/miss ed eviction della cache semantica delle risposte"""
+        return self.answer_cache.stats() if self.answer_cache else None
+
+    def get_llm_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit per livello (memoria/disco) della cache delle chiamate LLM"""
+        return self.llm_cache.stats() if self.llm_cache else None
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Esecuzioni effettive e richieste servite da un'esecuzione già in corso"""
+
+        def _stats(flights: Optional[SingleFlight]) -> Optional[Dict[str, Any]]:
+            return flights.stats() if flights else None
+
+        return {
+            "movie_database_search": _stats(self.db_search.flights),
+            "web_movie_research": _stats(self.web_research.flights),
+            "agent_turns": _stats(self.turn_flights),
+        }
+
+    def get_embedding_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit/miss e chiamate API della cache persistente degli embeddings"""
+        cache = self.db_manager.embedding_cache
+        return cache.stats() if cache else None
+
+    def get_query_embedding_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit rate e latenza risparmiata dalla LRU degli embeddings delle query"""
+        cache = self.db_manager.query_cache
+        return cache.stats() if cache else None
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Intent instradati e chiamate LLM/latenza medie per percorso"""
+        return {
+            "router": self.intent_router.stats() if self.intent_router else None,
+            "paths": self.turn_stats.stats(),
+        }
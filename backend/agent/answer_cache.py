@@ -0,0 +1,235 @@
+"""
+Cache semantica delle risposte dell'agent.
+
+Domande quasi identiche ("film di tensione", "film di tensione!") ricevono la
+stessa risposta senza rieseguire l'agent. La chiave è composta da:
+- la domanda normalizzata (minuscole, spazi e punteggiatura finale), usata per
+  il match esatto senza chiamate di embedding
+- l'embedding della domanda normalizzata, confrontato per similarità coseno
+  con le voci già in cache (soglia configurabile)
+- un bucket grossolano del profilo utente: risposte personalizzate non passano
+  mai da un profilo all'altro
+
+Eviction LRU con limite di voci + TTL; .invalidate() svuota la cache (chiamato
+quando la collection films viene ricostruita).
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_SPACES_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_question(question: str) -> str:
+    """Minuscole, spazi compattati, senza punteggiatura finale"""
+    text = _SPACES_RE.sub(" ", question.strip().lower())
+    return _TRAILING_PUNCT_RE.sub("", text)
+
+
+@dataclass
+class CacheKey:
+    """Chiave di lookup: l'embedding viene calcolato solo se serve"""
+
+    normalized: str
+    bucket: str
+    vector: Optional[np.ndarray] = None
+
+
+@dataclass
+class _Entry:
+    key: CacheKey
+    answer: str
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """
+    Args:
+        embeddings: modello di embedding per le domande
+        bucket_resolver: user_id -> bucket del profilo (memoizzato)
+        threshold: similarità coseno minima per un hit semantico
+        max_entries: numero massimo di risposte in cache (LRU)
+        ttl_seconds: durata di una risposta in cache (None = nessuna scadenza)
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        bucket_resolver: Callable[[str], str],
+        threshold: float = 0.92,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 1800,
+    ):
+        self.embeddings = embeddings
+        self.bucket_resolver = bucket_resolver
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # (bucket, domanda normalizzata) -> voce: una sola voce per domanda
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._buckets: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # -----------------------------------------------------------------------------
+    # API
+    # -----------------------------------------------------------------------------
+    def make_key(self, question: str, user_id: str) -> CacheKey:
+        return CacheKey(normalize_question(question), self._bucket(user_id))
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        answer = self._get_exact(key)
+        if answer is not None:
+            return answer
+        key.vector = self._embed(key.normalized)
+        return self._get_semantic(key)
+
+    async def aget(self, key: CacheKey) -> Optional[str]:
+        answer = self._get_exact(key)
+        if answer is not None:
+            return answer
+        key.vector = await self._aembed(key.normalized)
+        return self._get_semantic(key)
+
+    def put(self, key: CacheKey, answer: str) -> None:
+        if key.vector is None:
+            key.vector = self._embed(key.normalized)
+        self._put(key, answer)
+
+    async def aput(self, key: CacheKey, answer: str) -> None:
+        if key.vector is None:
+            key.vector = await self._aembed(key.normalized)
+        self._put(key, answer)
+
+    def invalidate(self) -> None:
+        """Svuota la cache (es. catalogo film ricostruito)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # -----------------------------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------------------------
+    def _bucket(self, user_id: str) -> str:
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is not None:
+                self._buckets.move_to_end(user_id)
+                return bucket
+
+        bucket = self.bucket_resolver(user_id)
+
+        with self._lock:
+            self._buckets[user_id] = bucket
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return bucket
+
+    def _get_exact(self, key: CacheKey) -> Optional[str]:
+        entry_id = (key.bucket, key.normalized)
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(entry_id)
+            self.exact_hits += 1
+            return entry.answer
+
+    def _get_semantic(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            if key.vector is None:
+                self.misses += 1
+                return None
+
+            best_id, best_score = None, self.threshold
+            for entry_id, entry in self._entries.items():
+                if entry.key.bucket != key.bucket:
+                    continue
+                score = float(np.dot(entry.key.vector, key.vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.semantic_hits += 1
+            return self._entries[best_id].answer
+
+    def _put(self, key: CacheKey, answer: str) -> None:
+        if key.vector is None:
+            return
+        entry_id = (key.bucket, key.normalized)
+        with self._lock:
+            # Stessa domanda (dopo TTL o bypass): sostituisce la voce esistente
+            self._entries.pop(entry_id, None)
+            self._entries[entry_id] = _Entry(key, answer, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _evict_expired(self) -> None:
+        if not self.ttl_seconds:
+            return
+        # Inserimento e accesso non coincidono: si scorre tutta la cache
+        now = time.monotonic()
+        expired = [
+            entry_id
+            for entry_id, entry in self._entries.items()
+            if now - entry.created_at >= self.ttl_seconds
+        ]
+        for entry_id in expired:
+            del self._entries[entry_id]
+            self.evictions += 1
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        # Un errore di embedding degrada a cache miss, non fa fallire il turno
+        try:
+            return self._normalize(self.embeddings.embed_query(text))
+        except Exception as e:
+            print(f"⚠️ Answer cache: embedding non disponibile ({e})")
+            return None
+
+    async def _aembed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            return self._normalize(await self.embeddings.aembed_query(text))
+        except Exception as e:
+            print(f"⚠️ Answer cache: embedding non disponibile ({e})")
+            return None
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
@@ -0,0 +1,206 @@
+"""
+History manager: finestra sugli ultimi k turni + riassunto progressivo.
+
+Ad ogni turno, prima dell'AgentExecutor:
+1) i turni oltre gli ultimi k vengono riassunti (a blocchi) in un unico
+   SystemMessage, che sostituisce i messaggi originali nella session history
+2) la history risultante viene tagliata per rispettare il budget di token
+3) si registra quanti token sono stati risparmiati rispetto alla history completa
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+    trim_messages,
+)
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+SUMMARY_PREFIX = "Riassunto della conversazione precedente: "
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "Aggiorna il riassunto di una conversazione tra un utente e l'assistente film Netflix.\n"
+            "Conserva preferenze, generi, mood, film citati o già consigliati e richieste aperte.\n"
+            "Scrivi in italiano, in modo conciso, senza spoiler. Restituisci solo il riassunto.",
+        ),
+        (
+            "human",
+            "Riassunto attuale:\n{summary}\n\nNuovi scambi da integrare:\n{new_lines}",
+        ),
+    ]
+)
+
+
+class HistoryManager:
+    """
+    Applica Config.conversation_memory_k alla chat history iniettata nel prompt.
+
+    Args:
+        llm: LLM usato per il riassunto e per il conteggio dei token
+        k: numero di turni (domanda + risposta) mantenuti alla lettera
+        max_tokens: budget massimo di token per {chat_history}
+        fold_batch_turns: turni in eccesso da accumulare prima di riassumere
+            (evita una chiamata LLM di riassunto ad ogni turno)
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        k: int = 10,
+        max_tokens: int = 2000,
+        fold_batch_turns: int = 2,
+    ):
+        self.llm = llm
+        self.k = k
+        self.max_tokens = max_tokens
+        self.fold_batch_turns = fold_batch_turns
+        self.summary_chain = SUMMARY_PROMPT | llm | StrOutputParser()
+
+        # Metriche
+        self.turns = 0
+        self.summaries = 0
+        self.tokens_saved_total = 0
+        self.last_turn: Dict[str, int] = {}
+
+    # -------------------------------------------------------------------------
+    # Runnable da anteporre all'AgentExecutor
+    # -------------------------------------------------------------------------
+    def as_runnable(self) -> Runnable:
+        """RunnableLambda {input, chat_history} -> chat_history compattata"""
+        return RunnableLambda(self.prepare, afunc=self.aprepare, name="HistoryManager")
+
+    def prepare(
+        self, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None
+    ) -> List[BaseMessage]:
+        messages = list(inputs.get("chat_history") or [])
+        summary, folded_tokens, turns = self._split(messages)
+
+        if len(turns) >= self.k + self.fold_batch_turns:
+            old_turns, turns = turns[: -self.k], turns[-self.k :]
+            old_messages = [m for turn in old_turns for m in turn]
+            summary = self.summary_chain.invoke(self._summary_inputs(summary, old_messages))
+            folded_tokens += self._count(old_messages)
+            messages = self._rewrite(config, summary, folded_tokens, turns)
+
+        return self._window(messages, folded_tokens, summary)
+
+    async def aprepare(
+        self, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None
+    ) -> List[BaseMessage]:
+        messages = list(inputs.get("chat_history") or [])
+        summary, folded_tokens, turns = self._split(messages)
+
+        if len(turns) >= self.k + self.fold_batch_turns:
+            old_turns, turns = turns[: -self.k], turns[-self.k :]
+            old_messages = [m for turn in old_turns for m in turn]
+            summary = await self.summary_chain.ainvoke(
+                self._summary_inputs(summary, old_messages)
+            )
+            folded_tokens += self._count(old_messages)
+            messages = self._rewrite(config, summary, folded_tokens, turns)
+
+        return self._window(messages, folded_tokens, summary)
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+    def _split(
+        self, messages: List[BaseMessage]
+    ) -> Tuple[str, int, List[List[BaseMessage]]]:
+        """Separa il riassunto esistente (se presente) dai turni successivi"""
+        summary, folded_tokens = "", 0
+        if messages and messages[0].additional_kwargs.get("history_summary"):
+            summary = messages[0].content[len(SUMMARY_PREFIX) :]
+            folded_tokens = messages[0].additional_kwargs.get("folded_tokens", 0)
+            messages = messages[1:]
+
+        # Ogni turno inizia con un HumanMessage
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+
+        return summary, folded_tokens, turns
+
+    def _summary_inputs(self, summary: str, old_messages: List[BaseMessage]) -> Dict[str, str]:
+        return {
+            "summary": summary or "(nessuno)",
+            "new_lines": get_buffer_string(old_messages),
+        }
+
+    def _rewrite(
+        self,
+        config: Optional[RunnableConfig],
+        summary: str,
+        folded_tokens: int,
+        turns: List[List[BaseMessage]],
+    ) -> List[BaseMessage]:
+        """Sostituisce nella session history i turni riassunti con il riassunto"""
+        self.summaries += 1
+        summary_message = SystemMessage(
+            content=SUMMARY_PREFIX + summary,
+            additional_kwargs={"history_summary": True, "folded_tokens": folded_tokens},
+        )
+        messages = [summary_message] + [m for turn in turns for m in turn]
+
+        # RunnableWithMessageHistory espone l'oggetto history nel config
+        history = ((config or {}).get("configurable") or {}).get("message_history")
+        if history is not None:
+            history.clear()
+            history.add_messages(messages)
+
+        return messages
+
+    def _window(
+        self, messages: List[BaseMessage], folded_tokens: int, summary: str
+    ) -> List[BaseMessage]:
+        """Applica il budget di token e registra il risparmio del turno"""
+        stored_tokens = self._count(messages)
+        windowed = trim_messages(
+            messages,
+            max_tokens=self.max_tokens,
+            token_counter=self.llm,
+            strategy="last",
+            start_on="human",
+            include_system=True,
+        )
+        prompt_tokens = self._count(windowed)
+
+        # Token della history completa = history salvata - riassunto + turni originali riassunti
+        summary_tokens = self._count(messages[:1]) if summary else 0
+        full_tokens = stored_tokens - summary_tokens + folded_tokens
+        saved = max(full_tokens - prompt_tokens, 0)
+
+        self.turns += 1
+        self.tokens_saved_total += saved
+        self.last_turn = {
+            "full_history_tokens": full_tokens,
+            "prompt_history_tokens": prompt_tokens,
+            "tokens_saved": saved,
+        }
+        return windowed
+
+    def _count(self, messages: List[BaseMessage]) -> int:
+        if not messages:
+            return 0
+        return self.llm.get_num_tokens_from_messages(messages)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "k": self.k,
+            "max_tokens": self.max_tokens,
+            "turns": self.turns,
+            "summaries": self.summaries,
+            "tokens_saved_total": self.tokens_saved_total,
+            "last_turn": self.last_turn,
+        }
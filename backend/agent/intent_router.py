@@ -0,0 +1,101 @@
+"""
+Intent router: fast-path locale (regole, nessuna chiamata LLM) davanti al ReAct agent.
+
+- CATALOG_SEARCH: "consigliami un thriller", "film con Tom Hardy"
+- AVAILABILITY:   "Inception è su Netflix?", "is Roma available on Netflix"
+- AGENT:          tutto il resto (recensioni, personalizzazione, domande multi-step,
+                  follow-up che dipendono dalla history)
+
+I primi due intent vanno direttamente a movie_database_search, che restituisce
+già una risposta in italiano per l'utente: si evitano le iterazioni ReAct.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from tools.query_rewriter import needs_rewrite
+
+CATALOG_SEARCH = "catalog_search"
+AVAILABILITY = "availability"
+AGENT = "agent"
+
+# Richieste che richiedono altri tools o più passaggi di ragionamento
+_AGENT_RE = re.compile(
+    r"recension|opinion|parer|critic|reddit|community|cosa ne pens|review|"
+    r"what do people|"
+    # personalizzazione (user_conversation_history)
+    r"miei gusti|mi piac|ho visto|ho già visto|l'altra volta|ultima volta|preferenz|"
+    r"ricord|storico|per me\b|my taste|i liked|i watched|last time|"
+    # confronti e domande composte
+    r"confront|differenz|\bvs\b|meglio tra|e poi\b|inoltre|compare|difference|"
+    r"better than|"
+    # idoneità e fasce d'età: richiedono ricerca web, non solo il catalogo
+    r"adatt[oia] ai bambini|per bambini|\betà\b|vietato ai minori|\bkids\b|"
+    r"family-friendly|parental",
+    re.IGNORECASE,
+)
+
+_AVAILABILITY_RE = re.compile(
+    r"(?:\bè\b|\be'|c'è|\bsta\b|si trova|disponibil|posso (?:vedere|guardare)|"
+    r"\bis\b|\bavailable\b|can i (?:watch|stream)).*\bnetflix\b|"
+    r"\bnetflix\b.*(?:disponibil|c'è|\bha\b)",
+    re.IGNORECASE,
+)
+
+_CATALOG_RE = re.compile(
+    r"consigli|suggeri|raccomand|cerco|voglio (?:vedere|guardare|un film)|"
+    r"qualcosa di|\bfilm (?:di|con|horror|thriller|comic|drammatic|romantic|d'azione|"
+    r"d'animazione|fantascienza|sci-fi)|\bfilm\b.*\bdiretti da\b|"
+    r"recommend|suggest|looking for|movies? (?:with|about|by)",
+    re.IGNORECASE,
+)
+
+
+class IntentRouter:
+    """
+    Classifica il messaggio utente con regole locali.
+
+    Nel dubbio restituisce AGENT: un falso negativo costa solo le chiamate
+    LLM che il fast-path avrebbe risparmiato.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {CATALOG_SEARCH: 0, AVAILABILITY: 0, AGENT: 0}
+        self._lock = threading.Lock()
+
+    def classify(self, message: str, chat_history: Optional[List[Any]] = None) -> str:
+        """Intent del messaggio, senza aggiornare le statistiche"""
+        text = message.strip()
+
+        # Più domande nello stesso messaggio: serve il ragionamento dell'agent
+        if text.count("?") > 1 or _AGENT_RE.search(text):
+            return AGENT
+
+        # Follow-up anaforici ("e quello?", "consigliamene altri") dipendono dalla history
+        if chat_history and needs_rewrite(text):
+            return AGENT
+
+        if _AVAILABILITY_RE.search(text):
+            return AVAILABILITY
+
+        if _CATALOG_RE.search(text):
+            return CATALOG_SEARCH
+
+        return AGENT
+
+    def route(self, message: str, chat_history: Optional[List[Any]] = None) -> str:
+        """Classifica il messaggio e aggiorna le statistiche di routing"""
+        intent = self.classify(message, chat_history)
+        with self._lock:
+            self._counts[intent] += 1
+        return intent
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            fast = total - self._counts[AGENT]
+            return {
+                "routed": dict(self._counts),
+                "fast_path_ratio": round(fast / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,278 @@
+"""
+Session store per le chat history dell'agent.
+
+Backend disponibili:
+- InMemorySessionStore: dict LRU limitato per numero di sessioni + TTL di inattività
+- SQLiteSessionStore: history persistenti su SQLite con le stesse regole di eviction
+
+Entrambi espongono .get(session_id), .delete(session_id) e .stats().
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+
+def _message_size(message: BaseMessage) -> int:
+    """Stima in byte del contenuto di un messaggio (UTF-8)"""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False)
+    return len(content.encode("utf-8"))
+
+
+class SessionStore(ABC):
+    """Interfaccia comune dei session store"""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: Optional[float] = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.evicted_sessions = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> BaseChatMessageHistory:
+        """Recupera o crea la history di una sessione"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Elimina la history di una sessione"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Sessioni attive, messaggi, byte stimati ed eviction effettuate"""
+
+
+# -----------------------------------------------------------------------------
+# In-memory
+# -----------------------------------------------------------------------------
+class InMemorySessionStore(SessionStore):
+    """
+    OrderedDict in ordine di ultimo accesso: la testa è la sessione LRU.
+    L'eviction avviene a ogni get(): prima le sessioni scadute, poi le più
+    vecchie oltre max_sessions.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: Optional[float] = 3600):
+        super().__init__(max_sessions, ttl_seconds)
+        self._sessions: "OrderedDict[str, ChatMessageHistory]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> BaseChatMessageHistory:
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+
+            history = self._sessions.get(session_id)
+            if history is None:
+                history = ChatMessageHistory()
+                self._sessions[session_id] = history
+            self._sessions.move_to_end(session_id)
+            self._last_access[session_id] = now
+
+            while len(self._sessions) > self.max_sessions:
+                oldest_id, _ = self._sessions.popitem(last=False)
+                self._last_access.pop(oldest_id, None)
+                self.evicted_sessions += 1
+
+            return history
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._last_access.pop(session_id, None)
+
+    def _evict_expired(self, now: float) -> None:
+        if not self.ttl_seconds:
+            return
+        # Le sessioni sono ordinate per ultimo accesso: basta scorrere la testa
+        while self._sessions:
+            oldest_id = next(iter(self._sessions))
+            if now - self._last_access[oldest_id] < self.ttl_seconds:
+                break
+            del self._sessions[oldest_id]
+            del self._last_access[oldest_id]
+            self.evicted_sessions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            messages = [m for h in self._sessions.values() for m in h.messages]
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "messages": len(messages),
+                "approx_bytes": sum(_message_size(m) for m in messages),
+                "evicted_sessions": self.evicted_sessions,
+            }
+
+
+# -----------------------------------------------------------------------------
+# SQLite
+# -----------------------------------------------------------------------------
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """Chat history di una sessione salvata nella tabella messages"""
+
+    def __init__(self, store: "SQLiteSessionStore", session_id: str):
+        self._store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        # Una sessione scaduta non restituisce messaggi anche se l'eviction
+        # non è ancora passata (avviene solo sulle scritture)
+        rows = self._store._execute(
+            "SELECT m.message FROM messages m JOIN sessions s ON s.session_id = m.session_id "
+            "WHERE m.session_id = ? AND s.last_access >= ? ORDER BY m.id",
+            (self.session_id, self._store._cutoff()),
+        )
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        rows = [
+            (self.session_id, json.dumps(m, ensure_ascii=False), _message_size(msg))
+            for m, msg in zip(messages_to_dict(messages), messages)
+        ]
+        self._store._put(self.session_id, rows)
+
+    def clear(self) -> None:
+        self._store.delete(self.session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store persistente: sopravvive ai restart e può essere condiviso
+    tra più worker sullo stesso host.
+
+    Ultimo accesso ed eviction si aggiornano quando una sessione riceve nuovi
+    messaggi (una transazione per turno). Le letture rispettano comunque il TTL:
+    get() elimina la sessione richiesta se è scaduta, e i messaggi di una
+    sessione scaduta non vengono restituiti.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_sessions: int = 1000,
+        ttl_seconds: Optional[float] = 3600,
+    ):
+        super().__init__(max_sessions, ttl_seconds)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                message TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);
+            CREATE INDEX IF NOT EXISTS idx_sessions_access ON sessions(last_access);
+            """
+        )
+        self._conn.commit()
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    def _put(self, session_id: str, rows: List[Sequence[Any]]) -> None:
+        """Salva i messaggi, aggiorna l'ultimo accesso ed esegue l'eviction"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, message, size) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, last_access) VALUES (?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET last_access = excluded.last_access",
+                (session_id, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _cutoff(self) -> float:
+        """Ultimo accesso minimo di una sessione valida"""
+        return time.time() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def get(self, session_id: str) -> BaseChatMessageHistory:
+        if self.ttl_seconds:
+            with self._lock:
+                self._delete_sessions(
+                    "SELECT session_id FROM sessions WHERE session_id = ? AND last_access < ?",
+                    (session_id, self._cutoff()),
+                )
+                self._conn.commit()
+        return SQLiteChatMessageHistory(self, session_id)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Sessioni scadute, poi le più vecchie oltre max_sessions (lock già acquisito)"""
+        if self.ttl_seconds:
+            self._delete_sessions(
+                "SELECT session_id FROM sessions WHERE last_access < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        # Subquery con OFFSET: nessun parametro per sessione, qualunque sia max_sessions
+        self._delete_sessions(
+            "SELECT session_id FROM sessions "
+            "ORDER BY last_access DESC, session_id DESC LIMIT -1 OFFSET ?",
+            (self.max_sessions,),
+        )
+
+    def _delete_sessions(self, select_sql: str, params: Sequence[Any]) -> None:
+        self._conn.execute(f"DELETE FROM messages WHERE session_id IN ({select_sql})", params)
+        deleted = self._conn.execute(
+            f"DELETE FROM sessions WHERE session_id IN ({select_sql})", params
+        ).rowcount
+        self.evicted_sessions += max(deleted, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = self._execute("SELECT COUNT(*) FROM sessions")[0][0]
+        messages, approx_bytes = self._execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM messages"
+        )[0]
+        return {
+            "backend": "sqlite",
+            "sessions": sessions,
+            "messages": messages,
+            "approx_bytes": approx_bytes,
+            "evicted_sessions": self.evicted_sessions,
+        }
+
+
+def create_session_store(config) -> SessionStore:
+    """Istanzia il session store scelto in Config.session_store_backend"""
+    if config.session_store_backend == "sqlite":
+        return SQLiteSessionStore(
+            config.session_store_path,
+            max_sessions=config.session_max_sessions,
+            ttl_seconds=config.session_ttl_seconds,
+        )
+    if config.session_store_backend == "memory":
+        return InMemorySessionStore(
+            max_sessions=config.session_max_sessions,
+            ttl_seconds=config.session_ttl_seconds,
+        )
+    raise ValueError(f"Session store non supportato: {config.session_store_backend}")
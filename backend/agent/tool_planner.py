@@ -0,0 +1,188 @@
+"""
+ParallelToolPlanner: modalità "plan" dell'agent.
+
+Un turno costa al massimo due chiamate LLM e una sola attesa sui tools:
+1) Planning: l'LLM (con i tools in bind_tools) decide in un unico passo tutte
+   le chiamate ai tools indipendenti che servono
+2) Esecuzione concorrente delle tool call (asyncio con semaforo, oppure
+   thread pool limitato nel percorso sincrono, che copia i ContextVar del
+   turno: ricerca speculativa e filtri sui metadati restano visibili ai tools)
+3) Un solo passo di ragionamento che unisce tutte le osservazioni
+
+La latenza dei tools è quindi vicina a quella del tool più lento, non alla somma.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.agents import AgentFinish
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForChainRun,
+    CallbackManagerForChainRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import BaseTool
+
+# Tag dei passi di planning: il loro testo non va in streaming all'utente
+# (accompagna le tool call), salvo un piano che risponde senza tools
+PLAN_LLM_TAG = "movie_agent_plan"
+
+PLANNING_INSTRUCTIONS = """
+PLANNING:
+- Request ALL the independent tool calls you need in this single step: they run in parallel
+- You will see every result at once and must answer right after, without further tool calls"""
+
+
+class ParallelToolPlanner:
+    """
+    Esegue un turno plan -> tools in parallelo -> sintesi.
+
+    Args:
+        llm: chat model con supporto al tool calling
+        tools: tools disponibili
+        system_prompt: istruzioni di sistema dell'agent
+        max_concurrency: numero massimo di tool call eseguite insieme
+        direct_return_tools: tools il cui output, se è l'unica chiamata del piano,
+            è già la risposta finale (nessuna sintesi)
+    """
+
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        tools: Sequence[BaseTool],
+        system_prompt: str,
+        max_concurrency: int = 4,
+        direct_return_tools: Sequence[str] = (),
+    ):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_concurrency = max_concurrency
+        self.direct_return_tools = set(direct_return_tools)
+
+        self.llm = llm
+        self.planner = llm.bind_tools(list(tools)).with_config(tags=[PLAN_LLM_TAG])
+
+        self.prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", system_prompt + PLANNING_INSTRUCTIONS),
+                MessagesPlaceholder("chat_history"),
+                ("human", "{input}"),
+            ]
+        )
+
+    def as_runnable(self) -> Runnable:
+        """Runnable {input, chat_history} -> {"output": str}, come AgentExecutor"""
+        return RunnableLambda(self.invoke, afunc=self.ainvoke, name="ParallelToolPlanner")
+
+    # -------------------------------------------------------------------------
+    # Percorso sincrono: thread pool limitato
+    # -------------------------------------------------------------------------
+    def invoke(
+        self,
+        inputs: Dict[str, Any],
+        config: Optional[RunnableConfig] = None,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        messages = self._format(inputs)
+        plan: AIMessage = self.planner.invoke(messages, config=config)
+        if not plan.tool_calls:
+            return {"output": plan.content}
+
+        # Ogni tool call gira in una copia del contesto del turno (ContextVar)
+        with ContextThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            observations = list(
+                pool.map(lambda call: self._run_tool(call, config), plan.tool_calls)
+            )
+
+        direct = self._direct_output(plan, observations)
+        if direct is not None:
+            if run_manager is not None:
+                run_manager.on_agent_finish(self._direct_finish(direct))
+            return {"output": direct}
+
+        answer = self.llm.invoke(messages + [plan] + observations, config=config)
+        return {"output": answer.content}
+
+    def _run_tool(self, call: Dict[str, Any], config: Optional[RunnableConfig]) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._observation(call, f"Tool non disponibile: {call['name']}")
+        try:
+            return self._observation(call, tool.invoke(call["args"], config=config))
+        except Exception as e:
+            return self._observation(call, f"❌ Errore tool {call['name']}: {e}")
+
+    # -------------------------------------------------------------------------
+    # Percorso async: asyncio.gather con semaforo
+    # -------------------------------------------------------------------------
+    async def ainvoke(
+        self,
+        inputs: Dict[str, Any],
+        config: Optional[RunnableConfig] = None,
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Dict[str, str]:
+        messages = self._format(inputs)
+        plan: AIMessage = await self.planner.ainvoke(messages, config=config)
+        if not plan.tool_calls:
+            return {"output": plan.content}
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        observations = await asyncio.gather(
+            *(self._arun_tool(call, config, semaphore) for call in plan.tool_calls)
+        )
+
+        direct = self._direct_output(plan, observations)
+        if direct is not None:
+            if run_manager is not None:
+                await run_manager.on_agent_finish(self._direct_finish(direct))
+            return {"output": direct}
+
+        answer = await self.llm.ainvoke(
+            messages + [plan] + list(observations), config=config
+        )
+        return {"output": answer.content}
+
+    async def _arun_tool(
+        self,
+        call: Dict[str, Any],
+        config: Optional[RunnableConfig],
+        semaphore: asyncio.Semaphore,
+    ) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._observation(call, f"Tool non disponibile: {call['name']}")
+        async with semaphore:
+            try:
+                return self._observation(call, await tool.ainvoke(call["args"], config=config))
+            except Exception as e:
+                # CancelledError non è un Exception: la cancellazione si propaga
+                return self._observation(call, f"❌ Errore tool {call['name']}: {e}")
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+    def _format(self, inputs: Dict[str, Any]) -> List[BaseMessage]:
+        return self.prompt.format_messages(
+            input=inputs["input"], chat_history=inputs.get("chat_history") or []
+        )
+
+    def _observation(self, call: Dict[str, Any], output: Any) -> ToolMessage:
+        return ToolMessage(content=str(output), tool_call_id=call["id"], name=call["name"])
+
+    def _direct_output(
+        self, plan: AIMessage, observations: Sequence[ToolMessage]
+    ) -> Optional[str]:
+        """Output di un'unica tool call return_direct andata a buon fine"""
+        if len(plan.tool_calls) != 1 or plan.tool_calls[0]["name"] not in self.direct_return_tools:
+            return None
+        content = observations[0].content
+        return None if content.startswith("❌") else content
+
+    @staticmethod
+    def _direct_finish(output: str) -> AgentFinish:
+        # Log vuoto come AgentExecutor con return_direct: LLMCallCounter conta
+        # la sintesi evitata (direct_returns)
+        return AgentFinish(return_values={"output": output}, log="")
@@ -0,0 +1,56 @@
+"""
+Benchmark ReAct vs tool calling vs plan: iterazioni dell'agent, token e latenza per turno.
+
+L'intent router e le cache (risposte e chiamate LLM) sono disattivati, così ogni
+query passa dall'AgentExecutor.
+
+Uso (dalla cartella backend, con le API keys configurate):
+    python -m benchmarks.agent_mode_benchmark
+"""
+
+import uuid
+from dataclasses import replace
+
+from agent.agent import MovieChatAgent
+from config import Config
+
+SAMPLE_QUERIES = [
+    "Consigliami un thriller psicologico",
+    "Inception è su Netflix?",
+    "Cosa dicono le recensioni di Dune?",
+    "Consigliami qualcosa in base ai miei gusti",
+    "Confronta Inception e Tenet",
+    "Com'è The Dark Knight? È adatto ai ragazzi?",
+]
+
+MODES = ["react", "tool_calling", "plan"]
+
+
+def run_mode(mode: str) -> dict:
+    config = replace(
+        Config(),
+        agent_mode=mode,
+        enable_intent_router=False,
+        enable_answer_cache=False,
+        enable_llm_cache=False,
+    )
+    agent = MovieChatAgent(config)
+    agent.db_manager.wait_for_collections()
+
+    for query in SAMPLE_QUERIES:
+        agent.process_message(query, f"bench_{uuid.uuid4().hex[:8]}")
+
+    return agent.turn_stats.stats()[agent.agent_path]
+
+
+if __name__ == "__main__":
+    results = {mode: run_mode(mode) for mode in MODES}
+
+    print(f"{'metrica per turno':<22}" + "".join(f"{mode:>15}" for mode in MODES))
+    for key, label in [
+        ("avg_agent_iterations", "iterazioni agent"),
+        ("avg_llm_calls", "chiamate LLM"),
+        ("avg_tokens", "token"),
+        ("avg_latency_s", "latenza (s)"),
+    ]:
+        print(f"{label:<22}" + "".join(f"{results[mode][key]:>15}" for mode in MODES))
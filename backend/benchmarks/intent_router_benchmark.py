@@ -0,0 +1,90 @@
+"""
+Benchmark dell'intent router: chiamate LLM e latenza per turno con e senza fast-path.
+
+Uso (dalla cartella backend, con le API keys configurate):
+    python -m benchmarks.intent_router_benchmark
+    python -m benchmarks.intent_router_benchmark --dry-run   # solo classificazione, nessuna API
+"""
+
+import argparse
+import uuid
+from dataclasses import replace
+
+from agent.intent_router import IntentRouter
+from utils.metrics import TurnStats
+
+SAMPLE_QUERIES = [
+    "Consigliami un thriller psicologico",
+    "film di tensione",
+    "Inception è su Netflix?",
+    "c'è Interstellar su Netflix?",
+    "voglio vedere un film di fantascienza",
+    "film con Leonardo DiCaprio",
+    "Cosa dicono le recensioni di Dune?",
+    "Consigliami qualcosa in base ai miei gusti",
+    "Confronta Inception e Tenet",
+    "Com'è The Dark Knight?",
+    "Cerco un film horror, è adatto ai bambini?",
+    "film di animazione per bambini",
+    "Joker è vietato ai minori?",
+    "Da che età si può vedere Parasite?",
+    "family-friendly movies with Tom Hanks",
+    "Is Interstellar ok for kids? Any parental guidance?",
+]
+
+
+def run_dry() -> None:
+    router = IntentRouter()
+    for query in SAMPLE_QUERIES:
+        print(f"{router.route(query):<16} {query}")
+    print(router.stats())
+
+
+def run_benchmark() -> None:
+    from agent.agent import MovieChatAgent
+    from config import Config
+
+    # Senza cache: ogni turno misura il costo reale del suo percorso
+    config = replace(Config(), enable_answer_cache=False, enable_llm_cache=False)
+    agent = MovieChatAgent(config)
+    agent.db_manager.wait_for_collections()
+    router = agent.intent_router or IntentRouter()
+
+    # Ogni query con user_id nuovo: history vuota, turni confrontabili
+    agent.intent_router = None
+    for query in SAMPLE_QUERIES:
+        agent.process_message(query, f"bench_{uuid.uuid4().hex[:8]}")
+    baseline = agent.turn_stats.stats()[agent.agent_path]
+
+    agent.intent_router = router
+    agent.turn_stats = TurnStats()
+    for query in SAMPLE_QUERIES:
+        agent.process_message(query, f"bench_{uuid.uuid4().hex[:8]}")
+    routed = agent.turn_stats.stats()
+
+    turns = sum(p["turns"] for p in routed.values())
+    llm_calls = sum(p["llm_calls"] for p in routed.values())
+    latency = sum(p["latency_s"] for p in routed.values())
+
+    print(f"{'percorso':<28}{'turni':>6}{'LLM/turno':>11}{'latenza/turno':>15}")
+    print(f"{'solo agent (baseline)':<28}{baseline['turns']:>6}"
+          f"{baseline['avg_llm_calls']:>11}{baseline['avg_latency_s']:>14}s")
+    for path, entry in sorted(routed.items()):
+        print(f"{path:<28}{entry['turns']:>6}"
+              f"{entry['avg_llm_calls']:>11}{entry['avg_latency_s']:>14}s")
+
+    print()
+    print(f"Chiamate LLM per turno: {baseline['avg_llm_calls']} -> {llm_calls / turns:.2f} "
+          f"(-{baseline['avg_llm_calls'] - llm_calls / turns:.2f})")
+    print(f"Latenza media per turno: {baseline['avg_latency_s']}s -> {latency / turns:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="solo classificazione")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        run_dry()
+    else:
+        run_benchmark()
@@ -0,0 +1,119 @@
+"""
+Benchmark della rappresentazione dei film: documento unico vs un vettore per
+campo di enhanced_description più titolo/regista/cast/generi (pesi per tipo
+di query). Le query su entità ("film con Leonardo DiCaprio") verificano che la
+rappresentazione multi-campo non perda recall senza la ricerca ibrida.
+
+Per ogni query con film rilevanti noti misura recall@k e MRR, più la latenza
+della sola ricerca (gli embeddings delle query sono calcolati una volta prima,
+e sono identici per le due rappresentazioni).
+
+Uso (dalla cartella backend, con le API keys configurate):
+    python -m benchmarks.multi_vector_benchmark
+    python -m benchmarks.multi_vector_benchmark --k 3 --repeat 50
+    python -m benchmarks.multi_vector_benchmark --dry-run   # solo tipo di query, nessuna API
+"""
+
+import argparse
+import time
+from dataclasses import replace
+from typing import Callable, Dict, List
+
+from database.field_vectors import FilmFieldIndex, classify_query
+
+# Query -> titoli rilevanti nel catalogo
+LABELED_QUERIES: Dict[str, List[str]] = {
+    "film che mettono ansia e paranoia": ["Get Out", "Parasite"],
+    "un film sui sogni dentro i sogni": ["Inception"],
+    "viaggio nello spazio tra buchi neri e dilatazione del tempo": ["Interstellar"],
+    "la storia di un'evasione dal carcere e della speranza": ["The Shawshank Redemption"],
+    "inseguimenti nel deserto post-apocalittico": ["Mad Max: Fury Road"],
+    "una famiglia povera si infiltra nella casa di una famiglia ricca": ["Parasite"],
+    "regia non lineare con dialoghi taglienti": ["Pulp Fiction"],
+    "la discesa nella follia di un uomo emarginato": ["Joker"],
+    "atmosfera cupa e un eroe tormentato contro il caos": ["The Dark Knight"],
+    "fotografia spettacolare e colori saturi": ["Mad Max: Fury Road"],
+    "film che fanno piangere di commozione": ["The Shawshank Redemption", "Interstellar"],
+    "satira sociale sulle differenze di classe": ["Parasite", "Get Out"],
+    # Entità: titolo, regista, cast
+    "Inception": ["Inception"],
+    "film con Leonardo DiCaprio": ["Inception"],
+    "film di Christopher Nolan": ["Inception", "The Dark Knight", "Interstellar"],
+    "Heath Ledger": ["The Dark Knight"],
+}
+
+
+def run_dry() -> None:
+    for query in LABELED_QUERIES:
+        print(f"{classify_query(query):<10} {query}")
+
+
+def _evaluate(
+    name: str,
+    search: Callable[[str, List[float]], List[str]],
+    query_vectors: Dict[str, List[float]],
+    k: int,
+    repeat: int,
+) -> None:
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for query, relevant in LABELED_QUERIES.items():
+        titles = search(query, query_vectors[query])
+        recalls.append(len(set(titles[:k]) & set(relevant)) / len(relevant))
+        rank = next((i for i, title in enumerate(titles, start=1) if title in relevant), None)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            search(query, query_vectors[query])
+        latencies.append((time.perf_counter() - start) / repeat * 1000)
+
+    count = len(LABELED_QUERIES)
+    print(
+        f"{name:<10}{sum(recalls) / count:>10.3f}{sum(reciprocal_ranks) / count:>8.3f}"
+        f"{sum(latencies) / count:>12.3f}"
+    )
+
+
+def run_benchmark(k: int, repeat: int) -> None:
+    from config import Config
+    from database.vector_database import DualVectorDatabase
+
+    db = DualVectorDatabase(replace(Config(), film_representation="multi"))
+    db.load_collections()
+    db.wait_for_collections()
+    fields: FilmFieldIndex = db.films_fields
+    if not fields.ready:
+        raise SystemExit("Indice multi-campo non disponibile: controlla i log")
+
+    # Embeddings delle query una volta sola: la latenza misura solo la ricerca
+    query_vectors = {query: db.embeddings.embed_query(query) for query in LABELED_QUERIES}
+
+    def single(query: str, vector: List[float]) -> List[str]:
+        docs = db.films_store.similarity_search_by_vector(vector, k=k)
+        return [doc.metadata.get("title") for doc in docs]
+
+    def multi(query: str, vector: List[float]) -> List[str]:
+        _, weights = fields.weights_for(query)
+        return [doc.metadata.get("title") for doc, _ in fields.search_by_vector(vector, weights, k=k)]
+
+    print(f"\n📊 {len(LABELED_QUERIES)} query, k={k}, backend {db.backend.name}")
+    print(f"{'layout':<10}{'recall@k':>10}{'MRR':>8}{'ms/query':>12}")
+    _evaluate("single", single, query_vectors, k, repeat)
+    _evaluate("multi", multi, query_vectors, k, repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Documento unico vs multi-vettore per film")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20, help="ripetizioni per la latenza")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        run_dry()
+    else:
+        run_benchmark(args.k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark della soglia di riuso della ricerca speculativa.
+
+Coppie (messaggio dell'utente, query che l'agent passa a movie_database_search)
+etichettate a mano: "riuso" se i risultati della ricerca sul messaggio grezzo
+vanno bene anche per la query del tool. Per ogni soglia misura hit rate sulle
+coppie da riusare e falsi riusi sulle altre, con la similarità attuale (parole
+di contenuto) e con il vecchio Jaccard sul testo intero. Nessuna API.
+
+Uso (dalla cartella backend):
+    python -m benchmarks.speculative_similarity_benchmark
+"""
+
+import re
+from typing import Callable, List, Tuple
+
+from tools.speculative_retrieval import query_similarity
+
+# (messaggio, query del tool, riuso corretto)
+LABELED_PAIRS: List[Tuple[str, str, bool]] = [
+    ("Consigliami un thriller psicologico", "psychological thriller", True),
+    ("Consigliami un thriller psicologico", "thriller psicologico", True),
+    ("film di tensione", "tense suspense movies", False),
+    ("Inception è su Netflix?", "Inception", True),
+    ("c'è Interstellar su Netflix?", "Interstellar availability", True),
+    ("voglio vedere un film di fantascienza", "sci-fi movies", False),
+    ("voglio vedere un film di fantascienza", "film di fantascienza", True),
+    ("film con Leonardo DiCaprio", "Leonardo DiCaprio movies", True),
+    ("film con Leonardo DiCaprio", "DiCaprio", True),
+    ("Com'è The Dark Knight?", "The Dark Knight", True),
+    ("Cosa mi consigli dopo aver visto Parasite?", "films similar to Parasite", True),
+    ("Cerco un film di Nolan con colonna sonora epica", "Christopher Nolan epic soundtrack", True),
+    ("un film di Tarantino con dialoghi taglienti", "Tarantino sharp dialogue", True),
+    ("qualcosa di leggero per stasera", "light comedy", False),
+    ("film horror che fanno davvero paura", "scary horror films", True),
+    ("Confronta Inception e Tenet", "Inception", True),
+    ("Confronta Inception e Tenet", "Tenet", True),
+    ("Mi è piaciuto Joker, cosa guardo ora?", "psychological drama character study", False),
+    ("Cerco un film come Mad Max", "post-apocalyptic action", False),
+    ("Cerco un film come Mad Max", "Mad Max Fury Road similar", True),
+    ("film di fantascienza con buchi neri", "space black holes sci-fi", False),
+    ("film drammatici sul carcere", "prison drama", False),
+    ("quali film ha diretto Bong Joon-ho?", "Bong Joon-ho", True),
+    ("consigliami un film per piangere", "sad emotional movies", False),
+    ("Inception è su Netflix? E The Dark Knight?", "The Dark Knight", True),
+    ("Parlami di Inception e poi consigliami un horror", "horror movies", False),
+    ("Ho visto Interstellar, consigliami un thriller", "thriller", False),
+    ("Ho amato Parasite, voglio un film coreano diverso", "Korean films", False),
+]
+
+
+def _jaccard(a: str, b: str) -> float:
+    """Similarità precedente: Jaccard su tutte le parole, stopwords incluse"""
+    words_a = set(re.findall(r"\w+", a.lower()))
+    words_b = set(re.findall(r"\w+", b.lower()))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def _evaluate(name: str, similarity: Callable[[str, str], float], threshold: float) -> None:
+    reuse = [similarity(m, q) >= threshold for m, q, label in LABELED_PAIRS if label]
+    wrong = [similarity(m, q) >= threshold for m, q, label in LABELED_PAIRS if not label]
+    print(
+        f"{name:<10}{threshold:>8.2f}{sum(reuse) / len(reuse):>10.2f}"
+        f"{sum(wrong):>8}/{len(wrong)}"
+    )
+
+
+def main() -> None:
+    print(f"{'metodo':<10}{'soglia':>8}{'hit rate':>10}{'falsi':>10}")
+    _evaluate("jaccard", _jaccard, 0.5)
+    for threshold in (0.2, 0.25, 0.34, 0.5):
+        _evaluate("contenuto", query_similarity, threshold)
+
+
+if __name__ == "__main__":
+    main()
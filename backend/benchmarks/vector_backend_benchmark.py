@@ -0,0 +1,117 @@
+"""
+Benchmark dei vector backend: latenza di ricerca di Chroma e dell'indice
+in-memory (esatto / HNSW) al crescere del numero di documenti.
+
+Vettori casuali normalizzati e ricerca per vettore: il costo dell'embedding
+della query è identico per tutti i backend ed è escluso. Nessuna API key.
+
+Uso (dalla cartella backend):
+    python -m benchmarks.vector_backend_benchmark
+    python -m benchmarks.vector_backend_benchmark --sizes 25 10000 --dim 1536
+    python -m benchmarks.vector_backend_benchmark --backends memory hnsw   # senza Chroma
+
+A 1M documenti e dim 384 la matrice occupa ~1.5 GB; l'inserimento in Chroma e
+la costruzione del grafo HNSW richiedono diversi minuti.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+from database.memory_vector_store import InMemoryVectorIndex
+from database.vector_backends import ChromaBackend
+
+_CHROMA_BATCH = 5000
+
+
+def _random_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _build_memory(vectors: np.ndarray, hnsw: bool) -> InMemoryVectorIndex:
+    # Soglia HNSW: 0 = sempre HNSW, infinito = sempre ricerca esatta
+    store = InMemoryVectorIndex(embeddings=None, hnsw_threshold=0 if hnsw else float("inf"))
+    ids = [f"doc_{i}" for i in range(len(vectors))]
+    store.add_vectors(ids, vectors, metadatas=[{"i": i} for i in range(len(vectors))], ids=ids)
+    # Il grafo HNSW si costruisce in background: il tempo di build lo include
+    store.wait_for_index()
+    return store
+
+
+def _build_chroma(vectors: np.ndarray, directory: str):
+    store = ChromaBackend().open_collection(directory, "bench", embeddings=None)
+    for start in range(0, len(vectors), _CHROMA_BATCH):
+        batch = vectors[start : start + _CHROMA_BATCH]
+        ids = [f"doc_{start + i}" for i in range(len(batch))]
+        store._collection.upsert(
+            ids=ids,
+            embeddings=batch.tolist(),
+            documents=ids,
+            metadatas=[{"i": start + i} for i in range(len(batch))],
+        )
+    return store
+
+
+def _search_ids(store, query: np.ndarray, k: int) -> List[int]:
+    docs = store.similarity_search_by_vector(query.tolist(), k=k)
+    return [doc.metadata["i"] for doc in docs]
+
+
+def run_size(n: int, dim: int, backends: List[str], queries: int, k: int) -> None:
+    rng = np.random.default_rng(n)
+    vectors = _random_vectors(n, dim, rng)
+    query_vectors = _random_vectors(queries, dim, rng)
+
+    # Risultati esatti di riferimento per la recall@k
+    truth = [set(np.argpartition(-(vectors @ q), k - 1)[:k].tolist()) for q in query_vectors]
+
+    print(f"\n📊 {n:,} documenti (dim {dim}, {queries} query, k={k})")
+    print(f"{'backend':<10}{'build s':>10}{'p50 ms':>10}{'p95 ms':>10}{'recall@k':>10}")
+
+    for backend in backends:
+        directory = tempfile.mkdtemp(prefix="vector_bench_")
+        try:
+            start = time.perf_counter()
+            if backend == "chroma":
+                store = _build_chroma(vectors, directory)
+            else:
+                store = _build_memory(vectors, hnsw=backend == "hnsw")
+            # Prima ricerca fuori misura: costruisce il grafo HNSW
+            found = [set(_search_ids(store, query_vectors[0], k))]
+            build_seconds = time.perf_counter() - start
+
+            latencies = []
+            for query in query_vectors[1:]:
+                t0 = time.perf_counter()
+                found.append(set(_search_ids(store, query, k)))
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+            recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+            p50, p95 = np.percentile(latencies or [0.0], [50, 95])
+            print(f"{backend:<10}{build_seconds:>10.2f}{p50:>10.3f}{p95:>10.3f}{recall:>10.3f}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 10_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument(
+        "--backends", nargs="+", default=["chroma", "memory", "hnsw"],
+        choices=["chroma", "memory", "hnsw"],
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        run_size(n, args.dim, args.backends, args.queries, min(args.k, n))
+
+
+if __name__ == "__main__":
+    main()
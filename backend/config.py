@@ -17,9 +17,17 @@ class Config:
     reddit_client_secret: str = os.getenv("REDDIT_SECRET")
     reddit_user_agent: str = os.getenv("REDDIT_USER_AGENT", "NetflixAI/1.0")
 
-    # Vector Store Paths (Chroma)
+    # Vector Store Paths
     films_vectorstore_path: str = "./data/chroma_films"
     users_vectorstore_path: str = "./data/chroma_users"
+    # Vector Backend ("chroma" | "memory": indice NumPy in-process)
+    vector_backend: str = os.getenv("VECTOR_BACKEND", "chroma")
+    vector_hnsw_threshold: int = 50_000  # "memory": ricerca esatta sotto soglia, HNSW oltre
+    vector_hnsw_ef_search: int = 64
+    # Cache persistente degli embeddings (None = disabilitata)
+    embedding_cache_path: str = "./data/embedding_cache"
+    # LRU in memoria degli embeddings delle query normalizzate (0 = disabilitata)
+    query_embedding_cache_size: int = 2048
 
     # Model Settings
     llm_model: str = "gpt-4o"
@@ -32,8 +40,56 @@ class Config:
     films_search_k: int = 5
     include_images: bool = False
 
+    # Agent Settings
+    agent_mode: str = os.getenv("AGENT_MODE", "react")  # "react" | "tool_calling" | "plan"
+    plan_max_concurrency: int = 4  # tool call in parallelo nella modalità "plan"
+    # Tools il cui output (già in italiano per l'utente) chiude il turno direttamente
+    direct_return_tools: tuple = ("movie_database_search", "web_movie_research")
+    enable_intent_router: bool = True  # fast-path sul catalogo senza ReAct loop
+    # Ricerca sul catalogo avviata subito sul messaggio, in parallelo al primo passo
+    enable_speculative_retrieval: bool = True
+    speculative_min_similarity: float = 0.25  # Jaccard sulle parole di contenuto
+    # Richieste identiche in corso eseguite una sola volta (tools e primi turni)
+    coalesce_tool_requests: bool = True
+    coalesce_agent_turns: bool = True
+    # Ricerca ibrida sul catalogo: BM25 (titolo, cast, regista, generi) + vettoriale
+    enable_hybrid_retrieval: bool = True
+    hybrid_rrf_k: int = 60
+    # Rappresentazione dei film: "multi" = un vettore per campo della descrizione,
+    # pesi per tipo di query; "single" = un documento unico per film
+    film_representation: str = "multi"
+    field_aggregation: str = "sum"  # "sum" | "max" dei punteggi pesati dei campi
+
+    # Answer Cache (risposte riusate per domande quasi identiche)
+    enable_answer_cache: bool = True
+    answer_cache_threshold: float = 0.92  # similarità coseno minima
+    answer_cache_max_entries: int = 512
+    answer_cache_ttl_seconds: int = 1800
+
+    # LLM Cache (exact-match su modello, parametri e messaggi)
+    enable_llm_cache: bool = True
+    llm_cache_max_entries: int = 1024  # livello in memoria (LRU)
+    llm_cache_path: str = "./data/llm_cache.sqlite3"  # livello su disco (None = solo memoria)
+    # Chain escluse dalla cache: "agent", "query_rewrite", "movie_qa",
+    # "web_synthesis", "history_summary"
+    llm_cache_exclude: tuple = ()
+    # Chain con conversazioni degli utenti nei prompt: solo livello in memoria
+    llm_cache_memory_only: tuple = ("agent", "history_summary")
+    llm_cache_max_disk_entries: int = 10_000
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+
     # Memory Settings
     conversation_memory_k: int = 10
+    history_max_tokens: int = 2000
+
+    # Session Store ("memory" | "sqlite")
+    session_store_backend: str = os.getenv("SESSION_STORE_BACKEND", "memory")
+    session_store_path: str = "./data/sessions.sqlite3"
+    session_max_sessions: int = 1000
+    session_ttl_seconds: int = 3600
+
+    # Server
+    warmup_shutdown_timeout_seconds: float = 10.0  # attesa massima degli step di warm-up
 
     def validate(self):
         """Valida che tutte le API keys necessarie siano presenti"""
@@ -0,0 +1,283 @@
+"""
+Cache persistente degli embeddings, content-addressed.
+
+Chiave: sha256 del testo, in uno store separato per ogni modello di embedding.
+Su disco, per modello:
+- vectors.npy: matrice (capacità, dim) float32 aperta in memory-map,
+  raddoppiata quando si riempie
+- index.tsv: righe "<sha256>\t<riga>" in append; una riga dell'indice viene
+  scritta solo dopo il flush del vettore corrispondente
+- .lock: file lock tra processi per assegnazione delle righe e scritture
+
+CachedEmbeddings avvolge il modello reale e lo interroga solo per i testi mai
+visti: la ricostruzione di un catalogo invariato non costa chiamate API, e
+le query ripetute non vengono ricalcolate.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from numpy.lib.format import open_memmap
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_INITIAL_CAPACITY = 1024
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _FileLock:
+    """Lock esclusivo tra processi su un file (fcntl su POSIX, msvcrt su Windows)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self) -> "_FileLock":
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+
+
+class EmbeddingStore:
+    """
+    Vettori di un singolo modello in un file .npy memory-mapped + indice.
+
+    Condivisibile tra processi (worker uvicorn, rebuild accanto al server):
+    assegnazione delle righe, crescita del file e append all'indice avvengono
+    sotto un file lock, dopo aver riletto la coda dell'indice scritta dagli
+    altri processi. Un file cresciuto altrove (os.replace) viene rimappato.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.index_path = os.path.join(directory, "index.tsv")
+        self.lock_path = os.path.join(directory, ".lock")
+        os.makedirs(directory, exist_ok=True)
+
+        self._rows: Dict[str, int] = {}
+        self._next_row = 0
+        self._index_offset = 0  # byte dell'indice già letti
+        self._vectors: Optional[np.memmap] = None
+        self._vectors_inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            return self._vectors[row].tolist()
+
+    def refresh(self) -> None:
+        """Legge le voci aggiunte da altri processi"""
+        with self._lock:
+            self._refresh()
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        with self._lock, _FileLock(self.lock_path):
+            # Righe già assegnate altrove: la coda dell'indice fa fede
+            self._refresh()
+            items = {k: v for k, v in items.items() if k not in self._rows}
+            if not items:
+                return
+
+            dim = len(next(iter(items.values())))
+            start = self._next_row
+            self._reserve(start + len(items), dim)
+
+            for offset, vector in enumerate(items.values()):
+                self._vectors[start + offset] = vector
+            self._vectors.flush()
+
+            lines = "".join(f"{key}\t{start + offset}\n" for offset, key in enumerate(items))
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            self._read_index_tail()
+
+    def _refresh(self) -> None:
+        """Rimappa il file dei vettori se sostituito, poi legge la coda dell'indice"""
+        try:
+            inode = os.stat(self.vectors_path).st_ino
+        except FileNotFoundError:
+            return
+        if inode != self._vectors_inode:
+            self._vectors = open_memmap(self.vectors_path, mode="r+")
+            self._vectors_inode = inode
+        self._read_index_tail()
+
+    def _read_index_tail(self) -> None:
+        """Righe complete dell'indice oltre l'ultimo offset letto"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1  # una riga scritta a metà resta per dopo
+        self._index_offset += complete
+        for line in data[:complete].decode("utf-8").splitlines():
+            key, _, row = line.partition("\t")
+            if row.isdigit():
+                self._next_row = max(self._next_row, int(row) + 1)
+                if int(row) < len(self._vectors):
+                    self._rows[key] = int(row)
+
+    def _reserve(self, size: int, dim: int) -> None:
+        """Garantisce spazio per `size` righe, raddoppiando il file se serve"""
+        if self._vectors is not None and self._vectors.shape[1] != dim:
+            raise ValueError(
+                f"Dimensione embedding {dim} diversa da quella in cache {self._vectors.shape[1]}"
+            )
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        if size <= capacity:
+            return
+
+        new_capacity = max(capacity * 2, size, _INITIAL_CAPACITY)
+        tmp_path = self.vectors_path + ".tmp"
+        grown = open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(new_capacity, dim))
+        if self._vectors is not None:
+            grown[:capacity] = self._vectors
+            del self._vectors
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.vectors_path)
+        self._vectors = open_memmap(self.vectors_path, mode="r+")
+        self._vectors_inode = os.stat(self.vectors_path).st_ino
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings con cache persistente: documenti e query passano dalla stessa cache.
+
+    Args:
+        embeddings: modello reale (es. OpenAIEmbeddings)
+        cache_dir: cartella radice della cache (una sottocartella per modello)
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_dir: str):
+        self.embeddings = embeddings
+        self.model_name = str(getattr(embeddings, "model", type(embeddings).__name__))
+        slug = re.sub(r"[^\w.-]+", "_", self.model_name)
+        self.store = EmbeddingStore(os.path.join(cache_dir, slug))
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.api_calls = 0
+
+    # -----------------------------------------------------------------------------
+    # Embeddings
+    # -----------------------------------------------------------------------------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._lookup(texts)
+        if missing:
+            computed = self.embeddings.embed_documents(list(missing))
+            self._store(missing, computed, vectors)
+        return [vectors[_text_key(text)] for text in texts]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._lookup(texts)
+        if missing:
+            computed = await self.embeddings.aembed_documents(list(missing))
+            self._store(missing, computed, vectors)
+        return [vectors[_text_key(text)] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        vectors, missing = self._lookup([text])
+        if missing:
+            self._store(missing, [self.embeddings.embed_query(text)], vectors)
+        return vectors[_text_key(text)]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vectors, missing = self._lookup([text])
+        if missing:
+            self._store(missing, [await self.embeddings.aembed_query(text)], vectors)
+        return vectors[_text_key(text)]
+
+    # -----------------------------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------------------------
+    def _lookup(self, texts: List[str]):
+        """Vettori già in cache per chiave + testi mancanti (senza duplicati)"""
+        vectors: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        seen = set()
+        for text in texts:
+            key = _text_key(text)
+            if key in seen:
+                continue
+            seen.add(key)
+            vector = self.store.get(key)
+            if vector is None:
+                missing[text] = key
+            else:
+                vectors[key] = vector
+
+        if missing:
+            # Testi forse già embeddati da un altro processo
+            self.store.refresh()
+            for text, key in list(missing.items()):
+                vector = self.store.get(key)
+                if vector is not None:
+                    vectors[key] = vector
+                    del missing[text]
+
+        with self._lock:
+            self.hits += len(vectors)
+            self.misses += len(missing)
+            if missing:
+                self.api_calls += 1
+        return vectors, missing
+
+    def _store(
+        self,
+        missing: Dict[str, str],
+        computed: List[List[float]],
+        vectors: Dict[str, List[float]],
+    ) -> None:
+        new_vectors = {key: list(vector) for key, vector in zip(missing.values(), computed)}
+        self.store.put_many(new_vectors)
+        vectors.update(new_vectors)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self.store),
+                "hits": self.hits,
+                "misses": self.misses,
+                "api_calls": self.api_calls,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
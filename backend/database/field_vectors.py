@@ -0,0 +1,213 @@
+"""
+Rappresentazione multi-vettore dei film: un embedding per ogni campo di
+enhanced_description, più uno per titolo, regista, cast e generi, invece di
+un unico documento che li mescola tutti.
+
+- Matrice (film, campo, dim) float32 normalizzata: una query costa un
+  prodotto tensore-vettore, (film, campo) similarità coseno in un colpo solo
+- Punteggio del film = somma pesata (o massimo pesato) delle similarità dei
+  suoi campi; i pesi dipendono dal tipo di query (mood, trama, regia, ...)
+- Un risultato per film: l'aggregazione avviene prima del top-k
+- Campi senza testo: vettore nullo (similarità 0), mai inviati all'API
+
+I vettori arrivano dagli embeddings del DualVectorDatabase (cache persistente):
+ricostruire l'indice a ogni sync dei film non ripete le chiamate API.
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+DESCRIPTION_FIELDS = (
+    "mood_description",
+    "detailed_plot",
+    "directorial_style",
+    "emotional_impact",
+    "visual_style",
+)
+# Titolo, regista, cast e generi: le query su entità ("film con Leonardo
+# DiCaprio", "Inception") contano anche senza la ricerca ibrida
+METADATA_FIELD = "metadata"
+FIELD_NAMES = DESCRIPTION_FIELDS + (METADATA_FIELD,)
+
+# Pesi per tipo di query, nell'ordine di FIELD_NAMES (normalizzati a somma 1)
+QUERY_TYPE_WEIGHTS: Dict[str, Tuple[float, ...]] = {
+    "mood": (0.35, 0.10, 0.05, 0.30, 0.10, 0.10),
+    "plot": (0.10, 0.55, 0.05, 0.10, 0.05, 0.15),
+    "style": (0.10, 0.10, 0.35, 0.05, 0.25, 0.15),
+    "visual": (0.10, 0.05, 0.25, 0.05, 0.50, 0.05),
+    "default": (0.15, 0.20, 0.10, 0.15, 0.10, 0.30),
+}
+
+# Regole locali (come l'intent router): nel dubbio "default"
+_QUERY_TYPE_RES = (
+    (
+        "mood",
+        re.compile(
+            r"ansia|angosc|tension|paura|inquiet|rilass|leggero|divertent|commuov|"
+            r"piang|emozion|atmosfer|mood|cupo|malincon|adrenalin|brivid|sereno|"
+            r"mettono|fa sentire|\bfeel|\bscary|uplifting|\bcozy",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "visual",
+        re.compile(
+            r"visiv|fotografia|immagin|colori|effetti speciali|spettacolar|estetic|"
+            r"\bvisual|cinematograph",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        "style",
+        re.compile(r"regia|regist|diretto|stile|montaggio|\bdirect|\bstyle", re.IGNORECASE),
+    ),
+    (
+        "plot",
+        re.compile(
+            r"trama|storia|parla di|racconta|protagonist|ambientat|in cui|dove un|"
+            r"\bplot\b|\bstory\b|\babout a\b",
+            re.IGNORECASE,
+        ),
+    ),
+)
+
+
+def classify_query(query: str) -> str:
+    """Tipo di query per la scelta dei pesi dei campi"""
+    for query_type, pattern in _QUERY_TYPE_RES:
+        if pattern.search(query):
+            return query_type
+    return "default"
+
+
+def _field_texts(film: Dict[str, Any]) -> List[str]:
+    """Testo di ogni campo, nell'ordine di FIELD_NAMES ("" se assente)"""
+    description = film.get("enhanced_description") or {}
+    texts = [" ".join((description.get(name) or "").split()) for name in DESCRIPTION_FIELDS]
+    metadata = [
+        film.get("title"),
+        film.get("director"),
+        ", ".join(film.get("cast") or []),
+        ", ".join(film.get("genres") or []),
+    ]
+    texts.append(". ".join(str(value) for value in metadata if value))
+    return texts
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class FilmFieldIndex:
+    """Vettori per (film, campo) e scoring pesato per tipo di query"""
+
+    def __init__(self, embeddings: Embeddings, aggregation: str = "sum"):
+        if aggregation not in ("sum", "max"):
+            raise ValueError(f"Aggregazione non supportata: {aggregation}")
+        self.embeddings = embeddings
+        self.aggregation = aggregation
+
+        # (documenti, id del catalogo, tensore film x campo x dim)
+        self._state: Optional[Tuple[List[Document], np.ndarray, np.ndarray]] = None
+        self._lock = threading.Lock()
+        self._query_types: Dict[str, int] = {name: 0 for name in QUERY_TYPE_WEIGHTS}
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def build(self, films: List[Dict[str, Any]], documents: Dict[str, Document]) -> None:
+        """Embedda i campi di ogni film (un batch) e sostituisce l'indice"""
+        docs, film_ids, texts = [], [], []
+        for film in films:
+            doc = documents.get(f"film_{film['id']}")
+            if doc is None or film["id"] in film_ids:
+                continue
+            docs.append(doc)
+            film_ids.append(film["id"])
+            texts.extend(_field_texts(film))
+
+        # Solo i campi con testo vanno all'API (un testo vuoto viene rifiutato)
+        filled = [i for i, text in enumerate(texts) if text]
+        if not filled:
+            self._state = None
+            return
+
+        embedded = np.asarray(
+            self.embeddings.embed_documents([texts[i] for i in filled]), dtype=np.float32
+        )
+        vectors = np.zeros((len(texts), embedded.shape[1]), dtype=np.float32)
+        vectors[filled] = embedded
+        tensor = _normalize_rows(vectors.reshape(len(docs), len(FIELD_NAMES), -1))
+        self._state = (docs, np.asarray(film_ids), np.ascontiguousarray(tensor))
+
+    def weights_for(self, query: str) -> Tuple[str, np.ndarray]:
+        query_type = classify_query(query)
+        weights = np.asarray(QUERY_TYPE_WEIGHTS[query_type], dtype=np.float32)
+        return query_type, weights / weights.sum()
+
+    def score(
+        self, query_vector: Sequence[float], weights: np.ndarray
+    ) -> Optional[Tuple[List[Document], np.ndarray, np.ndarray]]:
+        """(documenti, id del catalogo, punteggio per film) o None se non pronto"""
+        state = self._state
+        if state is None:
+            return None
+        docs, film_ids, tensor = state
+
+        query = _normalize_rows(np.asarray(query_vector, dtype=np.float32))
+        similarities = tensor @ query  # (film, campo)
+        weighted = similarities * weights
+        if self.aggregation == "max":
+            # Massimo pesato, riscalato: il campo più pesato vale similarità piena
+            scores = weighted.max(axis=1) / weights.max()
+        else:
+            scores = weighted.sum(axis=1)
+        return docs, film_ids, scores
+
+    def search_by_vector(
+        self,
+        query_vector: Sequence[float],
+        weights: np.ndarray,
+        k: int = 5,
+        allowed_ids: Optional[Any] = None,
+    ) -> List[Tuple[Document, float]]:
+        """Top-k film (uno per film) per punteggio pesato, opzionalmente tra gli id ammessi"""
+        scored = self.score(query_vector, weights)
+        if scored is None:
+            return []
+        docs, film_ids, scores = scored
+
+        if allowed_ids is not None:
+            mask = np.isin(film_ids, list(allowed_ids))
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(mask.sum()))
+        k = min(k, len(docs))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(docs[i], float(scores[i])) for i in top]
+
+    def record_query_type(self, query_type: str) -> None:
+        with self._lock:
+            self._query_types[query_type] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        with self._lock:
+            return {
+                "ready": state is not None,
+                "films": len(state[0]) if state else 0,
+                "vectors": len(state[0]) * len(FIELD_NAMES) if state else 0,
+                "aggregation": self.aggregation,
+                "query_types": dict(self._query_types),
+            }
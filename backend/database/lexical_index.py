@@ -0,0 +1,188 @@
+"""
+Indice lessicale BM25 sul catalogo film (titolo, cast, regista, generi).
+
+Affianca la collection films: titoli e nomi propri sono sepolti nel contenuto
+"ricco" usato per gli embeddings, mentre qui ogni campo ha il proprio indice
+e il proprio peso (BM25 per campo, punteggi sommati con FIELD_WEIGHTS).
+
+match_entity() riconosce le query che nominano esattamente un titolo, un
+attore o un regista ("Inception", "film con Leonardo DiCaprio"): per queste
+la ricerca vettoriale, e quindi l'embedding della query, non serve.
+
+L'indice viene ricostruito a ogni sync della collection films e sostituito
+in blocco: le ricerche concorrenti vedono sempre uno stato coerente.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Peso di ogni campo nel punteggio finale
+FIELD_WEIGHTS: Dict[str, float] = {"title": 3.0, "director": 2.0, "cast": 2.0, "genres": 1.0}
+
+# Campi che identificano un'entità (i generi descrivono, non identificano)
+ENTITY_FIELDS = ("title", "director", "cast")
+
+# Parole ignorate nel confronto query/entità: articoli, preposizioni e
+# formule tipiche delle richieste ("film con", "è su Netflix?")
+QUERY_STOPWORDS = frozenset(
+    """
+    a ad al alla alle allo agli an and by c ce che chi come com con cosa d da dal
+    dalla dei del della delle dello degli di dimmi disponibile e ed film gli i il
+    in info informazioni is l la le lo movie movies netflix nel nella of on parlami
+    per su sul sulla the trama trova tutti tutto un una uno vedere voglio with
+    diretto regia regista attore attrice cercami cerca mostrami
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Minuscolo, senza accenti, solo caratteri alfanumerici"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text.lower())
+
+
+def entity_key(text: str) -> Tuple[str, ...]:
+    return tuple(t for t in tokenize(text) if t not in QUERY_STOPWORDS)
+
+
+def _field_values(film: Dict[str, Any], name: str) -> List[str]:
+    value = film.get(name)
+    if value is None:
+        return []
+    return [str(v) for v in value] if isinstance(value, list) else [str(value)]
+
+
+@dataclass
+class _FieldIndex:
+    postings: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    lengths: List[int] = field(default_factory=list)
+    avg_length: float = 0.0
+
+
+@dataclass
+class _LexicalState:
+    documents: List[Document] = field(default_factory=list)
+    fields: Dict[str, _FieldIndex] = field(default_factory=dict)
+    # entity_key -> righe dei documenti che la contengono
+    entities: Dict[Tuple[str, ...], List[int]] = field(default_factory=dict)
+
+
+class FilmLexicalIndex:
+    """BM25 per campo + dizionario delle entità del catalogo"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._state: Optional[_LexicalState] = None
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.searches = 0
+        self.entity_matches = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def build(self, films: List[Dict[str, Any]], documents: Dict[str, Document]) -> None:
+        """Ricostruisce l'indice; documents: id ("film_<id>") -> Document della collection"""
+        state = _LexicalState(fields={name: _FieldIndex() for name in FIELD_WEIGHTS})
+
+        indexed = set()
+        for film in films:
+            doc_id = f"film_{film['id']}"
+            # Un id ripetuto nel catalogo corrisponde a un solo documento
+            if doc_id in indexed or doc_id not in documents:
+                continue
+            indexed.add(doc_id)
+            doc = documents[doc_id]
+            row = len(state.documents)
+            state.documents.append(doc)
+
+            for name, index in state.fields.items():
+                tokens = [t for value in _field_values(film, name) for t in tokenize(value)]
+                index.lengths.append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    index.postings.setdefault(term, {})[row] = tf
+
+            for name in ENTITY_FIELDS:
+                for value in _field_values(film, name):
+                    key = entity_key(value)
+                    if key:
+                        rows = state.entities.setdefault(key, [])
+                        if row not in rows:
+                            rows.append(row)
+
+        for index in state.fields.values():
+            index.avg_length = sum(index.lengths) / len(index.lengths) if index.lengths else 0.0
+
+        self._state = state
+
+    def _scores(self, state: _LexicalState, query: str) -> Dict[int, float]:
+        terms = set(tokenize(query))
+        total = len(state.documents)
+        scores: Dict[int, float] = {}
+
+        for name, index in state.fields.items():
+            weight = FIELD_WEIGHTS[name]
+            for term in terms:
+                postings = index.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for row, tf in postings.items():
+                    norm = 1 - self.b + self.b * index.lengths[row] / (index.avg_length or 1.0)
+                    bm25 = idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                    scores[row] = scores.get(row, 0.0) + weight * bm25
+        return scores
+
+    def search(self, query: str, k: Optional[int] = 5) -> List[Tuple[Document, float]]:
+        """Top-k documenti per punteggio BM25 (k=None: tutti; vuoto se l'indice non è pronto)"""
+        state = self._state
+        if state is None:
+            return []
+        with self._lock:
+            self.searches += 1
+
+        scores = self._scores(state, query)
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [(state.documents[row], score) for row, score in ranked]
+
+    def match_entity(self, query: str, k: Optional[int] = 5) -> Optional[List[Document]]:
+        """
+        Documenti dell'entità nominata dalla query (titolo, attore, regista),
+        o None se la query non è esattamente un'entità del catalogo
+        """
+        state = self._state
+        if state is None:
+            return None
+        rows = state.entities.get(entity_key(query))
+        if not rows:
+            return None
+
+        with self._lock:
+            self.entity_matches += 1
+        scores = self._scores(state, query)
+        rows = sorted(rows, key=lambda row: -scores.get(row, 0.0))[:k]
+        return [state.documents[row] for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        with self._lock:
+            return {
+                "ready": state is not None,
+                "documents": len(state.documents) if state else 0,
+                "entities": len(state.entities) if state else 0,
+                "searches": self.searches,
+                "entity_matches": self.entity_matches,
+            }
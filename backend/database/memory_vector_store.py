@@ -0,0 +1,482 @@
+"""
+InMemoryVectorIndex: vector store in-process su una matrice float32 contigua.
+
+- Ricerca esatta (prodotto scalare su vettori normalizzati = similarità coseno)
+  fino a hnsw_threshold documenti; oltre, grafo HNSW (hnswlib) ricostruito in
+  background dopo le scritture e sostituito a costruzione finita: nel frattempo
+  le ricerche restano esatte, mai bloccate. Senza hnswlib resta la ricerca esatta.
+- Filtri sui metadati con la sintassi "where" di Chroma ({"campo": valore},
+  $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin, $and/$or), applicati prima dello scoring.
+- Persistenza per collection: checkpoint <nome>.npy (vettori) + <nome>.jsonl
+  (id, testo, metadati) più un log in append delle scritture successive
+  (<nome>.log.jsonl con le operazioni, <nome>.log.f32 con i vettori). Il log
+  viene compattato nel checkpoint quando supera la collection, e al caricamento.
+
+Le ricerche leggono uno snapshot immutabile: le scritture (sync in background)
+ne preparano uno nuovo e lo sostituiscono in un colpo solo.
+"""
+
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Valuta un filtro in sintassi Chroma sui metadati di un documento"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, target in condition.items():
+                if operator not in _COMPARISONS:
+                    raise ValueError(f"Operatore di filtro non supportato: {operator}")
+                if not _COMPARISONS[operator](value, target):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+# Compattazione del log: quando supera max(minimo, documenti nella collection)
+_MIN_LOG_RECORDS = 1000
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    ids: Tuple[str, ...] = ()
+    documents: Tuple[Document, ...] = ()
+    matrix: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+
+
+class InMemoryVectorIndex(VectorStore):
+    """Collection in memoria con ricerca esatta o HNSW (vedi docstring del modulo)"""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        persist_path: Optional[str] = None,
+        hnsw_threshold: int = 50_000,
+        hnsw_ef_search: int = 64,
+    ):
+        self._embeddings = embeddings
+        self.persist_path = persist_path
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_ef_search = hnsw_ef_search
+
+        self._snapshot = _Snapshot()
+        self._write_lock = threading.Lock()
+        self._log_records = 0
+        # Ultimo grafo HNSW costruito: (snapshot, indice), usato solo se lo
+        # snapshot è ancora quello corrente
+        self._hnsw: Optional[Tuple[_Snapshot, Any]] = None
+        self._hnsw_lock = threading.Lock()
+        self._hnsw_thread: Optional[threading.Thread] = None
+
+        if persist_path:
+            self._load()
+            self._schedule_hnsw()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embeddings
+
+    def count(self) -> int:
+        return len(self._snapshot.ids)
+
+    # -----------------------------------------------------------------------------
+    # Persistenza
+    # -----------------------------------------------------------------------------
+    def _load(self) -> None:
+        records_path = f"{self.persist_path}.jsonl"
+        entries: Dict[str, Tuple[Document, np.ndarray]] = {}
+        if os.path.exists(records_path):
+            ids, documents = [], []
+            with open(records_path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    ids.append(record["id"])
+                    documents.append(
+                        Document(page_content=record["text"], metadata=record["metadata"])
+                    )
+            matrix = np.load(f"{self.persist_path}.npy") if ids else np.zeros((0, 0), np.float32)
+            if len(matrix) != len(ids):
+                raise ValueError(
+                    f"Indice corrotto: {len(ids)} documenti per {len(matrix)} vettori"
+                )
+            entries = dict(zip(ids, zip(documents, matrix.astype(np.float32))))
+
+        replayed = self._replay_log(entries)
+        if entries:
+            self._snapshot = _Snapshot(
+                tuple(entries),
+                tuple(doc for doc, _ in entries.values()),
+                np.ascontiguousarray(np.stack([vector for _, vector in entries.values()])),
+            )
+        if replayed:
+            # Log riportato nel checkpoint: riparte vuoto (e senza code troncate)
+            self._compact(self._snapshot)
+
+    def _replay_log(self, entries: Dict[str, Tuple[Document, np.ndarray]]) -> int:
+        """Applica il log alle entries; restituisce il numero di operazioni lette"""
+        log_path = f"{self.persist_path}.log.jsonl"
+        if not os.path.exists(log_path):
+            return 0
+        vectors_path = f"{self.persist_path}.log.f32"
+        raw = (
+            np.fromfile(vectors_path, dtype=np.float32)
+            if os.path.exists(vectors_path)
+            else np.zeros(0, np.float32)
+        )
+
+        replayed = 0
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # riga troncata da un crash: le operazioni finiscono qui
+                if record["op"] == "delete":
+                    for doc_id in record["ids"]:
+                        entries.pop(doc_id, None)
+                else:
+                    start = record["offset"]
+                    vector = raw[start : start + record["dim"]]
+                    if len(vector) != record["dim"]:
+                        break  # vettore non scritto per intero
+                    doc = Document(page_content=record["text"], metadata=record["metadata"])
+                    entries[record["id"]] = (doc, vector)
+                replayed += 1
+        return replayed
+
+    def _append_log(self, records: List[Dict[str, Any]], vectors: Optional[np.ndarray] = None) -> None:
+        """Accoda le operazioni al log (prima i vettori, poi i record che li indicizzano)"""
+        if not self.persist_path:
+            return
+        os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+        if vectors is not None:
+            with open(f"{self.persist_path}.log.f32", "ab") as f:
+                offset = f.tell() // 4
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            dim = vectors.shape[1]
+            for i, record in enumerate(records):
+                record.update(offset=offset + i * dim, dim=dim)
+        with open(f"{self.persist_path}.log.jsonl", "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self._log_records += len(records)
+
+    def _maybe_compact(self, snapshot: _Snapshot) -> None:
+        if self.persist_path and self._log_records > max(_MIN_LOG_RECORDS, len(snapshot.ids)):
+            self._compact(snapshot)
+
+    def _compact(self, snapshot: _Snapshot) -> None:
+        """Riscrive il checkpoint in modo atomico e svuota il log"""
+        os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+
+        # Vettori prima dei record: un jsonl aggiornato implica un .npy aggiornato
+        with open(f"{self.persist_path}.npy.tmp", "wb") as f:
+            np.save(f, snapshot.matrix)
+        with open(f"{self.persist_path}.jsonl.tmp", "w", encoding="utf-8") as f:
+            for doc_id, doc in zip(snapshot.ids, snapshot.documents):
+                record = {"id": doc_id, "text": doc.page_content, "metadata": doc.metadata}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(f"{self.persist_path}.npy.tmp", f"{self.persist_path}.npy")
+        os.replace(f"{self.persist_path}.jsonl.tmp", f"{self.persist_path}.jsonl")
+
+        # Un crash prima di qui lascia un log già contenuto nel checkpoint:
+        # rigiocarlo è innocuo (upsert e delete sono idempotenti)
+        for suffix in (".log.jsonl", ".log.f32"):
+            if os.path.exists(self.persist_path + suffix):
+                os.remove(self.persist_path + suffix)
+        self._log_records = 0
+
+    def delete_collection(self) -> None:
+        """Svuota la collection ed elimina i file su disco"""
+        with self._write_lock:
+            self._snapshot = _Snapshot()
+            self._hnsw = None
+            self._log_records = 0
+            if self.persist_path:
+                for suffix in (".npy", ".jsonl", ".log.jsonl", ".log.f32"):
+                    if os.path.exists(self.persist_path + suffix):
+                        os.remove(self.persist_path + suffix)
+
+    # -----------------------------------------------------------------------------
+    # Scrittura
+    # -----------------------------------------------------------------------------
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32)
+        return self.add_vectors(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def add_vectors(
+        self,
+        texts: List[str],
+        vectors: np.ndarray,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Upsert di vettori già calcolati (stessi id = sostituzione)"""
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._write_lock:
+            current = self._snapshot
+            positions = {doc_id: row for row, doc_id in enumerate(current.ids)}
+            new_ids = list(current.ids)
+            new_docs = list(current.documents)
+            matrix = current.matrix if len(current.ids) else np.zeros((0, vectors.shape[1]), np.float32)
+
+            appended = []
+            replaced_rows, replaced_vectors = [], []
+            for doc_id, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+                doc = Document(page_content=text, metadata=dict(metadata))
+                row = positions.get(doc_id)
+                if row is None:
+                    positions[doc_id] = len(new_ids)
+                    new_ids.append(doc_id)
+                    new_docs.append(doc)
+                    appended.append(vector)
+                else:
+                    new_docs[row] = doc
+                    replaced_rows.append(row)
+                    replaced_vectors.append(vector)
+
+            matrix = matrix.copy()
+            if replaced_rows:
+                matrix[replaced_rows] = np.stack(replaced_vectors)
+            if appended:
+                matrix = np.vstack([matrix, np.stack(appended)])
+
+            snapshot = _Snapshot(tuple(new_ids), tuple(new_docs), np.ascontiguousarray(matrix))
+            self._append_log(
+                [
+                    {"op": "upsert", "id": doc_id, "text": text, "metadata": dict(metadata)}
+                    for doc_id, text, metadata in zip(ids, texts, metadatas)
+                ],
+                vectors,
+            )
+            self._snapshot = snapshot
+            self._maybe_compact(snapshot)
+        self._schedule_hnsw()
+        return list(ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        removed = set(ids)
+        with self._write_lock:
+            current = self._snapshot
+            keep = [row for row, doc_id in enumerate(current.ids) if doc_id not in removed]
+            snapshot = _Snapshot(
+                tuple(current.ids[row] for row in keep),
+                tuple(current.documents[row] for row in keep),
+                np.ascontiguousarray(current.matrix[keep]),
+            )
+            self._append_log([{"op": "delete", "ids": sorted(removed)}])
+            self._snapshot = snapshot
+            self._maybe_compact(snapshot)
+        self._schedule_hnsw()
+        return True
+
+    # -----------------------------------------------------------------------------
+    # Lettura
+    # -----------------------------------------------------------------------------
+    def get_metadatas(self, where: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """id -> metadati dei documenti che soddisfano il filtro"""
+        snapshot = self._snapshot
+        return {
+            doc_id: doc.metadata
+            for doc_id, doc in zip(snapshot.ids, snapshot.documents)
+            if matches_where(doc.metadata, where)
+        }
+
+    def _allowed_rows(self, snapshot: _Snapshot, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        if not where:
+            return None
+        return np.fromiter(
+            (matches_where(doc.metadata, where) for doc in snapshot.documents),
+            dtype=bool,
+            count=len(snapshot.documents),
+        )
+
+    def _hnsw_index(self, snapshot: _Snapshot) -> Optional[Any]:
+        """Grafo HNSW dello snapshot, se già costruito (None = ricerca esatta)"""
+        if len(snapshot.ids) < self.hnsw_threshold:
+            return None
+        built = self._hnsw
+        if built is not None and built[0] is snapshot:
+            return built[1]
+        self._schedule_hnsw()
+        return None
+
+    def _schedule_hnsw(self) -> None:
+        """Avvia la costruzione del grafo in background (un thread alla volta)"""
+        if len(self._snapshot.ids) < self.hnsw_threshold:
+            return
+        with self._hnsw_lock:
+            if self._hnsw_thread is not None:
+                return
+            self._hnsw_thread = threading.Thread(
+                target=self._build_hnsw, name="hnsw-build", daemon=True
+            )
+            self._hnsw_thread.start()
+
+    def _build_hnsw(self) -> None:
+        try:
+            import hnswlib
+        except ImportError:
+            print("⚠️ hnswlib non installato: ricerca esatta anche oltre la soglia HNSW")
+            self.hnsw_threshold = float("inf")
+            with self._hnsw_lock:
+                self._hnsw_thread = None
+            return
+
+        # Le scritture arrivate durante la costruzione fanno ripartire il ciclo
+        # sullo snapshot più recente invece di avviare build concorrenti
+        while True:
+            snapshot = self._snapshot
+            index = None
+            if len(snapshot.ids) >= self.hnsw_threshold:
+                try:
+                    index = hnswlib.Index(space="ip", dim=snapshot.matrix.shape[1])
+                    index.init_index(max_elements=len(snapshot.ids), ef_construction=200, M=16)
+                    index.add_items(snapshot.matrix, np.arange(len(snapshot.ids)))
+                    index.set_ef(self.hnsw_ef_search)
+                except Exception as e:
+                    print(f"⚠️ Costruzione del grafo HNSW fallita ({e}): ricerca esatta")
+                    index = None
+            with self._hnsw_lock:
+                if index is not None:
+                    self._hnsw = (snapshot, index)
+                # Sotto soglia o build fallita: la prossima scrittura ne riavvia una
+                if index is None or self._snapshot is snapshot:
+                    self._hnsw_thread = None
+                    return
+
+    def wait_for_index(self, timeout: Optional[float] = None) -> bool:
+        """Attende la costruzione del grafo HNSW in corso (benchmark, warm-up)"""
+        thread = self._hnsw_thread
+        if thread is not None:
+            thread.join(timeout)
+        built = self._hnsw
+        return built is not None and built[0] is self._snapshot
+
+    def _search(
+        self, vector: np.ndarray, k: int, where: Optional[Dict[str, Any]]
+    ) -> List[Tuple[Document, float]]:
+        """Top-k per similarità coseno; restituisce (documento, distanza coseno)"""
+        snapshot = self._snapshot
+        if not snapshot.ids:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        allowed = self._allowed_rows(snapshot, where)
+
+        # HNSW solo se i candidati sono tanti: un filtro selettivo rende la
+        # ricerca esatta sulle righe ammesse più rapida (e senza perdita di recall)
+        limit = len(snapshot.ids) if allowed is None else int(allowed.sum())
+        index = self._hnsw_index(snapshot) if limit >= self.hnsw_threshold else None
+        if index is not None:
+            index_filter = None if allowed is None else (lambda row: bool(allowed[row]))
+            try:
+                rows, distances = index.knn_query(query, k=min(k, limit), filter=index_filter)
+            except RuntimeError:
+                rows = None  # il grafo filtrato non ha raggiunto k vicini
+            if rows is not None:
+                return [
+                    (snapshot.documents[row], float(distance))
+                    for row, distance in zip(rows[0], distances[0])
+                ]
+
+        # Ricerca esatta: un prodotto matrice-vettore sulle sole righe ammesse
+        candidates = np.arange(len(snapshot.ids)) if allowed is None else np.flatnonzero(allowed)
+        if len(candidates) == 0:
+            return []
+        matrix = snapshot.matrix if allowed is None else snapshot.matrix[candidates]
+        scores = matrix @ query
+
+        k_eff = min(k, len(candidates))
+        top = np.argpartition(-scores, k_eff - 1)[:k_eff]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (snapshot.documents[candidates[i]], float(1.0 - scores[i])) for i in top
+        ]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self._search(np.asarray(embedding), k, filter)]
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        # Come Chroma: (documento, distanza coseno)
+        return self._search(np.asarray(embedding), k, filter)
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        vector = self._embeddings.embed_query(query)
+        return self._search(np.asarray(vector), k, filter)
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Le distanze restituite sono distanze coseno (1 - similarità)
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> "InMemoryVectorIndex":
+        ids = kwargs.pop("ids", None)
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
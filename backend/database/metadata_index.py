@@ -0,0 +1,188 @@
+"""
+Indice strutturato dei metadati dei film, accanto alla collection films.
+
+Chroma salva generi, cast e le altre liste come stringhe separate da virgola:
+"Sci-Fi dopo il 2010, sotto i 120 minuti, rating oltre 8" non è esprimibile
+come filtro sul vector store. Qui i metadati restano tipizzati:
+- bitset (int Python, un bit per film) per genere, attore, regista e
+  disponibilità: intersezioni e unioni con & e |
+- array ordinati (valore, riga) per release_year, imdb_rating e
+  duration_minutes: i range diventano due bisect
+
+candidates(FilmFilter) restituisce gli id del catalogo (metadato "id") dei
+film ammessi, usati per pre-filtrare la ricerca vettoriale e lessicale prima
+dello scoring.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .lexical_index import tokenize
+
+# Campi multi-valore / categorici indicizzati con bitset
+BITSET_FIELDS = ("genres", "cast", "director", "availability_type")
+
+# Campi numerici indicizzati con array ordinati
+RANGE_FIELDS = ("release_year", "imdb_rating", "duration_minutes")
+
+
+def _normalize_value(value: Any) -> str:
+    """Forma di confronto: "Sci-Fi" -> "sci fi", minuscolo e senza accenti"""
+    return " ".join(tokenize(str(value)))
+
+
+@dataclass(frozen=True)
+class FilmFilter:
+    """
+    Filtro strutturato sul catalogo. Liste: il film deve avere TUTTI i valori;
+    range: estremi inclusi; None = nessun vincolo.
+    """
+
+    genres: Tuple[str, ...] = ()
+    cast: Tuple[str, ...] = ()
+    director: Optional[str] = None
+    availability_type: Optional[str] = None  # "included" | "rental" | "unavailable"
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    min_rating: Optional[float] = None
+    max_rating: Optional[float] = None
+    min_duration_minutes: Optional[int] = None
+    max_duration_minutes: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        return self == FilmFilter()
+
+    def ranges(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        return {
+            "release_year": (self.min_year, self.max_year),
+            "imdb_rating": (self.min_rating, self.max_rating),
+            "duration_minutes": (self.min_duration_minutes, self.max_duration_minutes),
+        }
+
+
+@dataclass
+class _MetadataState:
+    film_ids: List[Any] = field(default_factory=list)
+    # campo -> valore normalizzato -> bitset delle righe
+    bitsets: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # campo -> (valori ordinati, righe corrispondenti)
+    sorted_values: Dict[str, Tuple[List[float], List[int]]] = field(default_factory=dict)
+
+    @property
+    def all_rows(self) -> int:
+        return (1 << len(self.film_ids)) - 1
+
+
+class FilmMetadataIndex:
+    """Bitset e array ordinati sui metadati tipizzati del catalogo"""
+
+    def __init__(self):
+        self._state: Optional[_MetadataState] = None
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.filtered_searches = 0
+        self.empty_results = 0
+        self.candidates_total = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def build(self, films: List[Dict[str, Any]]) -> None:
+        """Ricostruisce l'indice dai dati sorgente (liste e numeri originali)"""
+        state = _MetadataState(bitsets={name: {} for name in BITSET_FIELDS})
+        numeric: Dict[str, List[Tuple[float, int]]] = {name: [] for name in RANGE_FIELDS}
+
+        seen = set()
+        for film in films:
+            if film["id"] in seen:
+                continue  # id ripetuto nel catalogo: un solo documento
+            seen.add(film["id"])
+            row = len(state.film_ids)
+            state.film_ids.append(film["id"])
+            bit = 1 << row
+
+            for name in BITSET_FIELDS:
+                values = film.get(name)
+                if values is None:
+                    continue
+                for value in values if isinstance(values, list) else [values]:
+                    key = _normalize_value(value)
+                    state.bitsets[name][key] = state.bitsets[name].get(key, 0) | bit
+
+            for name in RANGE_FIELDS:
+                value = film.get(name)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numeric[name].append((float(value), row))
+
+        for name, pairs in numeric.items():
+            pairs.sort()
+            state.sorted_values[name] = ([v for v, _ in pairs], [r for _, r in pairs])
+
+        self._state = state
+
+    def _range_bitset(
+        self, state: _MetadataState, name: str, low: Optional[float], high: Optional[float]
+    ) -> int:
+        values, rows = state.sorted_values[name]
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        bits = 0
+        for row in rows[start:end]:
+            bits |= 1 << row
+        return bits
+
+    def candidates(self, film_filter: FilmFilter) -> Optional[Set[Any]]:
+        """
+        Id del catalogo dei film che soddisfano il filtro; None se l'indice non
+        è pronto (il chiamante non deve filtrare)
+        """
+        state = self._state
+        if state is None:
+            return None
+
+        bits = state.all_rows
+        required = [("genres", g) for g in film_filter.genres] + [
+            ("cast", a) for a in film_filter.cast
+        ]
+        if film_filter.director:
+            required.append(("director", film_filter.director))
+        if film_filter.availability_type:
+            required.append(("availability_type", film_filter.availability_type))
+
+        for name, value in required:
+            bits &= state.bitsets[name].get(_normalize_value(value), 0)
+            if not bits:
+                break
+
+        for name, (low, high) in film_filter.ranges().items():
+            if bits and (low is not None or high is not None):
+                bits &= self._range_bitset(state, name, low, high)
+
+        # Solo i bit accesi: costo proporzionale ai film ammessi
+        ids = set()
+        while bits:
+            lowest = bits & -bits
+            ids.add(state.film_ids[lowest.bit_length() - 1])
+            bits ^= lowest
+        with self._lock:
+            self.filtered_searches += 1
+            self.candidates_total += len(ids)
+            if not ids:
+                self.empty_results += 1
+        return ids
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        with self._lock:
+            searches = self.filtered_searches
+            return {
+                "ready": state is not None,
+                "documents": len(state.film_ids) if state else 0,
+                "filtered_searches": searches,
+                "empty_results": self.empty_results,
+                "avg_candidates": round(self.candidates_total / searches, 2) if searches else 0.0,
+            }
@@ -0,0 +1,113 @@
+"""
+Cache LRU in memoria degli embeddings delle query.
+
+Ogni retriever (movie_database_search, user_conversation_history, fallback,
+answer cache) embedda la propria query: le domande ripetute o popolari non
+devono tornare in rete. La chiave è la query normalizzata (spazi compressi,
+minuscolo), e su un miss viene embeddata la forma normalizzata: "Inception"
+e "  inception " condividono lo stesso vettore.
+
+Davanti a CachedEmbeddings, un miss in memoria passa dalla cache su disco
+condivisa prima di chiamare l'API. Gli embeddings dei documenti passano
+invariati al modello sottostante.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+class QueryEmbeddingCache(Embeddings):
+    """
+    LRU limitata per numero di query, con metriche di hit rate e latenza risparmiata.
+
+    Args:
+        embeddings: modello sottostante (es. CachedEmbeddings o OpenAIEmbeddings)
+        max_entries: numero massimo di query tenute in memoria
+    """
+
+    def __init__(self, embeddings: Embeddings, max_entries: int = 2048):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self._vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_seconds = 0.0  # tempo totale dei miss (disco o API)
+        self.latency_saved_s = 0.0
+
+    # -----------------------------------------------------------------------------
+    # Embeddings
+    # -----------------------------------------------------------------------------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self._get(key)
+        if vector is None:
+            start = time.perf_counter()
+            vector = self.embeddings.embed_query(key)
+            self._put(key, vector, time.perf_counter() - start)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self._get(key)
+        if vector is None:
+            start = time.perf_counter()
+            vector = await self.embeddings.aembed_query(key)
+            self._put(key, vector, time.perf_counter() - start)
+        return vector
+
+    # -----------------------------------------------------------------------------
+    # LRU
+    # -----------------------------------------------------------------------------
+    def _get(self, key: str):
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                return None
+            self._vectors.move_to_end(key)
+            self.hits += 1
+            # Ogni hit evita un miss di durata media
+            if self.misses:
+                self.latency_saved_s += self.miss_seconds / self.misses
+            return vector
+
+    def _put(self, key: str, vector: List[float], seconds: float) -> None:
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += seconds
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._vectors),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "avg_miss_ms": round(self.miss_seconds / self.misses * 1000, 2) if self.misses else 0.0,
+                "latency_saved_s": round(self.latency_saved_s, 3),
+            }
@@ -0,0 +1,152 @@
+"""
+SwappableVectorStore: riferimento stabile a una collection che può essere
+sostituita a caldo.
+
+Tools e retriever tengono il proxy; quando una collection ricostruita in
+background è completa, .swap() la rende visibile a tutti in un colpo solo.
+Finché non c'è una collection utilizzabile il proxy è in modalità degradata:
+le ricerche restituiscono nessun risultato invece di sollevare errori.
+"""
+
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class SwappableVectorStore(VectorStore):
+    """Proxy verso la collection attiva (None = degradato)"""
+
+    def __init__(self, name: str, embeddings: Embeddings):
+        self.name = name
+        self._embeddings = embeddings
+        self._store: Optional[VectorStore] = None
+        self._lock = threading.Lock()
+
+        # "loading" | "syncing" | "rebuilding" | "ready"
+        # "stale" (sync fallita, dati precedenti) | "degraded" (nessuna collection)
+        self.state = "loading"
+        self.error: Optional[str] = None
+
+    @property
+    def current(self) -> Optional[VectorStore]:
+        return self._store
+
+    def swap(self, store: VectorStore) -> Optional[VectorStore]:
+        """Sostituisce atomicamente la collection attiva, restituisce la precedente"""
+        with self._lock:
+            previous, self._store = self._store, store
+        return previous
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embeddings
+
+    def __getattr__(self, name: str) -> Any:
+        # Metodi specifici del backend (es. Chroma.get, InMemoryVectorIndex.count)
+        store = self.__dict__.get("_store")
+        if store is None:
+            raise AttributeError(f"Collection {self.__dict__.get('name')} non disponibile: {name}")
+        return getattr(store, name)
+
+    # -----------------------------------------------------------------------------
+    # Ricerca (vuota in modalità degradata)
+    # -----------------------------------------------------------------------------
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        store = self._store
+        return store.similarity_search(query, k=k, **kwargs) if store else []
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        store = self._store
+        return await store.asimilarity_search(query, k=k, **kwargs) if store else []
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        store = self._store
+        return store.similarity_search_with_score(query, k=k, **kwargs) if store else []
+
+    def _similarity_search_with_relevance_scores(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        store = self._store
+        return store._similarity_search_with_relevance_scores(query, k=k, **kwargs) if store else []
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        store = self._store
+        return store.similarity_search_by_vector(embedding, k=k, **kwargs) if store else []
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        store = self._store
+        return await store.asimilarity_search_by_vector(embedding, k=k, **kwargs) if store else []
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        store = self._store
+        if store is None:
+            return []
+        return store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, **kwargs)
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        store = self._store
+        return await store.asimilarity_search_with_score(query, k=k, **kwargs) if store else []
+
+    async def _asimilarity_search_with_relevance_scores(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        store = self._store
+        if store is None:
+            return []
+        return await store._asimilarity_search_with_relevance_scores(query, k=k, **kwargs)
+
+    def max_marginal_relevance_search(
+        self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5, **kwargs: Any
+    ) -> List[Document]:
+        store = self._store
+        if store is None:
+            return []
+        return store.max_marginal_relevance_search(
+            query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, **kwargs
+        )
+
+    # -----------------------------------------------------------------------------
+    # Scrittura (richiede una collection attiva)
+    # -----------------------------------------------------------------------------
+    def add_texts(
+        self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any
+    ) -> List[str]:
+        return self._require().add_texts(texts, metadatas=metadatas, **kwargs)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        return self._require().delete(ids=ids, **kwargs)
+
+    def _require(self) -> VectorStore:
+        store = self._store
+        if store is None:
+            raise RuntimeError(f"Collection {self.name} non disponibile ({self.state})")
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> "SwappableVectorStore":
+        # Il proxy non possiede dati: le collection le crea e le sostituisce
+        # DualVectorDatabase (load_collections / _open_collection)
+        raise TypeError(
+            "SwappableVectorStore non si costruisce da testi: usa DualVectorDatabase "
+            "per creare la collection, oppure il backend (es. InMemoryVectorIndex.from_texts) "
+            "e poi SwappableVectorStore.swap()"
+        )
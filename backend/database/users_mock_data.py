@@ -1,11 +1,15 @@
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 
+# Data fissa: contenuti (e content hash) identici a ogni avvio, la sync
+# incrementale non riembedda la collection users
+MOCK_BASE_DATE = datetime(2025, 1, 1)
+
 def get_mock_conversations() -> List[Dict[str, Any]]:
     """
     Genera conversazioni mock per demo del sistema
     """
-    base_date = datetime.now() - timedelta(days=30)
+    base_date = MOCK_BASE_DATE
     
     return [
         {
@@ -0,0 +1,119 @@
+"""
+Backend dei vector store usati da DualVectorDatabase.
+
+Backend disponibili:
+- ChromaBackend: Chroma persistente su disco (default)
+- InMemoryBackend: InMemoryVectorIndex in-process (matrice NumPy, ricerca
+  esatta per cataloghi piccoli, HNSW oltre la soglia), persistito in file
+  .npy/.jsonl nella stessa cartella
+
+Le collection restituite sono VectorStore LangChain (retriever, filtri
+"filter" sui metadati); le operazioni specifiche del backend (conteggio,
+lettura dei metadati, eliminazione) passano da questa interfaccia.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class VectorBackend(ABC):
+    """Interfaccia comune dei backend vettoriali"""
+
+    name: str = ""
+
+    @abstractmethod
+    def open_collection(
+        self, path: str, collection_name: str, embeddings: Embeddings
+    ) -> VectorStore:
+        """Apre (o crea vuota) una collection persistita in path"""
+
+    @abstractmethod
+    def count(self, store: VectorStore) -> int:
+        """Numero di documenti nella collection"""
+
+    @abstractmethod
+    def get_metadatas(
+        self, store: VectorStore, where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """id -> metadati dei documenti (opzionalmente filtrati)"""
+
+    @abstractmethod
+    def drop_collection(self, path: str, collection_name: str, embeddings: Embeddings) -> None:
+        """Elimina la collection e i suoi dati su disco"""
+
+
+# -----------------------------------------------------------------------------
+# Chroma
+# -----------------------------------------------------------------------------
+class ChromaBackend(VectorBackend):
+    name = "chroma"
+
+    def open_collection(self, path, collection_name, embeddings):
+        # Import differito: chromadb pesa sull'avvio, serve solo al warm-up
+        from langchain_community.vectorstores import Chroma
+
+        os.makedirs(path, exist_ok=True)
+        return Chroma(
+            persist_directory=path,
+            embedding_function=embeddings,
+            collection_name=collection_name,
+        )
+
+    def count(self, store):
+        return store._collection.count()
+
+    def get_metadatas(self, store, where=None):
+        records = store.get(where=where, include=["metadatas"])
+        return {
+            doc_id: metadata or {}
+            for doc_id, metadata in zip(records["ids"], records["metadatas"])
+        }
+
+    def drop_collection(self, path, collection_name, embeddings):
+        self.open_collection(path, collection_name, embeddings).delete_collection()
+
+
+# -----------------------------------------------------------------------------
+# In-memory (NumPy / HNSW)
+# -----------------------------------------------------------------------------
+class InMemoryBackend(VectorBackend):
+    name = "memory"
+
+    def __init__(self, hnsw_threshold: int = 50_000, hnsw_ef_search: int = 64):
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_ef_search = hnsw_ef_search
+
+    def open_collection(self, path, collection_name, embeddings):
+        from .memory_vector_store import InMemoryVectorIndex
+
+        return InMemoryVectorIndex(
+            embeddings,
+            persist_path=os.path.join(path, collection_name),
+            hnsw_threshold=self.hnsw_threshold,
+            hnsw_ef_search=self.hnsw_ef_search,
+        )
+
+    def count(self, store):
+        return store.count()
+
+    def get_metadatas(self, store, where=None):
+        return store.get_metadatas(where)
+
+    def drop_collection(self, path, collection_name, embeddings):
+        self.open_collection(path, collection_name, embeddings).delete_collection()
+
+
+def create_vector_backend(config) -> VectorBackend:
+    """Istanzia il backend scelto in Config.vector_backend"""
+    if config.vector_backend == "chroma":
+        return ChromaBackend()
+    if config.vector_backend == "memory":
+        return InMemoryBackend(
+            hnsw_threshold=config.vector_hnsw_threshold,
+            hnsw_ef_search=config.vector_hnsw_ef_search,
+        )
+    raise ValueError(f"Vector backend non supportato: {config.vector_backend}")
@@ -1,12 +1,23 @@
+import hashlib
+import json
 import os
-from typing import Any, Dict, List
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
 
-from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
 from langchain_openai import OpenAIEmbeddings
 
+from .embedding_cache import CachedEmbeddings
+from .field_vectors import FilmFieldIndex
 from .films_data import get_enhanced_films_data
+from .lexical_index import FilmLexicalIndex
+from .metadata_index import FilmMetadataIndex
+from .query_embedding_cache import QueryEmbeddingCache
+from .swappable_store import SwappableVectorStore
 from .users_mock_data import get_mock_conversations
+from .vector_backends import create_vector_backend
 
 
 class DualVectorDatabase:
@@ -16,10 +27,48 @@ class DualVectorDatabase:
         self.config = config
         self.embeddings = OpenAIEmbeddings(api_key=config.openai_api_key)
 
+        # Cache persistente: documenti e query già visti non richiamano l'API
+        self.embedding_cache: Optional[CachedEmbeddings] = None
+        if config.embedding_cache_path:
+            self.embedding_cache = CachedEmbeddings(self.embeddings, config.embedding_cache_path)
+            self.embeddings = self.embedding_cache
+
+        # LRU delle query normalizzate davanti a tutto (miss -> disco -> API)
+        self.query_cache: Optional[QueryEmbeddingCache] = None
+        if config.query_embedding_cache_size:
+            self.query_cache = QueryEmbeddingCache(
+                self.embeddings, max_entries=config.query_embedding_cache_size
+            )
+            self.embeddings = self.query_cache
+
+        # Motore vettoriale delle collections (Config.vector_backend)
+        self.backend = create_vector_backend(config)
+
         # Vector Stores
         self.films_store = None
         self.users_store = None
 
+        # Indice BM25 su titolo/cast/regista/generi, ricostruito a ogni sync dei film
+        self.films_lexical = FilmLexicalIndex()
+        # Metadati tipizzati (bitset / array ordinati) per i filtri strutturati
+        self.films_metadata = FilmMetadataIndex()
+        # Un vettore per campo di enhanced_description (None = documento unico)
+        self.films_fields = (
+            FilmFieldIndex(self.embeddings, aggregation=config.field_aggregation)
+            if config.film_representation == "multi"
+            else None
+        )
+
+        # Callback invocate dopo ogni ricostruzione della collection films
+        self._films_rebuild_listeners: List[Callable[[], None]] = []
+
+        # Sync / ricostruzioni in background, una per collection
+        self._workers: List[threading.Thread] = []
+
+    def add_films_rebuild_listener(self, callback: Callable[[], None]) -> None:
+        """Registra una callback da chiamare quando il catalogo film viene ricostruito"""
+        self._films_rebuild_listeners.append(callback)
+
     def _convert_metadata_for_chroma(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
         Converte metadati per compatibilità Chroma:
@@ -50,13 +99,13 @@ class DualVectorDatabase:
 
         return converted
 
-    def create_films_collection(self) -> Chroma:
+    def _film_documents(self) -> Dict[str, Document]:
         """
-        Crea collection films con descrizioni molto ricche
+        Documenti della collection films con descrizioni molto ricche
         Focus su mood, atmosfere e trama dettagliata per semantic search
         """
         films_data = get_enhanced_films_data()
-        documents = []
+        documents = {}
 
         for film in films_data:
             # Content MOLTO ricco per embedding
@@ -65,27 +114,19 @@ class DualVectorDatabase:
             # Converti metadati per Chroma (liste -> stringhe)
             chroma_metadata = self._convert_metadata_for_chroma(film)
 
-            doc = Document(page_content=content, metadata=chroma_metadata)
-            documents.append(doc)
-
-        # Crea vector store Chroma con persistenza automatica
-        os.makedirs(self.config.films_vectorstore_path, exist_ok=True)
-        films_store = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=self.config.films_vectorstore_path,
-            collection_name="films",
-        )
+            # Id deterministico dal catalogo: nessun duplicato tra una sync e l'altra
+            documents[f"film_{film['id']}"] = Document(
+                page_content=content, metadata=chroma_metadata
+            )
 
-        print(f"✅ Films collection creata: {len(documents)} film")
-        return films_store
+        return documents
 
-    def create_users_collection(self) -> Chroma:
+    def _user_documents(self) -> Dict[str, Document]:
         """
-        Crea collection users con mock conversation history
+        Documenti della collection users con mock conversation history
         """
         conversations = get_mock_conversations()
-        documents = []
+        documents = {}
 
         for conv in conversations:
             content = f"""
@@ -112,23 +153,74 @@ class DualVectorDatabase:
                 }
             )
 
-            doc = Document(
+            documents[f"user_{conv['user_id']}"] = Document(
                 page_content=content,
                 metadata=chroma_metadata,
             )
-            documents.append(doc)
-
-        # Crea vector store Chroma con persistenza automatica
-        os.makedirs(self.config.users_vectorstore_path, exist_ok=True)
-        users_store = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=self.config.users_vectorstore_path,
-            collection_name="users",
+
+        return documents
+
+    def _content_hash(self, doc: Document) -> str:
+        """Hash di contenuto + metadati: cambia solo se il record cambia"""
+        payload = json.dumps(
+            [doc.page_content, doc.metadata], sort_keys=True, ensure_ascii=False
         )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _sync_collection(
+        self, store: VectorStore, documents: Dict[str, Document]
+    ) -> Dict[str, int]:
+        """
+        Allinea la collection ai documenti attesi (id -> Document): embedda e
+        fa upsert solo dei record nuovi o modificati, elimina quelli rimossi.
+        """
+        existing_hashes = {
+            doc_id: metadata.get("content_hash")
+            for doc_id, metadata in self.backend.get_metadatas(store).items()
+        }
+
+        changed_ids = []
+        for doc_id, doc in documents.items():
+            doc.metadata["content_hash"] = self._content_hash(doc)
+            if existing_hashes.get(doc_id) != doc.metadata["content_hash"]:
+                changed_ids.append(doc_id)
+
+        # Anche i documenti senza id deterministico (versioni precedenti) vengono rimossi
+        removed_ids = [doc_id for doc_id in existing_hashes if doc_id not in documents]
+
+        if changed_ids:
+            store.add_documents([documents[i] for i in changed_ids], ids=changed_ids)
+        if removed_ids:
+            store.delete(ids=removed_ids)
+
+        added = sum(1 for doc_id in changed_ids if doc_id not in existing_hashes)
+        return {
+            "added": added,
+            "updated": len(changed_ids) - added,
+            "deleted": len(removed_ids),
+        }
+
+    # -----------------------------------------------------------------------------
+    # Collection attiva: puntatore su disco, cambiato solo a ricostruzione completa
+    # -----------------------------------------------------------------------------
+    def _open_collection(self, path: str, collection_name: str) -> VectorStore:
+        return self.backend.open_collection(path, collection_name, self.embeddings)
+
+    def _active_pointer(self, path: str, name: str) -> str:
+        return os.path.join(path, f"{name}.active")
+
+    def _active_collection_name(self, path: str, name: str) -> str:
+        try:
+            with open(self._active_pointer(path, name), encoding="utf-8") as f:
+                return f.read().strip() or name
+        except OSError:
+            return name
 
-        print(f"✅ Users collection creata: {len(documents)} conversazioni")
-        return users_store
+    def _set_active_collection_name(self, path: str, name: str, collection_name: str) -> None:
+        pointer = self._active_pointer(path, name)
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(collection_name)
+        os.replace(pointer + ".tmp", pointer)
 
     def _create_rich_film_content(self, film: Dict[str, Any]) -> str:
         """
@@ -158,40 +250,148 @@ class DualVectorDatabase:
         RATING: {film['imdb_rating']}/10 - {film['content_rating']}
         """
 
-    def load_collections(self) -> tuple[Chroma, Chroma]:
-        """Carica entrambe le collections da disco"""
+    def load_collections(self) -> tuple[SwappableVectorStore, SwappableVectorStore]:
+        """
+        Carica entrambe le collections da disco senza bloccare l'avvio.
+
+        Health check separato per collection:
+        - sana: servita subito, sync incrementale con i dati sorgente in background
+        - vuota o illeggibile: ricostruita in background in una nuova collection,
+          servita in modalità degradata (nessun risultato) fino allo swap atomico
+        """
+        self.films_store = self._load_collection(
+            "films", self.config.films_vectorstore_path, self._film_documents
+        )
+        self.users_store = self._load_collection(
+            "users", self.config.users_vectorstore_path, self._user_documents
+        )
+        return self.films_store, self.users_store
+
+    def _load_collection(
+        self,
+        name: str,
+        path: str,
+        build_documents: Callable[[], Dict[str, Document]],
+    ) -> SwappableVectorStore:
+        proxy = SwappableVectorStore(name, self.embeddings)
+        active_name = self._active_collection_name(path, name)
+
+        error: Optional[str] = None
         try:
-            # Prova a caricare collections Chroma esistenti
-            films_store = Chroma(
-                persist_directory=self.config.films_vectorstore_path,
-                embedding_function=self.embeddings,
-                collection_name="films",
-            )
-            users_store = Chroma(
-                persist_directory=self.config.users_vectorstore_path,
-                embedding_function=self.embeddings,
-                collection_name="users",
-            )
+            store = self._open_collection(path, active_name)
+            count = self.backend.count(store)
+            if count == 0:
+                error = "collection vuota"
+        except Exception as e:
+            error = str(e)
 
-            # Verifica che le collections abbiano dati
-            films_count = films_store._collection.count()
-            users_count = users_store._collection.count()
+        if error is None:
+            print(f"✅ Collection {name} caricata da disco: {count} documenti")
+            proxy.swap(store)
+            proxy.state = "syncing"
+            rebuild = False
+        else:
+            print(f"⚠️ Collection {name} non utilizzabile ({error}): ricostruzione in background")
+            proxy.state = "rebuilding"
+            proxy.error = error
+            rebuild = True
 
-            if films_count == 0 or users_count == 0:
-                print(
-                    f"⚠️ Collections vuote (films: {films_count}, users: {users_count})"
-                )
-                raise ValueError("Collections vuote, ricreazione necessaria")
+        worker = threading.Thread(
+            target=self._refresh_collection,
+            args=(proxy, path, active_name, build_documents, rebuild),
+            name=f"collection-{name}",
+            daemon=True,
+        )
+        self._workers.append(worker)
+        worker.start()
+        return proxy
+
+    def _refresh_collection(
+        self,
+        proxy: SwappableVectorStore,
+        path: str,
+        active_name: str,
+        build_documents: Callable[[], Dict[str, Document]],
+        rebuild: bool,
+    ) -> None:
+        """Sync incrementale della collection attiva, o ricostruzione + swap"""
+        try:
+            documents = build_documents()
 
-            print(f"✅ Vector stores Chroma caricati da disco")
-            print(f"📊 Films: {films_count} documenti, Users: {users_count} documenti")
-            return films_store, users_store
+            # Indici lessicale e dei metadati dai dati sorgente: disponibili
+            # anche mentre la collection è in ricostruzione
+            if proxy.name == "films":
+                films = get_enhanced_films_data()
+                self.films_lexical.build(films, documents)
+                self.films_metadata.build(films)
+                self._build_field_index(films, documents)
 
+            if rebuild:
+                # Nuova collection con nome versionato: quella attiva non viene toccata
+                new_name = f"{proxy.name}_{int(time.time())}"
+                store = self._open_collection(path, new_name)
+                changes = self._sync_collection(store, documents)
+                self._set_active_collection_name(path, proxy.name, new_name)
+                proxy.swap(store)
+                self._drop_collection(path, active_name)
+            else:
+                changes = self._sync_collection(proxy.current, documents)
+
+            proxy.state = "ready"
+            proxy.error = None
+            print(f"✅ Collection {proxy.name} sincronizzata: {len(documents)} documenti {changes}")
+
+            if proxy.name == "films" and (rebuild or any(changes.values())):
+                for callback in self._films_rebuild_listeners:
+                    callback()
+
+        except Exception as e:
+            print(f"❌ Errore sync collection {proxy.name}: {e}")
+            proxy.error = str(e)
+            proxy.state = "stale" if proxy.current is not None else "degraded"
+
+    def _build_field_index(self, films: List[Dict[str, Any]], documents: Dict[str, Document]) -> None:
+        """Vettori per campo; se fallisce la ricerca resta sul documento unico"""
+        if self.films_fields is None:
+            return
+        try:
+            self.films_fields.build(films, documents)
+            print(f"✅ Indice multi-campo films: {self.films_fields.stats()['vectors']} vettori")
+        except Exception as e:
+            print(f"⚠️ Indice multi-campo films non disponibile: {e}")
+
+    def _drop_collection(self, path: str, collection_name: str) -> None:
+        """Elimina la collection sostituita (best effort: può essere corrotta)"""
+        try:
+            self.backend.drop_collection(path, collection_name, self.embeddings)
         except Exception as e:
-            print(f"❌ Errore caricamento Chroma: {e}")
-            print("🔄 Ricreo le collections...")
+            print(f"⚠️ Collection {collection_name} non eliminata: {e}")
+
+    def wait_for_collections(self, timeout: Optional[float] = None) -> None:
+        """Attende la fine di sync e ricostruzioni in background (script e benchmark)"""
+        for worker in self._workers:
+            worker.join(timeout)
 
-            films_store = self.create_films_collection()
-            users_store = self.create_users_collection()
+    def get_metadatas(
+        self, proxy: SwappableVectorStore, where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Metadati dei documenti di una collection (nessuno se non disponibile)"""
+        store = proxy.current if proxy is not None else None
+        if store is None:
+            return []
+        return list(self.backend.get_metadatas(store, where).values())
 
-            return films_store, users_store
+    def collections_status(self) -> Dict[str, Dict[str, Any]]:
+        """Stato di ogni collection: ready, syncing, rebuilding, stale o degraded"""
+        status = {}
+        for proxy in (self.films_store, self.users_store):
+            if proxy is None:
+                continue
+            store = proxy.current
+            status[proxy.name] = {
+                "state": proxy.state,
+                "backend": self.backend.name,
+                "documents": self.backend.count(store) if store is not None else 0,
+                "error": proxy.error,
+            }
+        return status
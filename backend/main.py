@@ -1,11 +1,91 @@
-from agent.agent import MovieChatAgent
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional
+
 from config import Config
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from starlette.websockets import WebSocketState
+from utils.warmup import WarmupCancelled, WarmupTracker
 from websockets.exceptions import ConnectionClosedError
 
-app = FastAPI(title="Netflix AI Chat Backend")
+if TYPE_CHECKING:
+    from agent.agent import MovieChatAgent
+
+config = Config()
+
+# Agent globale: costruito in background dal lifespan, il server accetta
+# connessioni subito e i turni attendono la fine del warm-up
+movie_agent: Optional["MovieChatAgent"] = None
+_agent_task: Optional[asyncio.Task] = None
+warmup = WarmupTracker(["vector_stores", "web_clients", "agent_graph"])
+
+AGENT_UNAVAILABLE_MESSAGE = (
+    "Mi dispiace, il servizio non è disponibile al momento. Riprova tra qualche istante."
+)
+
+
+async def _build_agent() -> "MovieChatAgent":
+    """Vector stores e web clients in parallelo, poi il grafo dell'agent"""
+    global movie_agent
+
+    try:
+        # Import differiti: LangChain/Chroma/OpenAI non rallentano il bind del server
+        from agent.agent import MovieChatAgent, create_web_search_config, load_vector_database
+        from tools.web_movie_research import WebSearchClients
+
+        db_manager, web_clients = await asyncio.gather(
+            asyncio.to_thread(warmup.run, "vector_stores", load_vector_database, config),
+            asyncio.to_thread(
+                warmup.run, "web_clients", WebSearchClients, create_web_search_config(config)
+            ),
+        )
+        movie_agent = await asyncio.to_thread(
+            warmup.run,
+            "agent_graph",
+            MovieChatAgent,
+            config,
+            db_manager=db_manager,
+            web_clients=web_clients,
+        )
+    except WarmupCancelled as e:
+        print(f"⏹️ Warm-up interrotto dallo shutdown ({e})")
+        raise
+    except Exception as e:
+        print(f"❌ Warm-up dell'agent fallito: {e}")
+        raise
+
+    print("✅ Agent pronto")
+    return movie_agent
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _agent_task
+    _agent_task = asyncio.create_task(_build_agent())
+    yield
+
+    # Shutdown: gli step su thread non si cancellano, si impedisce l'avvio dei
+    # successivi e si attendono quelli in corso (al massimo il timeout)
+    warmup.cancel()
+    _agent_task.cancel()
+    try:
+        await _agent_task
+    except (asyncio.CancelledError, Exception):
+        pass
+    idle = await asyncio.to_thread(warmup.wait_idle, config.warmup_shutdown_timeout_seconds)
+    if not idle:
+        print("⚠️ Warm-up ancora in corso allo shutdown: risultato scartato")
+
+
+async def _get_agent() -> "MovieChatAgent":
+    """Agent pronto, attendendo il warm-up se ancora in corso"""
+    # shield: la cancellazione di un turno non interrompe il warm-up condiviso
+    return await asyncio.shield(_agent_task)
+
+
+app = FastAPI(title="Netflix AI Chat Backend", lifespan=lifespan)
 
 # Configura CORS per permettere connessioni dal frontend
 app.add_middleware(
@@ -16,37 +96,98 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-config = Config()
 
-# Inizializza agent globale
-movie_agent = MovieChatAgent(config)
+async def _stream_response(
+    websocket: WebSocket, agent: "MovieChatAgent", user_message: str, user_id: str
+):
+    """Inoltra al client gli eventi di streaming dell'agent come frame JSON"""
+    async for event in agent.astream_message(user_message, user_id):
+        if websocket.client_state != WebSocketState.CONNECTED:
+            return
+        await websocket.send_json(event)
+
+
+async def _handle_message(
+    websocket: WebSocket, user_message: str, user_id: str, stream: bool
+):
+    """Esegue un turno dell'agent e invia la risposta (gira come task cancellabile)"""
+    try:
+        try:
+            agent = await _get_agent()
+        except Exception as e:
+            print(f"Agent non disponibile: {e}")
+            if websocket.client_state == WebSocketState.CONNECTED:
+                if stream:
+                    await websocket.send_json(
+                        {"type": "end", "content": AGENT_UNAVAILABLE_MESSAGE}
+                    )
+                else:
+                    await websocket.send_text(AGENT_UNAVAILABLE_MESSAGE)
+            return
+
+        if stream:
+            await _stream_response(websocket, agent, user_message, user_id)
+            return
+
+        # Processa messaggio con l'agent (async: non blocca le altre connessioni)
+        response = await agent.aprocess_message(user_message, user_id)
+
+        # Verifica che la connessione sia ancora aperta prima di inviare
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_text(response)
+
+    except asyncio.CancelledError:
+        print(f"Turn cancelled for user: {user_id}")
+        raise
+    except Exception as send_error:
+        print(f"Error sending response: {send_error}")
+
+
+async def _cancel_turn(task: Optional[asyncio.Task]) -> None:
+    """
+    Cancella il turno in corso e attende che termini.
+    La CancelledError si propaga lungo ainvoke fino alle chiamate HTTP
+    verso OpenAI/Tavily, interrompendole.
+    """
+    if task is None or task.done():
+        return
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
 
 
 @app.websocket("/chat/{user_id}")
-async def chat_endpoint(websocket: WebSocket, user_id: str):
+async def chat_endpoint(websocket: WebSocket, user_id: str, stream: bool = False):
     """
     WebSocket endpoint per chat real-time
     Gestisce conversazioni persistenti per user_id
+
+    Con ?stream=true ogni risposta arriva come sequenza di frame JSON
+    {"type": "status" | "token" | "end", "content": ...}; altrimenti come
+    singolo messaggio di testo.
+
+    Ogni turno gira in un task dedicato: un nuovo messaggio cancella il turno
+    precedente ancora in corso, e la disconnessione cancella quello attivo.
     """
     await websocket.accept()
 
+    # Turno dell'agent attualmente in esecuzione su questa connessione
+    current_turn: Optional[asyncio.Task] = None
+
     try:
         while True:
             # Ricevi messaggio utente
             user_message = await websocket.receive_text()
 
-            # Processa messaggio con l'agent
-            response = movie_agent.process_message(user_message, user_id)
+            # Il nuovo messaggio sostituisce l'eventuale turno ancora in corso
+            await _cancel_turn(current_turn)
 
-            # Verifica che la connessione sia ancora aperta prima di inviare
-            if websocket.client_state == WebSocketState.CONNECTED:
-                try:
-                    await websocket.send_text(response)
-                except Exception as send_error:
-                    print(f"Error sending response: {send_error}")
-                    break
-            else:
-                break
+            current_turn = asyncio.create_task(
+                _handle_message(websocket, user_message, user_id, stream)
+            )
 
     except WebSocketDisconnect as e:
         print(f"User disconnected: {user_id} - Code: {e.code}")
@@ -55,6 +196,9 @@ async def chat_endpoint(websocket: WebSocket, user_id: str):
     except Exception as e:
         print(f"Error in chat for {user_id}: {e}")
     finally:
+        # Nessuno leggerà più la risposta: interrompi il turno in corso
+        await _cancel_turn(current_turn)
+
         # Chiusura sicura - controlla stato prima di chiudere
         try:
             if websocket.client_state == WebSocketState.CONNECTED:
@@ -65,7 +209,48 @@ async def chat_endpoint(websocket: WebSocket, user_id: str):
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "agent": "ready"}
+    """Liveness: il processo risponde, anche durante il warm-up"""
+    if movie_agent is None:
+        return {"status": "healthy", "agent": "warming_up"}
+
+    collections = movie_agent.get_collections_status()
+    degraded = any(c["state"] in ("rebuilding", "degraded") for c in collections.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "agent": "ready",
+        "collections": collections,
+    }
+
+
+@app.get("/ready")
+async def readiness():
+    """Readiness: stato del warm-up di ogni componente (503 finché non è completo)"""
+    body = {"ready": warmup.ready, "components": warmup.status()}
+    if movie_agent is not None:
+        body["collections"] = movie_agent.get_collections_status()
+    return JSONResponse(body, status_code=200 if warmup.ready else 503)
+
+
+@app.get("/stats")
+async def stats():
+    """Metriche runtime dell'agent"""
+    if movie_agent is None:
+        return JSONResponse({"detail": "Agent in warm-up"}, status_code=503)
+    return {
+        "sessions": movie_agent.get_session_stats(),
+        "history": movie_agent.get_history_stats(),
+        "query_rewrite": movie_agent.get_query_rewrite_stats(),
+        "routing": movie_agent.get_routing_stats(),
+        "speculation": movie_agent.get_speculation_stats(),
+        "hybrid_retrieval": movie_agent.get_hybrid_retrieval_stats(),
+        "metadata_filters": movie_agent.get_metadata_filter_stats(),
+        "field_index": movie_agent.get_field_index_stats(),
+        "answer_cache": movie_agent.get_answer_cache_stats(),
+        "llm_cache": movie_agent.get_llm_cache_stats(),
+        "coalescing": movie_agent.get_coalescing_stats(),
+        "embedding_cache": movie_agent.get_embedding_cache_stats(),
+        "query_embedding_cache": movie_agent.get_query_embedding_cache_stats(),
+    }
 
 
 @app.get("/test-info")
@@ -74,15 +259,33 @@ async def test_info():
     return {
         "backend_status": "running",
         "websocket_endpoint": "/chat/{user_id}",
+        "streaming_endpoint": "/chat/{user_id}?stream=true",
         "user_id_source": "dynamic_session_id",
         "description": "Ogni utente ha un SESSION_ID unico generato dal frontend",
     }
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Netflix AI Chat Backend")
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="Stampa il tempo di import per sottosistema e termina",
+    )
+    args = parser.parse_args()
+
+    if args.profile_imports:
+        from utils.import_profile import print_import_profile
+
+        print_import_profile()
+        raise SystemExit(0)
+
     import uvicorn
 
     print("Starting Netflix AI Chat Backend...")
     print("WebSocket endpoint: ws://localhost:8000/chat/{user_id}")
     print("Health check: http://localhost:8000/health")
+    print("Readiness: http://localhost:8000/ready")
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
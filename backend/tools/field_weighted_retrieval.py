@@ -0,0 +1,65 @@
+# backend/tools/field_weighted_retrieval.py
+# -*- coding: utf-8 -*-
+"""
+Ricerca vettoriale multi-campo per MovieDatabaseSearchTool
+
+Usa il FilmFieldIndex (un vettore per campo di enhanced_description) al posto
+della similarity search sul documento unico: pesi scelti dal tipo di query
+("film che mettono ansia" -> più peso a mood ed emotional_impact), un
+risultato per film, pre-filtro sui film ammessi dal FilmFilter corrente.
+
+Finché l'indice non è pronto (warm-up, errore di embedding) delega al
+retriever vettoriale classico.
+"""
+
+from __future__ import annotations
+
+from typing import Any, List
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from tools.metadata_filter import current_allowed_ids
+
+
+class FieldWeightedRetriever(BaseRetriever):
+    """Top-k film per similarità pesata sui campi (vedi docstring del modulo)."""
+
+    field_index: Any
+    fallback_retriever: BaseRetriever
+    k: int = 5
+
+    def _rank(self, query: str, query_vector: List[float]) -> List[Document]:
+        query_type, weights = self.field_index.weights_for(query)
+        self.field_index.record_query_type(query_type)
+        hits = self.field_index.search_by_vector(
+            query_vector, weights, k=self.k, allowed_ids=current_allowed_ids()
+        )
+        return [doc for doc, _ in hits]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if not self.field_index.ready:
+            return self.fallback_retriever.invoke(
+                query, config={"callbacks": run_manager.get_child()}
+            )
+        allowed = current_allowed_ids()
+        if allowed is not None and not allowed:
+            return []
+        return self._rank(query, self.field_index.embeddings.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if not self.field_index.ready:
+            return await self.fallback_retriever.ainvoke(
+                query, config={"callbacks": run_manager.get_child()}
+            )
+        allowed = current_allowed_ids()
+        if allowed is not None and not allowed:
+            return []
+        return self._rank(query, await self.field_index.embeddings.aembed_query(query))
@@ -0,0 +1,133 @@
+# backend/tools/hybrid_retrieval.py
+# -*- coding: utf-8 -*-
+"""
+Hybrid retrieval (BM25 + vettoriale) per MovieDatabaseSearchTool
+
+- Query che nominano esattamente un titolo, un attore o un regista: risposta
+  dal solo indice lessicale, senza embedding della query né ricerca vettoriale
+- Altre query: risultati BM25 e vettoriali fusi con reciprocal rank fusion
+- Indice lessicale non ancora pronto: solo ricerca vettoriale
+- Filtro strutturato attivo (vedi metadata_filter): entrambe le classifiche
+  sono ristrette ai film ammessi
+
+Espone:
+- reciprocal_rank_fusion(rankings, k, rrf_k) -> documenti fusi
+- HybridRetriever(vector_retriever, lexical_index, k, rrf_k) -> BaseRetriever
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+from tools.metadata_filter import current_allowed_ids
+
+
+def _doc_key(doc: Document) -> Any:
+    # Lo stesso film arriva da indici diversi: identità per id del catalogo
+    return doc.metadata.get("id", doc.page_content)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]], k: int, rrf_k: int = 60
+) -> List[Document]:
+    """Somma di 1 / (rrf_k + rank) su tutte le classifiche, top-k"""
+    scores: Dict[Any, float] = {}
+    documents: Dict[Any, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    ranked = sorted(scores, key=lambda key: -scores[key])[:k]
+    return [documents[key] for key in ranked]
+
+
+class HybridRetriever(BaseRetriever):
+    """Retriever ibrido con short-circuit sulle entità (vedi docstring del modulo)."""
+
+    vector_retriever: BaseRetriever
+    lexical_index: Any
+    k: int = 5
+    rrf_k: int = 60
+
+    # Percorso di ogni ricerca: entity (short-circuit), fused, vector_only
+    _paths: Dict[str, int] = PrivateAttr(
+        default_factory=lambda: {"entity": 0, "fused": 0, "vector_only": 0}
+    )
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self._paths[path] += 1
+
+    def _lexical(self, query: str) -> tuple:
+        """(documenti dell'entità | None, classifica BM25), ristretti ai film ammessi"""
+        if not self.lexical_index.ready:
+            return None, []
+
+        allowed = current_allowed_ids()
+        if allowed is None:
+            entity_docs = self.lexical_index.match_entity(query, k=self.k)
+            if entity_docs is not None:
+                return entity_docs, []
+            return None, [doc for doc, _ in self.lexical_index.search(query, k=self.k * 2)]
+
+        # Con filtro: classifiche complete, poi solo i film ammessi
+        entity_docs = self.lexical_index.match_entity(query, k=None)
+        if entity_docs is not None:
+            return [d for d in entity_docs if d.metadata.get("id") in allowed][: self.k], []
+        lexical = [
+            doc
+            for doc, _ in self.lexical_index.search(query, k=None)
+            if doc.metadata.get("id") in allowed
+        ]
+        return None, lexical[: self.k * 2]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        entity_docs, lexical = self._lexical(query)
+        if entity_docs is not None:
+            self._count("entity")
+            return entity_docs
+
+        vector = self.vector_retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        return self._fuse(vector, lexical)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        entity_docs, lexical = self._lexical(query)
+        if entity_docs is not None:
+            self._count("entity")
+            return entity_docs
+
+        vector = await self.vector_retriever.ainvoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        return self._fuse(vector, lexical)
+
+    def _fuse(self, vector: List[Document], lexical: List[Document]) -> List[Document]:
+        if not lexical:
+            self._count("vector_only")
+            return vector[: self.k]
+        self._count("fused")
+        return reciprocal_rank_fusion([vector, lexical], k=self.k, rrf_k=self.rrf_k)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._paths)
+        lookups = sum(stats.values())
+        stats["embedding_skipped_rate"] = round(stats["entity"] / lookups, 3) if lookups else 0.0
+        stats["lexical_index"] = self.lexical_index.stats()
+        return stats
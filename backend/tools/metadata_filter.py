@@ -0,0 +1,104 @@
+# backend/tools/metadata_filter.py
+# -*- coding: utf-8 -*-
+"""
+Filtri strutturati per MovieDatabaseSearchTool
+
+La ricerca riceve un FilmFilter (generi, cast, regista, anno, rating, durata,
+disponibilità); film_filter_scope() risolve i film ammessi sul
+FilmMetadataIndex una volta sola e li lega alla ricerca corrente tramite una
+ContextVar, come la ricerca speculativa: ricerche concorrenti con filtri
+diversi non si influenzano.
+
+I retriever leggono current_allowed_ids() e pre-filtrano prima dello scoring:
+- PrefilteredVectorRetriever: filtro {"id": {"$in": [...]}} passato al vector store
+- HybridRetriever: classifica BM25 ristretta agli stessi id
+
+Espone:
+- film_filter_scope(film_filter, metadata_index) -> context manager
+- current_allowed_ids() -> frozenset | None (None = nessun filtro attivo)
+- PrefilteredVectorRetriever(vectorstore, k, base_filter) -> BaseRetriever
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional
+
+from database.metadata_index import FilmFilter, FilmMetadataIndex
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Id del catalogo ammessi nella ricerca corrente (None = nessun filtro)
+_allowed_ids: ContextVar[Optional[FrozenSet[Any]]] = ContextVar(
+    "film_filter_allowed_ids", default=None
+)
+
+
+@contextmanager
+def film_filter_scope(
+    film_filter: Optional[FilmFilter], metadata_index: Optional[FilmMetadataIndex]
+) -> Iterator[Optional[FrozenSet[Any]]]:
+    """Attiva il filtro per le ricerche eseguite nel blocco"""
+    allowed = None
+    if film_filter is not None and not film_filter.is_empty() and metadata_index is not None:
+        candidates = metadata_index.candidates(film_filter)
+        allowed = frozenset(candidates) if candidates is not None else None
+
+    token = _allowed_ids.set(allowed)
+    try:
+        yield allowed
+    finally:
+        _allowed_ids.reset(token)
+
+
+def current_allowed_ids() -> Optional[FrozenSet[Any]]:
+    return _allowed_ids.get()
+
+
+def allowed_ids_where(
+    allowed: Optional[FrozenSet[Any]], base_filter: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Filtro "where" (sintassi Chroma) che combina il filtro base con gli id ammessi"""
+    if allowed is None:
+        return base_filter
+    id_filter = {"id": {"$in": sorted(allowed)}}
+    return {"$and": [base_filter, id_filter]} if base_filter else id_filter
+
+
+class PrefilteredVectorRetriever(BaseRetriever):
+    """Similarity search ristretta ai film ammessi dal filtro della ricerca corrente."""
+
+    vectorstore: Any
+    k: int = 5
+    base_filter: Optional[Dict[str, Any]] = None
+
+    def _search_kwargs(self) -> Optional[Dict[str, Any]]:
+        allowed = current_allowed_ids()
+        if allowed is not None and not allowed:
+            return None  # nessun film ammesso: niente ricerca
+        kwargs: Dict[str, Any] = {"k": self.k}
+        where = allowed_ids_where(allowed, self.base_filter)
+        if where:
+            kwargs["filter"] = where
+        return kwargs
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        kwargs = self._search_kwargs()
+        if kwargs is None:
+            return []
+        return self.vectorstore.similarity_search(query, **kwargs)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        kwargs = self._search_kwargs()
+        if kwargs is None:
+            return []
+        return await self.vectorstore.asimilarity_search(query, **kwargs)
@@ -4,27 +4,47 @@
 MovieDatabaseSearchTool (LCEL, fedele alla pipeline originale)
 
 Pipeline:
-1) Contextualization Prompt (history-aware query rewriting)
-2) create_history_aware_retriever(llm, base_retriever, prompt)
+1) QueryRewriter condiviso (history-aware query rewriting, una volta per turno)
+2) standalone query -> base_retriever (riusa la ricerca speculativa del turno, se simile);
+   con un indice lessicale il base_retriever è ibrido BM25 + vettoriale (RRF);
+   un FilmFilter restringe la ricerca ai film ammessi prima dello scoring;
+   con un FilmFieldIndex la parte vettoriale pesa i campi della descrizione
+   in base al tipo di query
 3) QA system prompt (stuff) con MessagesPlaceholder('chat_history')
 4) create_stuff_documents_chain(llm, qa_prompt)
 5) create_retrieval_chain(retriever, question_answer_chain)
 
 Espone:
-- .search(query, chat_history) -> str
-- .as_structured_tool() -> StructuredTool (accetta query + chat_history)
+- .search(query, chat_history, filters) -> str (ricerche identiche concorrenti eseguite una volta)
+- .asearch(query, chat_history, filters) -> str (async, idem)
+- .astream(query, chat_history, filters) -> AsyncIterator[str] (token della risposta)
+- .as_structured_tool() -> StructuredTool (accetta query + chat_history + filtri)
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from langchain.chains import create_history_aware_retriever, create_retrieval_chain
+from langchain.chains import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.retrievers import BaseRetriever
 from langchain_core.pydantic_v1 import BaseModel, Field
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import StructuredTool
+from database.metadata_index import FilmFilter
+from tools.field_weighted_retrieval import FieldWeightedRetriever
+from tools.hybrid_retrieval import HybridRetriever
+from tools.metadata_filter import (
+    PrefilteredVectorRetriever,
+    current_allowed_ids,
+    film_filter_scope,
+)
+from tools.query_rewriter import QueryRewriter
+from tools.speculative_retrieval import SpeculativeRetrieval
+from utils.metrics import ANSWER_LLM_TAG
+from utils.single_flight import SingleFlight, flight_key
 
 
 # -----------------------------------------------------------------------------
@@ -38,6 +58,16 @@ class MovieDBConfig(BaseModel):
         default=None,
         description="Filtro metadati di default per il vector store (es. provider='netflix').",
     )
+    speculative_min_similarity: float = Field(
+        0.25,
+        description="Similarità minima (Jaccard sulle parole di contenuto) per riusare la ricerca speculativa.",
+    )
+    coalesce_requests: bool = Field(
+        True, description="Esegue una sola volta le ricerche identiche in corso."
+    )
+    hybrid_rrf_k: int = Field(
+        60, description="Costante della reciprocal rank fusion tra BM25 e vettoriale."
+    )
 
 
 # -----------------------------------------------------------------------------
@@ -46,7 +76,10 @@ class MovieDBConfig(BaseModel):
 class MovieDatabaseSearchTool:
     """
     Tool RAG per ricerca film su vector store con history-aware retrieval.
-    Accetta un vectorstore compatibile LangChain e un LLM chat.
+    Accetta un vectorstore compatibile LangChain, un LLM chat e opzionalmente
+    un QueryRewriter condiviso con gli altri tools, un FilmLexicalIndex per
+    la ricerca ibrida, un FilmMetadataIndex per i filtri strutturati e un
+    FilmFieldIndex per la ricerca multi-campo.
     """
 
     def __init__(
@@ -54,38 +87,56 @@ class MovieDatabaseSearchTool:
         films_vectorstore,
         llm: BaseChatModel,
         config: Optional[MovieDBConfig] = None,
+        query_rewriter: Optional[QueryRewriter] = None,
+        lexical_index=None,
+        metadata_index=None,
+        field_index=None,
     ):
         self.vectorstore = films_vectorstore
+        self.metadata_index = metadata_index
         self.llm = llm
         self.config = config or MovieDBConfig()
 
-        # ------ (1) Contextualization Prompt -----------------------------------
-        contextualization_prompt_text = (
-            "Given a chat history and the latest user question which might reference context "
-            "in the chat history, formulate a standalone question which can be understood "
-            "without the chat history. Do NOT answer the question; return only the rewritten query."
-        )
+        # Ricerche identiche concorrenti: una sola esecuzione condivisa
+        self.flights = SingleFlight() if self.config.coalesce_requests else None
 
-        self.contextualize_query_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", contextualization_prompt_text),
-                MessagesPlaceholder("chat_history"),
-                ("human", "{input}"),
-            ]
-        )
+        # ------ (1) Query rewriter condiviso (history-aware, memoizzato) -------
+        self.query_rewriter = query_rewriter or QueryRewriter(self.llm)
 
         # ------ (2) Base retriever + history-aware retriever -------------------
-        search_kwargs = {"k": self.config.films_search_k}
-        if self.config.default_metadata_filter:
-            # Alcuni vector store usano "filter", altri "where"; qui seguiamo lo standard LangChain "filter".
-            search_kwargs["filter"] = self.config.default_metadata_filter
+        # Similarity search con il filtro "filter" standard LangChain: default
+        # della config + film ammessi dal FilmFilter della ricerca corrente.
+        # Indici lessicale e multi-campo non conoscono i filtri sui metadati:
+        # con un default_metadata_filter resta la sola ricerca vettoriale classica
+        structured = not self.config.default_metadata_filter
+        self.field_index = field_index if structured else None
 
-        base_retriever = self.vectorstore.as_retriever(search_kwargs=search_kwargs)
+        # Ricerca ibrida: candidati vettoriali in più per la fusione, k finali dopo RRF
+        self.hybrid: Optional[HybridRetriever] = None
+        if lexical_index is not None and structured:
+            self.hybrid = HybridRetriever(
+                vector_retriever=self._vector_retriever(self.config.films_search_k * 2),
+                lexical_index=lexical_index,
+                k=self.config.films_search_k,
+                rrf_k=self.config.hybrid_rrf_k,
+            )
+            base_retriever = self.hybrid
+        else:
+            base_retriever = self._vector_retriever(self.config.films_search_k)
+
+        # Ricerca avviata dall'agent sul messaggio grezzo, riusata se la query coincide
+        # (avviata senza filtri: non vale per le ricerche filtrate)
+        self.speculation = SpeculativeRetrieval(
+            base_retriever,
+            min_similarity=self.config.speculative_min_similarity,
+            bypass=lambda: current_allowed_ids() is not None,
+        )
 
-        self.retriever = create_history_aware_retriever(
-            llm=self.llm,
-            retriever=base_retriever,
-            prompt=self.contextualize_query_prompt,
+        # {input, chat_history} -> standalone query -> documenti
+        self.retriever = (
+            self.query_rewriter.as_runnable() | self.speculation.retriever
+        ).with_config(
+            run_name="history_aware_retriever"
         )
 
         # ------ (3) QA system prompt (stuff) -----------------------------------
@@ -112,8 +163,9 @@ class MovieDatabaseSearchTool:
         )
 
         # ------ (4) Stuff QA chain ---------------------------------------------
+        # LLM taggato: i token della risposta possono andare diretti all'utente
         self.question_answer_chain = create_stuff_documents_chain(
-            self.llm, self.qa_prompt
+            self.llm.with_config(tags=[ANSWER_LLM_TAG]), self.qa_prompt
         )
 
         # ------ (5) Retrieval chain end-to-end ---------------------------------
@@ -122,29 +174,123 @@ class MovieDatabaseSearchTool:
             self.retriever, self.question_answer_chain
         )
 
+    def _vector_retriever(self, k: int) -> BaseRetriever:
+        """Ricerca vettoriale: multi-campo pesata se disponibile, altrimenti documento unico"""
+        retriever = PrefilteredVectorRetriever(
+            vectorstore=self.vectorstore,
+            k=k,
+            base_filter=self.config.default_metadata_filter,
+        )
+        if self.field_index is None:
+            return retriever
+        return FieldWeightedRetriever(
+            field_index=self.field_index, fallback_retriever=retriever, k=k
+        )
+
     # -----------------------------------------------------------------------------
     # API fedele e trasparente
     # -----------------------------------------------------------------------------
-    def search(self, query: str, chat_history: Optional[List[Any]] = None) -> str:
+    def search(
+        self,
+        query: str,
+        chat_history: Optional[List[Any]] = None,
+        config: Optional[RunnableConfig] = None,
+        filters: Optional[FilmFilter] = None,
+    ) -> str:
         """
         Esegue la RAG chain con history awareness e restituisce la risposta testuale.
 
         Args:
             query: la domanda dell'utente.
             chat_history: lista di messaggi compatibili con MessagesPlaceholder (può essere []).
+            config: RunnableConfig opzionale (callbacks, tags) per la chain.
+            filters: FilmFilter opzionale (generi, cast, regista, anno, rating, durata).
 
         Returns:
             La stringa in result["answer"] prodotta dalla retrieval chain.
         """
+        if self.flights is None:
+            return self._search(query, chat_history, config, filters)
+        return self.flights.do(
+            flight_key(query, chat_history, filters, config),
+            lambda: self._search(query, chat_history, config, filters),
+            config,
+        )
+
+    def _search(
+        self,
+        query: str,
+        chat_history: Optional[List[Any]] = None,
+        config: Optional[RunnableConfig] = None,
+        filters: Optional[FilmFilter] = None,
+    ) -> str:
         try:
-            result = self.rag_chain.invoke(
-                {"input": query, "chat_history": chat_history or []}
-            )
+            with film_filter_scope(filters, self.metadata_index):
+                result = self.rag_chain.invoke(
+                    {"input": query, "chat_history": chat_history or []}, config=config
+                )
             # create_retrieval_chain ritorna un dict con chiave "answer" (e spesso anche "context")
             return result.get("answer", "")
         except Exception as e:
             return f"❌ Errore ricerca database: {e}"
 
+    async def asearch(
+        self,
+        query: str,
+        chat_history: Optional[List[Any]] = None,
+        config: Optional[RunnableConfig] = None,
+        filters: Optional[FilmFilter] = None,
+    ) -> str:
+        """
+        Versione async di .search(): stessa pipeline, eseguita con ainvoke
+        (retriever, embeddings e LLM non bloccano l'event loop).
+        """
+        if self.flights is None:
+            return await self._asearch(query, chat_history, config, filters)
+        return await self.flights.ado(
+            flight_key(query, chat_history, filters, config),
+            lambda: self._asearch(query, chat_history, config, filters),
+            config,
+        )
+
+    async def _asearch(
+        self,
+        query: str,
+        chat_history: Optional[List[Any]] = None,
+        config: Optional[RunnableConfig] = None,
+        filters: Optional[FilmFilter] = None,
+    ) -> str:
+        try:
+            with film_filter_scope(filters, self.metadata_index):
+                result = await self.rag_chain.ainvoke(
+                    {"input": query, "chat_history": chat_history or []}, config=config
+                )
+            return result.get("answer", "")
+        except Exception as e:
+            return f"❌ Errore ricerca database: {e}"
+
+    async def astream(
+        self,
+        query: str,
+        chat_history: Optional[List[Any]] = None,
+        config: Optional[RunnableConfig] = None,
+        filters: Optional[FilmFilter] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Come .asearch() ma restituisce i frammenti di result["answer"]
+        man mano che l'LLM di QA li genera.
+        """
+        try:
+            with film_filter_scope(filters, self.metadata_index):
+                async for chunk in self.rag_chain.astream(
+                    {"input": query, "chat_history": chat_history or []}, config=config
+                ):
+                    answer = chunk.get("answer")
+                    if answer:
+                        yield answer
+        except Exception as e:
+            yield f"❌ Errore ricerca database: {e}"
+
     # -----------------------------------------------------------------------------
     # StructuredTool factory
     # -----------------------------------------------------------------------------
@@ -156,15 +302,66 @@ class MovieDatabaseSearchTool:
             default=None,
             description="Cronologia conversazionale per contestualizzare la query (può essere []).",
         )
+        # Filtri strutturati (opzionali): applicati prima della ricerca semantica
+        genres: Optional[List[str]] = Field(
+            default=None, description="Generi richiesti, tutti presenti (es. ['Sci-Fi', 'Thriller'])."
+        )
+        actors: Optional[List[str]] = Field(
+            default=None, description="Attori richiesti nel cast, tutti presenti."
+        )
+        director: Optional[str] = Field(default=None, description="Regista.")
+        min_year: Optional[int] = Field(default=None, description="Anno di uscita minimo (incluso).")
+        max_year: Optional[int] = Field(default=None, description="Anno di uscita massimo (incluso).")
+        min_rating: Optional[float] = Field(default=None, description="Rating IMDb minimo.")
+        max_duration_minutes: Optional[int] = Field(
+            default=None, description="Durata massima in minuti."
+        )
+        availability_type: Optional[str] = Field(
+            default=None, description="Disponibilità: 'included', 'rental' o 'unavailable'."
+        )
+
+    @staticmethod
+    def _film_filter(
+        genres: Optional[List[str]] = None,
+        actors: Optional[List[str]] = None,
+        director: Optional[str] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        max_duration_minutes: Optional[int] = None,
+        availability_type: Optional[str] = None,
+    ) -> Optional[FilmFilter]:
+        """FilmFilter dagli argomenti del tool (None se nessun filtro)"""
+        film_filter = FilmFilter(
+            genres=tuple(genres or ()),
+            cast=tuple(actors or ()),
+            director=director,
+            availability_type=availability_type,
+            min_year=min_year,
+            max_year=max_year,
+            min_rating=min_rating,
+            max_duration_minutes=max_duration_minutes,
+        )
+        return None if film_filter.is_empty() else film_filter
 
     def as_structured_tool(self) -> StructuredTool:
         """
         Restituisce uno StructuredTool 'movie_database_search' da registrare nell'orchestratore.
-        Accetta 'query' e 'chat_history' e richiama .search() senza alterare la pipeline.
+        Accetta 'query', 'chat_history' e i filtri strutturati opzionali e richiama
+        .search() / .asearch() senza alterare la pipeline.
         """
 
-        def _run(query: str, chat_history: Optional[List[Any]] = None) -> str:
-            return self.search(query=query, chat_history=chat_history)
+        def _run(query: str, chat_history: Optional[List[Any]] = None, **filters: Any) -> str:
+            return self.search(
+                query=query, chat_history=chat_history, filters=self._film_filter(**filters)
+            )
+
+        async def _arun(
+            query: str, chat_history: Optional[List[Any]] = None, **filters: Any
+        ) -> str:
+            return await self.asearch(
+                query=query, chat_history=chat_history, filters=self._film_filter(**filters)
+            )
 
         return StructuredTool.from_function(
             name="movie_database_search",
@@ -173,10 +370,13 @@ class MovieDatabaseSearchTool:
                 "Use to look if a movie is in the Netflix database."
                 "case 1) If information about a film is not present in the database, it's NOT available on Netflix."
                 "case 2) If the movie_search_tool gives any info about a film, it means the film IS AVAILABLE ON NETFLIX."
-                "Supports semantic search and metadata filtering (USE ACCORDING TO THE REQUEST)."
+                "Supports semantic search and metadata filtering (USE ACCORDING TO THE REQUEST): "
+                "genres, actors, director, min_year/max_year, min_rating, max_duration_minutes, "
+                "availability_type."
                 "Returns availability info and Netflix URLs when present in metadata."
                 "Answers in Italian."
             ),
             args_schema=self._Args,
             func=_run,
+            coroutine=_arun,
         )
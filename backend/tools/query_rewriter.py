@@ -0,0 +1,206 @@
+# backend/tools/query_rewriter.py
+# -*- coding: utf-8 -*-
+"""
+QueryRewriter: stage unico di contextualization (history-aware query rewriting)
+
+Condiviso da MovieDatabaseSearchTool e WebMovieResearchTool: la standalone query
+viene calcolata una sola volta per (chat_history, input) e memorizzata in un
+piccolo LRU, così un turno che usa entrambi i tools paga un solo rewrite.
+Se la history è vuota o la query è già autonoma (needs_rewrite), l'LLM non
+viene chiamato affatto.
+
+Espone:
+- needs_rewrite(query) -> bool (detector locale, IT/EN)
+- .rewrite(query, chat_history) -> str
+- .arewrite(query, chat_history) -> str (async)
+- .as_runnable() -> Runnable {input, chat_history} -> str
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import convert_to_messages, get_buffer_string
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnableLambda
+from utils.prompts import get_contextualize_query_prompt
+
+# -----------------------------------------------------------------------------
+# Detector locale: la query dipende dalla history?
+# -----------------------------------------------------------------------------
+# Pronomi, dimostrativi e riferimenti anaforici (italiano + inglese).
+# Articoli ambigui come "la", "lo", "le", "gli" sono esclusi di proposito.
+_ANAPHORA_WORDS = {
+    # italiano
+    "ne", "questo", "questa", "questi", "queste", "quello", "quella", "quelli",
+    "quelle", "quel", "stesso", "stessa", "stessi", "stesse", "simile", "simili",
+    "altro", "altra", "altri", "altre", "suo", "sua", "suoi", "sue", "lui", "lei",
+    "loro", "esso", "essa", "primo", "prima", "secondo", "seconda", "terzo",
+    "terza", "ultimo", "ultima", "precedente", "sopra", "citato", "citati",
+    "menzionato", "detto", "anche", "invece", "ancora", "più", "meno",
+    # inglese
+    "it", "its", "that", "this", "those", "these", "they", "them", "their",
+    "he", "she", "him", "her", "his", "one", "ones", "same", "similar", "other",
+    "another", "else", "more", "also", "instead", "first", "second", "third",
+    "last", "previous", "former", "latter", "above", "mentioned",
+}
+
+# Pronomi clitici attaccati al verbo: "guardarlo", "vederla", "consigliamene", "dimmelo"
+_CLITIC_RE = re.compile(
+    r"\w+(?:ar|er|ir|a|i|e)(?:lo|la|li|le|ne|melo|mela|meli|mene|telo|glielo|gliela)\b"
+)
+
+# Ellissi: la frase riprende il discorso precedente ("e horror?", "what about 2010?")
+_CONTINUATION_RE = re.compile(
+    r"^(?:e|ed|ma|però|oppure|o|anche|invece|and|but|or|also|what about|how about)\b"
+)
+
+# Domande brevissime che hanno senso solo nel contesto ("perché?", "quale?", "why?")
+_BARE_QUESTION_WORDS = {
+    "perché", "perche", "quale", "quali", "quando", "dove", "chi", "come",
+    "quanto", "why", "which", "when", "where", "who", "how", "what",
+}
+
+_WORD_RE = re.compile(r"[\wàèéìòù']+")
+
+
+def needs_rewrite(query: str) -> bool:
+    """
+    Heuristica locale (nessuna chiamata LLM): True se la query contiene
+    pronomi, anafore o ellissi che richiedono la history per essere capita.
+    Nel dubbio restituisce True.
+    """
+    text = query.strip().lower()
+    words = [w.split("'")[-1] for w in _WORD_RE.findall(text)]
+    if not words:
+        return False
+
+    if _CONTINUATION_RE.match(text):
+        return True
+
+    if len(words) <= 2 and words[0] in _BARE_QUESTION_WORDS:
+        return True
+
+    if any(w in _ANAPHORA_WORDS for w in words):
+        return True
+
+    # Clitici solo su parole sufficientemente lunghe (evita "bella", "isola", ...)
+    return any(len(w) >= 7 and _CLITIC_RE.fullmatch(w) for w in words)
+
+
+class QueryRewriter:
+    """Rewriter history-aware con memoization per (chat_history, input)."""
+
+    def __init__(self, llm: BaseChatModel, max_entries: int = 256):
+        self.llm = llm
+        self.max_entries = max_entries
+
+        # Chain: {input, chat_history} -> standalone query (str)
+        self.contextualize_chain = (
+            get_contextualize_query_prompt() | self.llm | StrOutputParser()
+        )
+
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.llm_calls = 0
+        self.memo_hits = 0
+        self.skipped_empty_history = 0
+        self.skipped_self_contained = 0
+
+    # -----------------------------------------------------------------------------
+    # API
+    # -----------------------------------------------------------------------------
+    def rewrite(self, query: str, chat_history: Optional[List[Any]] = None) -> str:
+        """Restituisce la standalone query (o la query originale se già autonoma)."""
+        if self._can_skip(query, chat_history):
+            return query
+
+        key = self._key(query, chat_history)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        self.llm_calls += 1
+        standalone = self.contextualize_chain.invoke(
+            {"input": query, "chat_history": chat_history}
+        )
+        self._store(key, standalone)
+        return standalone
+
+    async def arewrite(
+        self, query: str, chat_history: Optional[List[Any]] = None
+    ) -> str:
+        """Versione async di .rewrite()."""
+        if self._can_skip(query, chat_history):
+            return query
+
+        key = self._key(query, chat_history)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        self.llm_calls += 1
+        standalone = await self.contextualize_chain.ainvoke(
+            {"input": query, "chat_history": chat_history}
+        )
+        self._store(key, standalone)
+        return standalone
+
+    def as_runnable(self) -> Runnable:
+        """Runnable {input, chat_history} -> standalone query (str)."""
+
+        def _run(x: Dict[str, Any]) -> str:
+            return self.rewrite(x["input"], x.get("chat_history"))
+
+        async def _arun(x: Dict[str, Any]) -> str:
+            return await self.arewrite(x["input"], x.get("chat_history"))
+
+        return RunnableLambda(_run, afunc=_arun, name="standalone_query")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "llm_calls": self.llm_calls,
+            "memo_hits": self.memo_hits,
+            "skipped_empty_history": self.skipped_empty_history,
+            "skipped_self_contained": self.skipped_self_contained,
+            "skipped_total": self.skipped_empty_history + self.skipped_self_contained,
+        }
+
+    def _can_skip(self, query: str, chat_history: Optional[List[Any]]) -> bool:
+        """True se il rewrite non può cambiare la query (history vuota o query autonoma)."""
+        if not chat_history:
+            self.skipped_empty_history += 1
+            return True
+        if not needs_rewrite(query):
+            self.skipped_self_contained += 1
+            return True
+        return False
+
+    # -----------------------------------------------------------------------------
+    # Memoization
+    # -----------------------------------------------------------------------------
+    def _key(self, query: str, chat_history: List[Any]) -> str:
+        payload = f"{get_buffer_string(convert_to_messages(chat_history))}\x00{query}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+            return cached
+
+    def _store(self, key: str, standalone: str) -> None:
+        with self._lock:
+            self._memo[key] = standalone
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
@@ -0,0 +1,218 @@
+# backend/tools/speculative_retrieval.py
+# -*- coding: utf-8 -*-
+"""
+Speculative retrieval per MovieDatabaseSearchTool
+
+Appena arriva un messaggio, la ricerca sul films store parte sul testo grezzo,
+in parallelo al primo passo di ragionamento dell'agent. Quando l'agent invoca
+movie_database_search, se la sua query è abbastanza simile al messaggio
+originale il risultato speculativo viene riusato; altrimenti viene scartato.
+
+La query del tool è di solito una riformulazione (spesso in inglese) delle
+parole chiave del messaggio: la similarità è un Jaccard sulle sole parole di
+contenuto (senza stopwords IT/EN né accenti), con una soglia bassa tarata in
+benchmarks/speculative_similarity_benchmark.py.
+
+La ricerca in corso è legata al turno tramite una ContextVar: turni concorrenti
+di utenti diversi non condividono mai i risultati.
+
+Espone:
+- SpeculativeRetrieval.start(message) / .astart(message) -> handle del turno
+- SpeculativeRetrieval.finish(handle) -> chiude il turno (scarta se non usata)
+- SpeculativeRetrieval.retriever -> retriever da usare al posto di quello base
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from database.lexical_index import entity_key
+
+# Ricerca speculativa del turno corrente (None fuori da un turno)
+_current_speculation: ContextVar[Optional["SpeculativeSearch"]] = ContextVar(
+    "speculative_search", default=None
+)
+
+
+def query_similarity(a: str, b: str) -> float:
+    """Jaccard sulle parole di contenuto: controllo locale, senza embedding"""
+    words_a = set(entity_key(a))
+    words_b = set(entity_key(b))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+class SpeculativeSearch:
+    """Ricerca avviata sul messaggio grezzo all'inizio di un turno"""
+
+    def __init__(self, query: str, pending: Union[Future, "asyncio.Task"]):
+        self.query = query
+        self.pending = pending
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.consumed = False
+        self.token: Optional[Token] = None
+
+        pending.add_done_callback(self._mark_finished)
+
+    def _mark_finished(self, _) -> None:
+        self.finished_at = time.perf_counter()
+
+
+class SpeculativeRetrieval:
+    """Gestisce le ricerche speculative e le relative metriche."""
+
+    def __init__(
+        self,
+        base_retriever: BaseRetriever,
+        min_similarity: float = 0.25,
+        bypass: Optional[Callable[[], bool]] = None,
+    ):
+        self.base_retriever = base_retriever
+        self.min_similarity = min_similarity
+        # Ricerche per cui il risultato speculativo non vale (es. filtri sui metadati)
+        self.bypass = bypass
+        self.retriever = SpeculativeRetriever(base_retriever=base_retriever, owner=self)
+
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative")
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.latency_saved_s = 0.0
+
+    # -----------------------------------------------------------------------------
+    # Ciclo di vita del turno
+    # -----------------------------------------------------------------------------
+    def start(self, message: str) -> SpeculativeSearch:
+        """Avvia la ricerca su un thread (percorso sincrono)."""
+        pending = self._executor.submit(self.base_retriever.invoke, message)
+        return self._activate(SpeculativeSearch(message, pending))
+
+    def astart(self, message: str) -> SpeculativeSearch:
+        """Avvia la ricerca come task asyncio (percorso async)."""
+        pending = asyncio.ensure_future(self.base_retriever.ainvoke(message))
+        return self._activate(SpeculativeSearch(message, pending))
+
+    def _activate(self, search: SpeculativeSearch) -> SpeculativeSearch:
+        search.token = _current_speculation.set(search)
+        with self._lock:
+            self.started += 1
+        return search
+
+    def finish(self, search: SpeculativeSearch) -> None:
+        """Chiude il turno: una ricerca mai usata viene cancellata e scartata."""
+        try:
+            _current_speculation.reset(search.token)
+        except ValueError:
+            # Generatore async chiuso da un contesto diverso: nulla da ripristinare
+            pass
+        if not search.consumed:
+            search.pending.cancel()
+            with self._lock:
+                self.discarded += 1
+
+    # -----------------------------------------------------------------------------
+    # Consumo da parte del retriever
+    # -----------------------------------------------------------------------------
+    def _claim(self, query: str) -> Optional[SpeculativeSearch]:
+        """Ricerca speculativa riusabile per questa query (al massimo una volta)."""
+        search = _current_speculation.get()
+        if search is None or search.consumed:
+            return None
+        if self.bypass is not None and self.bypass():
+            return None
+
+        similar = query_similarity(search.query, query) >= self.min_similarity
+        # Check-and-set atomico: tool call parallele dello stesso turno (modalità
+        # "plan") non possono riusare entrambe la stessa ricerca
+        with self._lock:
+            if search.consumed:
+                return None
+            if not similar:
+                self.misses += 1
+                return None
+            search.consumed = True
+        return search
+
+    def _record_hit(self, search: SpeculativeSearch, waited_from: float) -> None:
+        """Latenza risparmiata = durata della ricerca - attesa residua al consumo."""
+        finished_at = search.finished_at or time.perf_counter()
+        duration = finished_at - search.started_at
+        waited = max(finished_at - waited_from, 0.0)
+        with self._lock:
+            self.hits += 1
+            self.latency_saved_s += max(duration - waited, 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "latency_saved_s": round(self.latency_saved_s, 3),
+            }
+
+
+class SpeculativeRetriever(BaseRetriever):
+    """Retriever che riusa la ricerca speculativa del turno quando possibile."""
+
+    base_retriever: BaseRetriever
+    owner: Any
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        search = self.owner._claim(query)
+        if search is not None and isinstance(search.pending, Future):
+            requested_at = time.perf_counter()
+            try:
+                docs = search.pending.result()
+                self.owner._record_hit(search, requested_at)
+                return docs
+            except Exception:
+                pass
+
+        return self.base_retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        search = self.owner._claim(query)
+        if search is not None:
+            requested_at = time.perf_counter()
+            pending = search.pending
+            try:
+                if isinstance(pending, Future):
+                    docs = await asyncio.wrap_future(pending)
+                else:
+                    docs = await pending
+                self.owner._record_hit(search, requested_at)
+                return docs
+            except Exception:
+                pass
+
+        return await self.base_retriever.ainvoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
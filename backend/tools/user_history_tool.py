@@ -44,65 +44,101 @@ class UserHistoryTool:
                 filter=filter_dict,  # FILTRO ESATTO per user_id
             )
 
-            if not docs:
-                return f"🆕 Primo incontro con l'utente {user_id}"
+            return self._format_history(user_id, docs)
 
-            # Formatta storico conversazioni
-            history_text = f"📋 **STORICO CONVERSAZIONI - Utente {user_id}:**\n\n"
+        except Exception as e:
+            return f"❌ Errore recupero storico: {str(e)}"
 
-            for i, doc in enumerate(docs, 1):
-                meta = doc.metadata
+    async def aget_user_history(self, user_id: str, current_query: str = "") -> str:
+        """
+        Versione async di get_user_history (asimilarity_search sul vector store)
+        """
+        try:
+            query = current_query if current_query else "conversazioni utente"
 
-                # Verifica doppia di sicurezza (dovrebbe essere superflua con il filtro)
-                if meta.get("user_id") != user_id:
-                    continue
+            docs = await self.vectorstore.asimilarity_search(
+                query=query,
+                k=3,
+                filter={"user_id": user_id},
+            )
+
+            return self._format_history(user_id, docs)
 
-                history_text += (
-                    f"{i}. **{meta['user_name']}** ({meta['conversation_date']})\n"
-                )
-                history_text += f"   Preferenze: {', '.join(meta['preferences'][:3])}\n"
-                history_text += (
-                    f"   Film discussi: {', '.join(meta['discussed_films'][:2])}\n"
-                )
+        except Exception as e:
+            return f"❌ Errore recupero storico: {str(e)}"
 
-                # Estratto conversazione
-                summary = (
-                    doc.page_content.split("Riassunto conversazione:")[1][:200]
-                    if "Riassunto conversazione:" in doc.page_content
-                    else ""
-                )
-                if summary:
-                    history_text += f"   Riassunto: {summary.strip()}...\n"
+    def _format_history(self, user_id: str, docs) -> str:
+        """Formatta i documenti recuperati come storico conversazioni"""
+        if not docs:
+            return f"🆕 Primo incontro con l'utente {user_id}"
 
-                history_text += "\n"
+        # Formatta storico conversazioni
+        history_text = f"📋 **STORICO CONVERSAZIONI - Utente {user_id}:**\n\n"
 
-            return history_text
+        for i, doc in enumerate(docs, 1):
+            meta = doc.metadata
 
-        except Exception as e:
-            return f"❌ Errore recupero storico: {str(e)}"
+            # Verifica doppia di sicurezza (dovrebbe essere superflua con il filtro)
+            if meta.get("user_id") != user_id:
+                continue
+
+            history_text += (
+                f"{i}. **{meta['user_name']}** ({meta['conversation_date']})\n"
+            )
+            history_text += f"   Preferenze: {', '.join(meta['preferences'][:3])}\n"
+            history_text += (
+                f"   Film discussi: {', '.join(meta['discussed_films'][:2])}\n"
+            )
+
+            # Estratto conversazione
+            summary = (
+                doc.page_content.split("Riassunto conversazione:")[1][:200]
+                if "Riassunto conversazione:" in doc.page_content
+                else ""
+            )
+            if summary:
+                history_text += f"   Riassunto: {summary.strip()}...\n"
+
+            history_text += "\n"
+
+        return history_text
 
     def create_tool(self) -> Tool:
         """Crea langchain Tool object"""
 
+        def _parse_user_query(user_query: str):
+            # Parse user_id dalla query
+            if "user_id:" not in user_query:
+                return None
+            parts = user_query.split(" ", 1)
+            user_id = parts[0].replace("user_id:", "")
+            context = parts[1] if len(parts) > 1 else ""
+            return user_id, context
+
         def user_history_lookup(user_query: str) -> str:
             """
             Recupera storico conversazioni dell'utente per personalizzare raccomandazioni.
             Formato query: "user_id:USER_ID [contesto_opzionale]"
             Esempio: "user_id:user123 film horror preferiti"
             """
-            # Parse user_id dalla query
-            if "user_id:" in user_query:
-                parts = user_query.split(" ", 1)
-                user_id = parts[0].replace("user_id:", "")
-                context = parts[1] if len(parts) > 1 else ""
-            else:
+            parsed = _parse_user_query(user_query)
+            if parsed is None:
+                return "❌ Specifica user_id nel formato: user_id:USER_ID"
+
+            return self.get_user_history(*parsed)
+
+        async def auser_history_lookup(user_query: str) -> str:
+            """Versione async di user_history_lookup"""
+            parsed = _parse_user_query(user_query)
+            if parsed is None:
                 return "❌ Specifica user_id nel formato: user_id:USER_ID"
 
-            return self.get_user_history(user_id, context)
+            return await self.aget_user_history(*parsed)
 
         return Tool(
             name="user_conversation_history",
             func=user_history_lookup,
+            coroutine=auser_history_lookup,
             description="Retrieve user's old conversation summaries for personalized recommendations."
             "Use format: 'user_id:USER_ID [optional_context]'. Example: 'user_id:user123 horror preferences'",
         )
@@ -4,26 +4,25 @@
 WebMovieResearchTool (LCEL, RunnableParallel + unpack)
 
 Pipeline:
-1) Contextualization Prompt -> standalone query (history-aware)
+1) QueryRewriter condiviso -> standalone query (history-aware, memoizzata)
 2) RunnableParallel: Tavily + Reddit in parallelo
 3) Unpack dei risultati paralleli in top-level (tavily, reddit)
 4) Sintesi finale con LLM (italiano, senza spoiler)
 
 Espone:
-- .search(query, chat_history) -> str
+- WebSearchClients(config): client Tavily + Reddit, creati (e importati) solo
+  alla prima ricerca web
+- .search(query, chat_history) -> str (ricerche identiche concorrenti eseguite una volta)
+- .asearch(query, chat_history) -> str (async, idem)
 - .as_structured_tool() -> StructuredTool (accetta query + chat_history)
 """
 
 from __future__ import annotations
 
+import threading
 from operator import itemgetter
 from typing import Any, Dict, List, Optional
 
-from langchain_community.tools.reddit_search.tool import RedditSearchRun
-
-# Community tools
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_community.utilities.reddit_search import RedditSearchAPIWrapper
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -34,6 +33,9 @@ from langchain_core.runnables import (
     RunnablePassthrough,
 )
 from langchain_core.tools import StructuredTool
+from tools.query_rewriter import QueryRewriter
+from utils.metrics import ANSWER_LLM_TAG
+from utils.single_flight import SingleFlight, flight_key
 
 
 # =============================================================================
@@ -62,6 +64,61 @@ class WebSearchConfig(BaseModel):
         "movies", description="Subreddit principale da interrogare."
     )
 
+    # Coalescing
+    coalesce_requests: bool = Field(
+        True, description="Esegue una sola volta le ricerche identiche in corso."
+    )
+
+
+# =============================================================================
+# Client Tavily + Reddit
+# =============================================================================
+class WebSearchClients:
+    """
+    Tool LangChain di Tavily e Reddit, indipendenti da LLM e chain.
+
+    Moduli e client vengono importati/creati alla prima richiesta: l'avvio
+    del backend non paga i tools community di Tavily e Reddit (PRAW).
+    """
+
+    def __init__(self, config: WebSearchConfig):
+        self.config = config
+        self._tavily_tool = None
+        self._reddit_tool = None
+        self._lock = threading.Lock()
+
+    @property
+    def tavily_tool(self):
+        with self._lock:
+            if self._tavily_tool is None:
+                from langchain_community.tools.tavily_search import TavilySearchResults
+
+                self._tavily_tool = TavilySearchResults(
+                    tavily_api_key=self.config.tavily_api_key,
+                    max_results=self.config.tavily_max_results,
+                    include_answer=False,
+                    include_raw_content=False,
+                    include_images=self.config.include_images,
+                )
+            return self._tavily_tool
+
+    @property
+    def reddit_tool(self):
+        with self._lock:
+            if self._reddit_tool is None:
+                from langchain_community.tools.reddit_search.tool import RedditSearchRun
+                from langchain_community.utilities.reddit_search import (
+                    RedditSearchAPIWrapper,
+                )
+
+                reddit_wrapper = RedditSearchAPIWrapper(
+                    reddit_client_id=self.config.reddit_client_id,
+                    reddit_client_secret=self.config.reddit_client_secret,
+                    reddit_user_agent=self.config.reddit_user_agent,
+                )
+                self._reddit_tool = RedditSearchRun(api_wrapper=reddit_wrapper)
+            return self._reddit_tool
+
 
 # =============================================================================
 # Implementazione LCEL con RunnableParallel + unpack
@@ -69,93 +126,105 @@ class WebSearchConfig(BaseModel):
 class WebMovieResearchTool:
     """
     Ricerca web su film con Tavily + Reddit in parallelo.
-    - Rewriter history-aware della query
+    - Rewriter history-aware della query (condiviso con il database search)
     - Parallelizzazione esplicita con RunnableParallel
     - Sintesi LLM in italiano, senza spoiler
     """
 
-    def __init__(self, config: WebSearchConfig, llm: BaseChatModel):
+    def __init__(
+        self,
+        config: WebSearchConfig,
+        llm: BaseChatModel,
+        query_rewriter: Optional[QueryRewriter] = None,
+        clients: Optional[WebSearchClients] = None,
+    ):
         self.config = config
         self.llm = llm
 
-        # ------ (1) Contextualization Prompt -> standalone query ----------------
-        contextualization_prompt_text = (
-            "Given a chat history and the latest user question which might reference context "
-            "in the chat history, formulate a standalone question which can be understood "
-            "without the chat history. Do NOT answer the question; return only the rewritten query."
-        )
+        # Ricerche identiche concorrenti: una sola esecuzione condivisa
+        self.flights = SingleFlight() if self.config.coalesce_requests else None
 
-        self.contextualization_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", contextualization_prompt_text),
-                MessagesPlaceholder("chat_history"),
-                ("human", "{input}"),
-            ]
-        )
+        # ------ (1) Query rewriter condiviso -> standalone query ---------------
+        self.query_rewriter = query_rewriter or QueryRewriter(self.llm)
 
         # Chain: {input, chat_history} -> standalone_query (str)
-        self.standalone_query_chain = (
-            self.contextualization_prompt | self.llm | StrOutputParser()
-        )
+        self.standalone_query_chain = self.query_rewriter.as_runnable()
 
         # ------ (2) Tools: Tavily + Reddit -------------------------------------
-        # Tavily
-        self.tavily_tool = TavilySearchResults(
-            tavily_api_key=self.config.tavily_api_key,
-            max_results=self.config.tavily_max_results,
-            include_answer=False,
-            include_raw_content=False,
-            include_images=self.config.include_images,
-        )
-
-        # Reddit
-        reddit_wrapper = RedditSearchAPIWrapper(
-            reddit_client_id=self.config.reddit_client_id,
-            reddit_client_secret=self.config.reddit_client_secret,
-            reddit_user_agent=self.config.reddit_user_agent,
-        )
-        self.reddit_tool = RedditSearchRun(api_wrapper=reddit_wrapper)
+        # Client creati alla prima ricerca (vedi WebSearchClients)
+        self.clients = clients or WebSearchClients(self.config)
 
         # Runnables che lanciano i tool a partire da una standalone_query (str)
+        def _tavily_payload(q: str) -> Dict[str, Any]:
+            payload = {"query": f"{q} movie reviews critics analysis"}
+            if self.config.tavily_search_depth:
+                payload["search_depth"] = self.config.tavily_search_depth
+            return payload
+
+        def _reddit_payload(q: str) -> Dict[str, Any]:
+            return {
+                "query": f"{q} movie discussion",
+                "sort": "relevance",
+                "time_filter": "year",
+                "subreddit": self.config.reddit_subreddit,
+                "limit": str(self.config.reddit_max_results),
+            }
+
         def _run_tavily(q: str) -> Dict[str, Any]:
-            tv_query = f"{q} movie reviews critics analysis"
+            payload = _tavily_payload(q)
             try:
-                payload = {"query": tv_query}
-                if self.config.tavily_search_depth:
-                    payload["search_depth"] = self.config.tavily_search_depth
-                res = self.tavily_tool.invoke(payload)
-                return {"source": "tavily", "query": tv_query, "results": res}
+                res = self.clients.tavily_tool.invoke(payload)
+                return {"source": "tavily", "query": payload["query"], "results": res}
             except Exception as e:
                 return {
                     "source": "tavily",
-                    "query": tv_query,
+                    "query": payload["query"],
+                    "results": [],
+                    "error": str(e),
+                }
+
+        async def _arun_tavily(q: str) -> Dict[str, Any]:
+            payload = _tavily_payload(q)
+            try:
+                res = await self.clients.tavily_tool.ainvoke(payload)
+                return {"source": "tavily", "query": payload["query"], "results": res}
+            except Exception as e:
+                return {
+                    "source": "tavily",
+                    "query": payload["query"],
                     "results": [],
                     "error": str(e),
                 }
 
         def _run_reddit(q: str) -> Dict[str, Any]:
-            rd_query = f"{q} movie discussion"
+            payload = _reddit_payload(q)
             try:
-                res = self.reddit_tool.invoke(
-                    {
-                        "query": rd_query,
-                        "sort": "relevance",
-                        "time_filter": "year",
-                        "subreddit": self.config.reddit_subreddit,
-                        "limit": str(self.config.reddit_max_results),
-                    }
-                )
-                return {"source": "reddit", "query": rd_query, "results": res}
+                res = self.clients.reddit_tool.invoke(payload)
+                return {"source": "reddit", "query": payload["query"], "results": res}
+            except Exception as e:
+                return {
+                    "source": "reddit",
+                    "query": payload["query"],
+                    "results": "",
+                    "error": str(e),
+                }
+
+        async def _arun_reddit(q: str) -> Dict[str, Any]:
+            # PRAW è sincrono: BaseTool.ainvoke lo esegue in un thread executor
+            payload = _reddit_payload(q)
+            try:
+                res = await self.clients.reddit_tool.ainvoke(payload)
+                return {"source": "reddit", "query": payload["query"], "results": res}
             except Exception as e:
                 return {
                     "source": "reddit",
-                    "query": rd_query,
+                    "query": payload["query"],
                     "results": "",
                     "error": str(e),
                 }
 
-        self.tavily_runnable = RunnableLambda(_run_tavily)
-        self.reddit_runnable = RunnableLambda(_run_reddit)
+        self.tavily_runnable = RunnableLambda(_run_tavily, afunc=_arun_tavily)
+        self.reddit_runnable = RunnableLambda(_run_reddit, afunc=_arun_reddit)
 
         # Parallel runner esplicito
         self.parallel = RunnableParallel(
@@ -208,9 +277,9 @@ class WebMovieResearchTool:
                     "reddit": x["web"]["reddit"],
                 }
             )
-            # Sintesi finale
+            # Sintesi finale (LLM taggato: i token possono andare diretti all'utente)
             | self.synthesis_prompt
-            | self.llm
+            | self.llm.with_config(tags=[ANSWER_LLM_TAG])
             | StrOutputParser()
         )
 
@@ -225,6 +294,13 @@ class WebMovieResearchTool:
         - Unpack dei risultati
         - Sintesi finale (italiano, senza spoiler)
         """
+        if self.flights is None:
+            return self._search(query, chat_history)
+        return self.flights.do(
+            flight_key(query, chat_history), lambda: self._search(query, chat_history)
+        )
+
+    def _search(self, query: str, chat_history: Optional[List[Any]] = None) -> str:
         try:
             return self.core_chain.invoke(
                 {"input": query, "chat_history": chat_history or []}
@@ -232,6 +308,29 @@ class WebMovieResearchTool:
         except Exception as e:
             return f"❌ Errore nella ricerca web: {e}"
 
+    async def asearch(
+        self, query: str, chat_history: Optional[List[Any]] = None
+    ) -> str:
+        """
+        Versione async di .search(): Tavily e Reddit girano in parallelo
+        sull'event loop (RunnableParallel.ainvoke) invece che su thread.
+        """
+        if self.flights is None:
+            return await self._asearch(query, chat_history)
+        return await self.flights.ado(
+            flight_key(query, chat_history), lambda: self._asearch(query, chat_history)
+        )
+
+    async def _asearch(
+        self, query: str, chat_history: Optional[List[Any]] = None
+    ) -> str:
+        try:
+            return await self.core_chain.ainvoke(
+                {"input": query, "chat_history": chat_history or []}
+            )
+        except Exception as e:
+            return f"❌ Errore nella ricerca web: {e}"
+
     # -----------------------------------------------------------------------------
     # StructuredTool factory
     # -----------------------------------------------------------------------------
@@ -245,12 +344,15 @@ class WebMovieResearchTool:
     def as_structured_tool(self) -> StructuredTool:
         """
         Restituisce uno StructuredTool 'web_movie_research' da registrare nell’orchestratore.
-        Accetta 'query' e 'chat_history' e richiama .search() senza alterare la pipeline.
+        Accetta 'query' e 'chat_history' e richiama .search() / .asearch() senza alterare la pipeline.
         """
 
         def _run(query: str, chat_history: Optional[List[Any]] = None) -> str:
             return self.search(query=query, chat_history=chat_history)
 
+        async def _arun(query: str, chat_history: Optional[List[Any]] = None) -> str:
+            return await self.asearch(query=query, chat_history=chat_history)
+
         return StructuredTool.from_function(
             name="web_movie_research",
             description=(
@@ -260,4 +362,5 @@ class WebMovieResearchTool:
             ),
             args_schema=self._Args,
             func=_run,
+            coroutine=_arun,
         )
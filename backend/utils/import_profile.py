@@ -0,0 +1,95 @@
+"""
+Profilo del tempo di import all'avvio, riassunto per sottosistema.
+
+Esegue `python -X importtime` in un processo pulito (nessun modulo già in
+cache) e somma il tempo "self" di ogni modulo nel sottosistema di appartenenza:
+mostra cosa pesa sul cold start di un worker e cosa conviene differire.
+
+Uso (dalla cartella backend): python main.py --profile-imports
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+# Prefisso del modulo -> sottosistema (il primo che corrisponde vince)
+SUBSYSTEMS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("langchain_core", ("langchain_core",)),
+    ("langchain_community", ("langchain_community",)),
+    ("langchain_openai", ("langchain_openai",)),
+    ("langchain", ("langchain", "langsmith")),
+    ("openai", ("openai", "tiktoken", "httpx", "httpcore")),
+    ("chromadb", ("chromadb", "onnxruntime", "tokenizers")),
+    ("numpy", ("numpy",)),
+    ("reddit/tavily", ("praw", "prawcore", "tavily")),
+    ("fastapi/uvicorn", ("fastapi", "starlette", "uvicorn", "websockets", "anyio")),
+    ("pydantic", ("pydantic", "pydantic_core")),
+    ("backend", ("main", "config", "agent", "tools", "database", "utils", "benchmarks")),
+]
+
+# Moduli profilati: il server (ciò che blocca il bind) e lo stack dell'agent
+DEFAULT_TARGETS = ("main", "agent.agent")
+
+
+def _subsystem(module: str) -> str:
+    root = module.split(".", 1)[0]
+    for name, prefixes in SUBSYSTEMS:
+        if root in prefixes:
+            return name
+    return "other"
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Righe "import time: self [us] | cumulative | package" -> (modulo, self_us)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # intestazione della tabella
+        entries.append((parts[2].strip(), int(parts[0])))
+    return entries
+
+
+def profile_imports(target: str) -> Dict[str, Dict[str, float]]:
+    """Importa `target` in un interprete nuovo e aggrega i tempi per sottosistema"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # Errore dell'import (es. dipendenza mancante): l'ultima riga è l'eccezione
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    summary: Dict[str, Dict[str, float]] = {}
+    for module, self_us in _parse_importtime(result.stderr):
+        bucket = summary.setdefault(_subsystem(module), {"modules": 0, "ms": 0.0})
+        bucket["modules"] += 1
+        bucket["ms"] += self_us / 1000
+    return summary
+
+
+def print_import_profile(targets: Iterable[str] = DEFAULT_TARGETS) -> None:
+    """Stampa, per ogni modulo target, la tabella dei tempi per sottosistema"""
+    for target in targets:
+        try:
+            summary = profile_imports(target)
+        except RuntimeError as e:
+            print(f"❌ import {target} fallito: {e}")
+            continue
+
+        total = sum(b["ms"] for b in summary.values())
+        print(f"\n📦 import {target}: {total:.1f} ms")
+        print(f"{'sottosistema':<22}{'moduli':>8}{'ms':>10}{'%':>7}")
+        for name, bucket in sorted(summary.items(), key=lambda item: -item[1]["ms"]):
+            share = 100 * bucket["ms"] / total if total else 0.0
+            print(f"{name:<22}{bucket['modules']:>8}{bucket['ms']:>10.1f}{share:>6.1f}%")
+
+
+if __name__ == "__main__":
+    print_import_profile(sys.argv[1:] or DEFAULT_TARGETS)
@@ -0,0 +1,200 @@
+"""
+Cache exact-match delle chiamate LLM, condivisa da tutte le chain.
+
+Chiave: sha256 di (llm_string, prompt), dove llm_string codifica modello e
+parametri (temperature, max_tokens, tools in bind) e prompt i messaggi
+serializzati. Due livelli:
+- memoria: LRU limitata per numero di voci
+- disco (opzionale): tabella SQLite, sopravvive ai restart; un hit su disco
+  viene promosso in memoria. Limitata per numero di righe e TTL: l'eviction
+  avviene in scrittura, le righe scadute non vengono mai servite
+
+Si collega a ChatOpenAI(cache=...); una chain che non deve usarla riceve una
+copia dell'LLM creata con without_llm_cache(), una chain i cui prompt
+contengono conversazioni degli utenti una copia con la vista .memory_only()
+(nessuna scrittura su disco).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps, loads
+
+
+def without_llm_cache(llm: BaseChatModel) -> BaseChatModel:
+    """Copia dell'LLM che non legge né scrive nella cache (opt-out per chain)"""
+    return llm.model_copy(update={"cache": False})
+
+
+class TieredLLMCache(BaseCache):
+    """
+    Args:
+        max_entries: voci nel livello in memoria (LRU)
+        db_path: file SQLite del livello su disco (None = solo memoria)
+        max_disk_entries: righe massime su disco (le più vecchie vengono eliminate)
+        ttl_seconds: durata di una riga su disco (None = nessuna scadenza)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10_000,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, RETURN_VAL_TYPE]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    generations TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)"
+            )
+            self._conn.commit()
+
+        # Metriche
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    # -----------------------------------------------------------------------------
+    # BaseCache
+    # -----------------------------------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self._lookup(prompt, llm_string, use_disk=True)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._update(prompt, llm_string, return_val, use_disk=True)
+
+    def memory_only(self) -> "BaseCache":
+        """Vista sul solo livello in memoria (stesse voci e metriche, niente disco)"""
+        return _MemoryTierView(self)
+
+    def _lookup(self, prompt: str, llm_string: str, use_disk: bool) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            generations = self._memory.get(key)
+            if generations is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return generations
+
+            if use_disk and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT generations FROM llm_cache WHERE key = ? AND created_at >= ?",
+                    (key, self._disk_cutoff()),
+                ).fetchone()
+                if row is not None:
+                    generations = [loads(g) for g in json.loads(row[0])]
+                    self._remember(key, generations)
+                    self.disk_hits += 1
+                    return generations
+
+            self.misses += 1
+            return None
+
+    def _update(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE, use_disk: bool
+    ) -> None:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            self._remember(key, return_val)
+            if use_disk and self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, generations, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps([dumps(g) for g in return_val]), time.time()),
+                )
+                self._evict_disk()
+                self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    # -----------------------------------------------------------------------------
+    # Internals
+    # -----------------------------------------------------------------------------
+    def _disk_cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def _evict_disk(self) -> None:
+        """Righe scadute, poi le più vecchie oltre max_disk_entries (lock già acquisito)"""
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (self._disk_cutoff(),)
+            )
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache "
+            "ORDER BY created_at DESC, key DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def _remember(self, key: str, generations: Sequence[Any]) -> None:
+        self._memory[key] = list(generations)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            disk_entries = None
+            if self._conn is not None:
+                disk_entries = self._conn.execute(
+                    "SELECT COUNT(*) FROM llm_cache"
+                ).fetchone()[0]
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class _MemoryTierView(BaseCache):
+    """TieredLLMCache senza livello su disco (chain con conversazioni degli utenti)"""
+
+    def __init__(self, cache: TieredLLMCache):
+        self._cache = cache
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self._cache._lookup(prompt, llm_string, use_disk=False)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._cache._update(prompt, llm_string, return_val, use_disk=False)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._cache.clear(**kwargs)
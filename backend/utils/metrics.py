@@ -0,0 +1,115 @@
+"""
+Metriche per turno: chiamate LLM, token e latenza, aggregate per percorso
+di esecuzione (es. "agent:react", "fast_path:catalog_search").
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_core.agents import AgentFinish
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# Tag dell'LLM che genera la risposta finale di un tool (QA / sintesi):
+# permette di attribuirne le chiamate e di inoltrarne i token in streaming
+ANSWER_LLM_TAG = "tool_answer_llm"
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Callback che conta le chiamate LLM e i token consumati in un turno"""
+
+    # Eseguito inline anche nei run async (niente thread executor)
+    run_inline = True
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Chiamate per tag (es. le iterazioni dell'agent hanno il tag del suo LLM)
+        self.tagged_calls: Dict[str, int] = {}
+        # Turni chiusi dall'output di un tool return_direct (sintesi agent evitata)
+        self.direct_returns = 0
+        # Tools eseguiti nel turno (es. per non mettere in cache risposte personalizzate)
+        self.tools_used: Set[str] = set()
+
+    def on_chat_model_start(
+        self, serialized, messages, *, tags: Optional[List[str]] = None, **kwargs: Any
+    ) -> None:
+        self._count_call(tags)
+
+    def on_llm_start(
+        self, serialized, prompts, *, tags: Optional[List[str]] = None, **kwargs: Any
+    ) -> None:
+        self._count_call(tags)
+
+    def _count_call(self, tags: Optional[List[str]]) -> None:
+        self.llm_calls += 1
+        for tag in tags or []:
+            self.tagged_calls[tag] = self.tagged_calls.get(tag, 0) + 1
+
+    def on_tool_start(self, serialized, input_str, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name")
+        if name:
+            self.tools_used.add(name)
+
+    def on_agent_finish(self, finish: AgentFinish, **kwargs: Any) -> None:
+        # AgentExecutor chiude con log vuoto quando restituisce un tool return_direct
+        if not finish.log:
+            self.direct_returns += 1
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if not usage:
+            # In streaming il conteggio arriva negli usage_metadata dei messaggi
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    metadata = getattr(message, "usage_metadata", None) or {}
+                    self.prompt_tokens += metadata.get("input_tokens", 0)
+                    self.completion_tokens += metadata.get("output_tokens", 0)
+            return
+
+        self.prompt_tokens += usage.get("prompt_tokens", 0)
+        self.completion_tokens += usage.get("completion_tokens", 0)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class TurnStats:
+    """Aggregatore thread-safe delle metriche per percorso di esecuzione"""
+
+    def __init__(self):
+        self._paths: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, counter: LLMCallCounter, elapsed: float, **extra: float) -> None:
+        with self._lock:
+            entry = self._paths.setdefault(
+                path, {"turns": 0, "llm_calls": 0, "tokens": 0, "latency_s": 0.0}
+            )
+            entry["turns"] += 1
+            entry["llm_calls"] += counter.llm_calls
+            entry["tokens"] += counter.total_tokens
+            entry["latency_s"] += elapsed
+            for key, value in extra.items():
+                entry[key] = entry.get(key, 0) + value
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Totali e medie per turno di ogni percorso"""
+        with self._lock:
+            report = {}
+            for path, entry in self._paths.items():
+                turns = entry["turns"] or 1
+                report[path] = {
+                    **entry,
+                    "avg_llm_calls": round(entry["llm_calls"] / turns, 2),
+                    "avg_tokens": round(entry["tokens"] / turns, 1),
+                    "avg_latency_s": round(entry["latency_s"] / turns, 3),
+                }
+                if "agent_iterations" in entry:
+                    report[path]["avg_agent_iterations"] = round(
+                        entry["agent_iterations"] / turns, 2
+                    )
+            return report
@@ -0,0 +1,145 @@
+"""
+Single-flight: richieste identiche concorrenti eseguite una volta sola.
+
+Il primo chiamante con una certa chiave esegue il lavoro; chi arriva con la
+stessa chiave mentre è ancora in corso attende lo stesso risultato invece di
+ripeterlo. Terminato il lavoro la chiave viene liberata: non è una cache.
+
+- .do(key, fn): percorso sincrono (thread), via concurrent.futures.Future
+- .ado(key, fn): percorso async, il lavoro gira in un task condiviso;
+  la cancellazione di un chiamante non interrompe gli altri, il task viene
+  cancellato solo quando nessuno lo attende più
+
+Il lavoro condiviso gira nel contesto del primo chiamante (callbacks LangChain
+incluse): chi attende riceve solo il risultato, senza eventi. Per questo:
+- i run in streaming (astream_events / astream_log) non partecipano mai al
+  coalescing, altrimenti chi attende non vedrebbe i token ("bypassed")
+- le chiamate LLM del lavoro condiviso sono contate solo nel turno di chi lo
+  esegue: i chiamanti accodati figurano a parte in stats()["coalesced"]
+- i tags del run fanno parte della chiave (flight_key), metadata e callbacks no
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ensure_config
+from langchain_core.tracers._streaming import _StreamingCallbackHandler
+
+
+def flight_key(
+    query: str,
+    chat_history: Optional[List[Any]] = None,
+    extra: Any = None,
+    config: Optional[RunnableConfig] = None,
+) -> str:
+    """
+    Chiave per query + history (contenuto dei messaggi) + parametri extra (es. filtri)
+    + tags del run (config esplicito o ereditato dal runnable padre)
+    """
+    history = [getattr(m, "content", str(m)) for m in chat_history or []]
+    tags = sorted(ensure_config(config).get("tags") or [])
+    payload = json.dumps([query, history, extra, tags], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_streaming_run(config: Optional[RunnableConfig] = None) -> bool:
+    """True se il run corrente inoltra i propri eventi in streaming"""
+    callbacks = ensure_config(config).get("callbacks")
+    handlers = getattr(callbacks, "handlers", callbacks) or []
+    return any(isinstance(handler, _StreamingCallbackHandler) for handler in handlers)
+
+
+class _AsyncFlight:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalescing delle chiamate identiche in corso"""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._async_calls: Dict[str, _AsyncFlight] = {}
+        self._lock = threading.Lock()
+
+        # Metriche
+        self.executed = 0
+        self.coalesced = 0
+        self.bypassed = 0  # run in streaming eseguiti per conto proprio
+
+    def do(self, key: str, fn: Callable[[], Any], config: Optional[RunnableConfig] = None) -> Any:
+        if self._bypass(config):
+            return fn()
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+    async def ado(
+        self, key: str, fn: Callable[[], Awaitable[Any]], config: Optional[RunnableConfig] = None
+    ) -> Any:
+        if self._bypass(config):
+            return await fn()
+
+        # Nessun await tra lookup e registrazione: atomico sull'event loop
+        flight = self._async_calls.get(key)
+        if flight is None:
+            flight = _AsyncFlight(asyncio.ensure_future(fn()))
+            self._async_calls[key] = flight
+            flight.task.add_done_callback(lambda _: self._async_calls.pop(key, None))
+            with self._lock:
+                self.executed += 1
+        else:
+            with self._lock:
+                self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _bypass(self, config: Optional[RunnableConfig]) -> bool:
+        if not is_streaming_run(config):
+            return False
+        with self._lock:
+            self.bypassed += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "bypassed": self.bypassed,
+                "coalesced_ratio": round(self.coalesced / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,77 @@
+"""
+Stato del warm-up dei componenti del backend (vector stores, web clients,
+agent graph), esposto dall'endpoint /ready.
+
+Gli step girano su thread (asyncio.to_thread): cancellare il task del
+warm-up non li interrompe. .cancel() impedisce l'avvio di nuovi step e
+scarta il risultato di quelli in corso; .wait_idle() attende che terminino.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class WarmupCancelled(Exception):
+    """Warm-up interrotto dallo shutdown del server"""
+
+
+class WarmupTracker:
+    """Registra stato e durata dell'inizializzazione di ogni componente"""
+
+    def __init__(self, components: Iterable[str]):
+        self._components: Dict[str, Dict[str, Any]] = {
+            name: {"state": "pending"} for name in components
+        }
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._running = 0
+        self._shutdown = threading.Event()
+
+    def run(self, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Esegue l'inizializzazione di un componente aggiornandone lo stato"""
+        self._check_shutdown(name)
+        self._update(name, state="warming")
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._update(name, state="failed", error=str(e))
+            raise
+        finally:
+            with self._idle:
+                self._running -= 1
+                self._idle.notify_all()
+        # Completato durante lo shutdown: nessun agent costruito a metà
+        self._check_shutdown(name)
+        self._update(name, state="ready", seconds=round(time.perf_counter() - start, 3))
+        return result
+
+    def cancel(self) -> None:
+        """Shutdown: nessun nuovo step, quelli in corso vengono scartati"""
+        self._shutdown.set()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Attende la fine degli step in corso; False allo scadere del timeout"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._running == 0, timeout)
+
+    def _check_shutdown(self, name: str) -> None:
+        if self._shutdown.is_set():
+            self._update(name, state="cancelled")
+            raise WarmupCancelled(name)
+
+    def _update(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self._components[name] = {**self._components.get(name, {}), **fields}
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(c["state"] == "ready" for c in self._components.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(info) for name, info in self._components.items()}
@@ -27,10 +27,15 @@ document.addEventListener("DOMContentLoaded", () => {
 
     // ================== CONFIGURATION ==================
     const WS_URL = "ws://localhost:8000/chat"; // WebSocket backend URL
+    const STREAMING_ENABLED = true; // Riceve la risposta token per token
     const DEBUG_ENABLED = false;
     let websocket = null;
     let nudgeInterval = null;
 
+    // Stato della risposta in streaming corrente
+    let streamBubble = null;
+    let streamText = "";
+
     function log(...args) {
         if (DEBUG_ENABLED) {
             console.log("[CHAT WIDGET]", ...args);
@@ -198,6 +203,34 @@ document.addEventListener("DOMContentLoaded", () => {
         return typeInterval;
     }
 
+    // ================== STREAMING ==================
+    function handleStreamEvent(event) {
+        if (!streamBubble) {
+            streamBubble = appendMessage("", false);
+            streamText = "";
+        }
+
+        if (event.type === "status") {
+            // Mostra lo stato solo finché non arrivano i primi token
+            if (!streamText) {
+                streamBubble.classList.add("is-status");
+                streamBubble.textContent = event.content;
+            }
+        } else if (event.type === "token") {
+            streamBubble.classList.remove("is-status");
+            streamText += event.content;
+            streamBubble.textContent = streamText;
+        } else if (event.type === "end") {
+            // La risposta finale fa fede sui token ricevuti
+            streamBubble.classList.remove("is-status");
+            streamBubble.innerHTML = renderMarkdown(normalizeMarkdown(event.content || ""));
+            streamBubble = null;
+            streamText = "";
+        }
+
+        transcript.scrollTop = transcript.scrollHeight;
+    }
+
     // ================== WEBSOCKET COMMUNICATION ==================
     function connectWebSocket() {
         if (websocket && websocket.readyState === WebSocket.OPEN) {
@@ -205,7 +238,7 @@ document.addEventListener("DOMContentLoaded", () => {
         }
 
         // Usa SESSION_ID dinamico per ogni utente/sessione
-        const wsUrl = `${WS_URL}/${SESSION_ID}`;
+        const wsUrl = `${WS_URL}/${SESSION_ID}` + (STREAMING_ENABLED ? "?stream=true" : "");
         log("Connecting to WebSocket:", wsUrl);
 
         websocket = new WebSocket(wsUrl);
@@ -219,6 +252,11 @@ document.addEventListener("DOMContentLoaded", () => {
             log("WebSocket response:", response);
             log("WebSocket state after message:", websocket.readyState);
 
+            if (STREAMING_ENABLED) {
+                handleStreamEvent(JSON.parse(response));
+                return;
+            }
+
             // Add bot response with typing effect
             const botBubble = appendMessage("", false);
             simulateTypingEffect(botBubble, response);